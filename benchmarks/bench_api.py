@@ -0,0 +1,216 @@
+# benchmarks/bench_api.py
+"""Offline load test of the check endpoints against fake Gemini services.
+
+The FastAPI app runs in-process (httpx ASGI transport) with the real spell checker, retriever
+and caches; only generation and embedding are replaced by latency-injecting stand-ins.
+Results are printed (or written with --output) as JSON so runs can be diffed across versions.
+
+    python -m benchmarks.bench_api --concurrency 1 8 32 --batch-sizes 1 20 100 \\
+        --gen-latency lognormal:800:0.4 --error-rate 0.02 --truncate-rate 0.02 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import asyncio
+import argparse
+import platform
+import resource
+import subprocess
+import numpy as np
+import httpx
+from .fake_gemini import FakeGenerativeModel, FakeEmbedder, LatencyDistribution, FaultProfile
+
+ENDPOINTS = {"spell-check": "/v1/spell-check", "content-check": "/v1/content-check", "full-check": "/v1/full-check"}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Opened by the app by relative path; a run works on scratch copies of them.
+WORKING_COPIES = ["db", "data"]
+KNOWLEDGE_BASE_FILES = ["data/knowledge_bases/spelling_and_terminology.json", "data/knowledge_bases/grammar_and_style.json"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 20, 100])
+    parser.add_argument("--requests", type=int, default=50, help="requests per (endpoint, concurrency, batch size)")
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="share of sentences drawn from a small recurring pool")
+    parser.add_argument("--gen-latency", default="lognormal:600:0.4")
+    parser.add_argument("--embed-latency", default="lognormal:60:0.3")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="log at INFO instead of WARNING")
+    return parser.parse_args()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class SentenceSource:
+    """Realistic UI copy (knowledge base examples) plus unique variants so caches only hit
+    as often as --repeat-ratio asks for."""
+
+    def __init__(self, repeat_ratio: float, rng: random.Random):
+        self.repeat_ratio = repeat_ratio
+        self.rng = rng
+        self.pool = []
+        for path in KNOWLEDGE_BASE_FILES:
+            with open(path, "r", encoding="utf-8") as f:
+                for rule in json.load(f):
+                    self.pool.extend([rule["incorrect_example"], rule["correct_example"]])
+        self.counter = 0
+
+    def batch(self, size: int) -> list[str]:
+        sentences = []
+        for _ in range(size):
+            base = self.rng.choice(self.pool)
+            if self.rng.random() < self.repeat_ratio:
+                sentences.append(base)
+            else:
+                self.counter += 1
+                sentences.append(f"{base.rstrip('.')} for order {self.counter}.")
+        return sentences
+
+
+def summarize(latencies: list[float], statuses: list[int], elapsed: float, sentences: int) -> dict:
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": sum(1 for s in statuses if s != 200),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "mean_ms": round(float(ms.mean()), 1),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "sentences_per_second": round(sentences / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def stage_summary() -> dict:
+    """Server-side time per pipeline stage over the whole run, from the app's own histograms."""
+    from src.core.metrics import STAGE_SECONDS
+
+    summary = {}
+    for (stage, check_type), (count, total) in STAGE_SECONDS.totals().items():
+        summary[f"{check_type}/{stage}"] = {"count": count, "mean_ms": round(total / count * 1000, 2)}
+    return summary
+
+
+async def run_config(client: httpx.AsyncClient, path: str, concurrency: int, batch_size: int,
+                     requests: int, source: SentenceSource) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    payloads = [{"texts": source.batch(batch_size)} for _ in range(requests)]
+    latencies, statuses = [], []
+
+    async def one(payload: dict):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in payloads))
+    return summarize(latencies, statuses, time.perf_counter() - start, requests * batch_size)
+
+
+def build_app(args):
+    """Imports the app and injects a Gemini client backed by the fakes into its service container."""
+    from src import main
+    from src.services.container import ServiceContainer
+    from src.services.gemini_client import AsyncGeminiClient
+
+    rng = random.Random(args.seed)
+    model = FakeGenerativeModel(
+        LatencyDistribution(args.gen_latency, rng),
+        FaultProfile(args.error_rate, args.rate_limit_rate, args.truncate_rate, args.malformed_rate),
+        seed=args.seed,
+    )
+    embedder = FakeEmbedder(LatencyDistribution(args.embed_latency, rng))
+    main.app.state.services = ServiceContainer(gemini_client=AsyncGeminiClient(model=model, embedder=embedder))
+    return main.app, model, embedder
+
+
+async def run(args) -> dict:
+    app, model, embedder = build_app(args)
+    source = SentenceSource(args.repeat_ratio, random.Random(args.seed))
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "baseline_rss_mb": peak_rss_mb(),
+        "runs": [],
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                for batch_size in args.batch_sizes:
+                    calls_before = model.calls
+                    stats = await run_config(client, ENDPOINTS[endpoint], concurrency, batch_size, args.requests, source)
+                    stats.update(endpoint=endpoint, concurrency=concurrency, batch_size=batch_size,
+                                 gemini_calls=model.calls - calls_before)
+                    report["runs"].append(stats)
+                    print(f"{endpoint} c={concurrency} b={batch_size}: p50 {stats['p50_ms']} ms, "
+                          f"p99 {stats['p99_ms']} ms, {stats['requests_per_second']} req/s", file=sys.stderr)
+
+    # Token counts from the fake's usage metadata (4 characters per token), to compare prompt formats.
+    report["gemini_usage"] = dict(app.state.services.gemini_client.usage)
+    await app.state.services.close()
+    report["stages"] = stage_summary()
+    report["fake_gemini"] = {"calls": model.calls, "failures": model.failures,
+                             "embed_calls": embedder.calls, "embedded_texts": embedder.texts}
+    return report
+
+
+def main():
+    args = parse_args()
+    # The app configures logging from LOG_LEVEL when it is imported.
+    os.environ.setdefault("LOG_LEVEL", "INFO" if args.verbose else "WARNING")
+    # A fresh embedding store per run, so embedding calls are comparable across runs.
+    os.environ.setdefault("EMBEDDING_STORE_PATH", tempfile.mkdtemp(prefix="bench-embeddings-"))
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    # The app opens db/, feedback.db and data/ relative to the working directory: run it in a
+    # scratch directory so a benchmark never modifies the tracked copies.
+    workdir = tempfile.mkdtemp(prefix="bench-api-")
+    for name in WORKING_COPIES:
+        shutil.copytree(os.path.join(REPO_ROOT, name), os.path.join(workdir, name))
+    sys.path.insert(0, REPO_ROOT)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_precheck.py
+"""Measures the throughput of the local brand pre-checker in sentences per second.
+
+    python -m benchmarks.bench_precheck --sentences 50000
+"""
+import json
+import time
+import argparse
+from src.core.brand_prechecker import BrandPrechecker, SPELLING_KB_PATH
+
+IGNORE_FILE_PATH = "data/ignore_list.txt"
+
+
+def load_corpus() -> list[str]:
+    """Knowledge base examples plus the ignore list: a realistic mix of labels and sentences."""
+    with open(SPELLING_KB_PATH, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    corpus = [r[k] for r in rules for k in ("incorrect_example", "correct_example")]
+    with open(IGNORE_FILE_PATH, "r", encoding="utf-8") as f:
+        corpus.extend(line.strip() for line in f if line.strip())
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=50000)
+    args = parser.parse_args()
+
+    compile_start = time.perf_counter()
+    prechecker = BrandPrechecker.from_file()
+    compile_ms = (time.perf_counter() - compile_start) * 1000
+
+    corpus = load_corpus()
+    sentences = [corpus[i % len(corpus)] for i in range(args.sentences)]
+
+    start = time.perf_counter()
+    resolved = corrected = 0
+    for sentence in sentences:
+        result = prechecker.check(sentence)
+        resolved += result.resolved
+        corrected += bool(result.corrections)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "patterns": len(prechecker.variants),
+        "compile_ms": round(compile_ms, 2),
+        "sentences": len(sentences),
+        "sentences_per_second": round(len(sentences) / elapsed, 1),
+        "mean_us_per_sentence": round(elapsed / len(sentences) * 1e6, 2),
+        "resolved_locally_ratio": round(resolved / len(sentences), 3),
+        "with_corrections_ratio": round(corrected / len(sentences), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_retrieval.py
+"""Compares per-query retrieval latency of the Chroma and in-memory NumPy backends.
+
+Query vectors are perturbed copies of the stored rule embeddings, so no API key is needed.
+
+    python -m benchmarks.bench_retrieval --queries 500 --batch-size 32
+"""
+import os
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+import numpy as np
+import chromadb
+from src.core.retriever import ChromaRetriever, NumpyRetriever
+
+COLLECTION_NAME = "unified_knowledge_base"
+SOURCES = ["spelling_and_terminology", "grammar_and_style"]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    return float(np.percentile(values, pct)) if values else 0.0
+
+
+def _summarize(latencies_ms: list[float], queries: int, elapsed_s: float) -> dict:
+    return {
+        "p50_ms": round(_percentile(latencies_ms, 50), 4),
+        "p95_ms": round(_percentile(latencies_ms, 95), 4),
+        "p99_ms": round(_percentile(latencies_ms, 99), 4),
+        "mean_ms": round(statistics.fmean(latencies_ms), 4),
+        "queries_per_second": round(queries / elapsed_s, 1),
+    }
+
+
+def bench_single(retriever, queries: np.ndarray, n_results: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        retriever.query([q], SOURCES[i % len(SOURCES)], n_results=n_results)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return _summarize(latencies, len(queries), time.perf_counter() - start)
+
+
+def bench_batched(retriever, queries: np.ndarray, n_results: int, batch_size: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for n, offset in enumerate(range(0, len(queries), batch_size)):
+        batch = queries[offset:offset + batch_size]
+        t0 = time.perf_counter()
+        retriever.query(batch, SOURCES[n % len(SOURCES)], n_results=n_results)
+        # Reported per query so the numbers are comparable with the single-query run.
+        latencies.append((time.perf_counter() - t0) * 1000 / len(batch))
+    return _summarize(latencies, len(queries), time.perf_counter() - start)
+
+
+def run(collection, args) -> dict:
+    stored = np.asarray(collection.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+    rng = np.random.default_rng(args.seed)
+    queries = stored[rng.integers(0, len(stored), args.queries)]
+    queries = queries + rng.normal(0, 0.02, queries.shape).astype(np.float32)
+
+    report = {"rules": len(stored), "dimensions": int(stored.shape[1]), "queries": args.queries, "backends": {}}
+    for name, retriever in [("chroma", ChromaRetriever(collection)), ("numpy", NumpyRetriever(collection))]:
+        retriever.query(queries[:1], SOURCES[0], n_results=args.n_results)  # warm up
+        report["backends"][name] = {
+            "single": bench_single(retriever, queries, args.n_results),
+            "batched": bench_batched(retriever, queries, args.n_results, args.batch_size),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-path", default="db")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--n-results", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Chroma writes to its directory even when only read: benchmark a scratch copy so a run
+    # never modifies the tracked db/.
+    with tempfile.TemporaryDirectory(prefix="bench-retrieval-") as workdir:
+        db_copy = os.path.join(workdir, "db")
+        shutil.copytree(args.db_path, db_copy)
+        collection = chromadb.PersistentClient(path=db_copy).get_collection(name=COLLECTION_NAME)
+        report = run(collection, args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
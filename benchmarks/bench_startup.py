@@ -0,0 +1,127 @@
+# benchmarks/bench_startup.py
+"""Worker boot benchmark: import time of the app, time until /ready, and first-request latency.
+
+Every sample runs in a fresh interpreter so nothing is already imported or cached. Gemini is
+replaced by zero-latency fakes, so the numbers are the worker's own start-up cost.
+
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import platform
+import subprocess
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What the app opens relative to its working directory.
+WORKING_COPIES = ["db", "data"]
+FEEDBACK_DB = "feedback.db"
+
+FIRST_REQUEST = {"texts": ["Top up your Hugosave account before you withdraw."]}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per mode")
+    parser.add_argument("--modes", nargs="+", default=["lazy", "warmup"], choices=["lazy", "warmup"])
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--child", choices=["lazy", "warmup"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def measure_once(mode: str) -> dict:
+    """Runs inside the child process."""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("EMBEDDING_STORE_PATH", tempfile.mkdtemp(prefix="bench-embeddings-"))
+    start = time.perf_counter()
+    from src import main
+    sample = {"import_ms": elapsed_ms(start)}
+
+    from fastapi.testclient import TestClient
+    from src.services.container import ServiceContainer
+    from src.services.gemini_client import AsyncGeminiClient
+    from .fake_gemini import FakeGenerativeModel, FakeEmbedder, LatencyDistribution, FaultProfile
+
+    rng = random.Random(0)
+    client = AsyncGeminiClient(
+        model=FakeGenerativeModel(LatencyDistribution("fixed:0", rng), FaultProfile()),
+        embedder=FakeEmbedder(LatencyDistribution("fixed:0", rng)),
+    )
+    main.app.state.services = ServiceContainer(gemini_client=client, warmup=mode == "warmup")
+
+    start = time.perf_counter()
+    with TestClient(main.app) as http:
+        while http.get("/ready").status_code != 200:
+            time.sleep(0.005)
+        sample["ready_ms"] = elapsed_ms(start)
+        sample["services_ms"] = main.app.state.services.timings_ms
+
+        for name in ("first_request_ms", "second_request_ms"):
+            request_start = time.perf_counter()
+            response = http.post("/v1/spell-check", json=FIRST_REQUEST)
+            sample[name] = elapsed_ms(request_start)
+            response.raise_for_status()
+    return sample
+
+
+def run_child(mode: str) -> dict:
+    # Start-up migrates feedback.db and Chroma writes to db/: boot each child in a scratch
+    # directory so a benchmark never modifies the tracked copies.
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        for name in WORKING_COPIES:
+            shutil.copytree(os.path.join(REPO_ROOT, name), os.path.join(workdir, name))
+        if os.path.exists(os.path.join(REPO_ROOT, FEEDBACK_DB)):
+            shutil.copy2(os.path.join(REPO_ROOT, FEEDBACK_DB), os.path.join(workdir, FEEDBACK_DB))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list[dict]) -> dict:
+    summary = {}
+    for key in ("import_ms", "ready_ms", "first_request_ms", "second_request_ms"):
+        values = np.array([s[key] for s in samples])
+        summary[key] = {"median": round(float(np.median(values)), 1), "max": round(float(values.max()), 1)}
+    return summary
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        print(json.dumps(measure_once(args.child)))
+        return
+
+    report = {"python": platform.python_version(), "runs": args.runs, "modes": {}}
+    for mode in args.modes:
+        samples = [run_child(mode) for _ in range(args.runs)]
+        report["modes"][mode] = {"summary": summarize(samples), "samples": samples}
+        summary = report["modes"][mode]["summary"]
+        print(f"{mode}: import {summary['import_ms']['median']} ms, ready {summary['ready_ms']['median']} ms, "
+              f"first request {summary['first_request_ms']['median']} ms", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
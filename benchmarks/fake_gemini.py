@@ -0,0 +1,182 @@
+# benchmarks/fake_gemini.py
+"""Local stand-ins for the Gemini generative model and embedding API.
+
+They plug into GeminiClient(model=..., embedder=...) so the real prompt building, parsing,
+chunking and caching code runs unchanged; only the network round trip is simulated.
+"""
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import numpy as np
+from src.services.prompt_builder import SYSTEM_INSTRUCTIONS, decode_sentences
+
+try:
+    from google.api_core.exceptions import ServiceUnavailable, ResourceExhausted
+except ImportError:  # keep the fakes importable without google-api-core
+    class ServiceUnavailable(Exception):
+        pass
+
+    class ResourceExhausted(Exception):
+        pass
+
+EMBEDDING_DIMENSIONS = 768
+
+
+class LatencyDistribution:
+    """Parses specs like "fixed:200", "uniform:100:400", "lognormal:300:0.5" (median ms, sigma)
+    or "exp:300" (mean ms) and samples delays in seconds."""
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.rng = rng
+        if kind not in ("fixed", "uniform", "lognormal", "exp"):
+            raise ValueError(f"Unknown latency distribution '{spec}'.")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(p[0], p[1])
+        elif self.kind == "lognormal":
+            ms = p[0] * self.rng.lognormvariate(0.0, p[1])
+        else:
+            ms = self.rng.expovariate(1.0 / p[0])
+        return max(0.0, ms) / 1000.0
+
+
+class FaultProfile:
+    """Per-call probabilities of the failure modes seen from the real API."""
+
+    def __init__(self, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 truncate_rate: float = 0.0, malformed_rate: float = 0.0, correction_rate: float = 0.2):
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate = truncate_rate
+        self.malformed_rate = malformed_rate
+        self.correction_rate = correction_rate
+
+
+class FakeUsage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        # Same rough 4 characters/token ratio the chunk planner assumes.
+        self.usage_metadata = FakeUsage(len(prompt) // 4, len(text) // 4)
+
+
+def extract_sentences(prompt: str) -> list[str]:
+    """Recovers the input sentences, by id, from a prompt built by prompt_builder.build_prompt."""
+    return decode_sentences(prompt)
+
+
+def check_type_of(prompt: str) -> str:
+    return next(check_type for check_type, system in SYSTEM_INSTRUCTIONS.items() if prompt.startswith(system))
+
+
+class FakeGenerativeModel:
+    """Answers proofreading prompts with well-formed results after a sampled delay,
+    or fails in one of the configured ways."""
+
+    def __init__(self, latency: LatencyDistribution, faults: FaultProfile, seed: int = 0):
+        self.latency = latency
+        self.faults = faults
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = {"error": 0, "rate_limit": 0, "truncated": 0, "malformed": 0}
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            self.calls += 1
+            return self.latency.sample(), self.rng.random()
+
+    def _answer(self, prompt: str, roll: float) -> FakeResponse:
+        f = self.faults
+        if roll < f.error_rate:
+            self.failures["error"] += 1
+            raise ServiceUnavailable("Fake Gemini: service unavailable.")
+        roll -= f.error_rate
+        if roll < f.rate_limit_rate:
+            self.failures["rate_limit"] += 1
+            raise ResourceExhausted("Fake Gemini: quota exceeded.")
+        roll -= f.rate_limit_rate
+        if roll < f.malformed_rate:
+            self.failures["malformed"] += 1
+            return FakeResponse('{"results": [{"original_text": oops}', prompt)
+
+        rewrite = check_type_of(prompt) == "UX_WRITING"
+        results = []
+        for sentence_id, sentence in enumerate(extract_sentences(prompt)):
+            words = sentence.split()
+            flagged = words and self._stable_fraction(sentence) < f.correction_rate
+            corrections = []
+            if flagged and rewrite:
+                corrections.append({"suggestion": " ".join(words[:-1] + [words[-1].upper()])})
+            elif flagged:
+                corrections.append({"original": words[-1], "suggestion": words[-1].upper()})
+            results.append({"id": sentence_id, "corrections": corrections})
+        text = json.dumps({"results": results})
+
+        roll -= f.malformed_rate
+        if roll < f.truncate_rate:
+            self.failures["truncated"] += 1
+            text = text[: max(1, len(text) // 2)]
+        return FakeResponse(text, prompt)
+
+    @staticmethod
+    def _stable_fraction(text: str) -> float:
+        return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+    def generate_content(self, prompt, generation_config=None, **kwargs) -> FakeResponse:
+        delay, roll = self._draw()
+        time.sleep(delay)
+        return self._answer(prompt, roll)
+
+    async def generate_content_async(self, prompt, generation_config=None, **kwargs) -> FakeResponse:
+        delay, roll = self._draw()
+        await asyncio.sleep(delay)
+        return self._answer(prompt, roll)
+
+
+class FakeEmbedder:
+    """Drop-in for genai.embed_content(_async): deterministic unit vectors derived from the text."""
+
+    def __init__(self, latency: LatencyDistribution, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.latency = latency
+        self.dimensions = dimensions
+        self.calls = 0
+        self.texts = 0
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _embed(self, content) -> dict:
+        self.calls += 1
+        if isinstance(content, str):
+            self.texts += 1
+            return {"embedding": self._vector(content)}
+        self.texts += len(content)
+        return {"embedding": [self._vector(t) for t in content]}
+
+    def embed_content(self, model, content, task_type=None, **kwargs) -> dict:
+        time.sleep(self.latency.sample())
+        return self._embed(content)
+
+    async def embed_content_async(self, model, content, task_type=None, **kwargs) -> dict:
+        await asyncio.sleep(self.latency.sample())
+        return self._embed(content)
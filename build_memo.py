@@ -0,0 +1,21 @@
+# build_memo.py
+import argparse
+from src.core.correction_memo import CORRECTION_MEMO_PATH, MIN_VOTES, MIN_RATIO, build_memo, write_memo
+from src.core.database import DB_PATH
+from src.core.logging_config import configure_logging
+
+configure_logging()
+
+# Run periodically (e.g. from cron): the API reloads the memo file when it changes.
+parser = argparse.ArgumentParser(description="Aggregates feedback.db into the correction memo served by the API.")
+parser.add_argument("--db", default=DB_PATH)
+parser.add_argument("--output", default=CORRECTION_MEMO_PATH)
+parser.add_argument("--min-votes", type=int, default=MIN_VOTES)
+parser.add_argument("--min-ratio", type=float, default=MIN_RATIO)
+args = parser.parse_args()
+
+memo = build_memo(args.db, args.min_votes, args.min_ratio)
+write_memo(memo, args.output)
+
+print(f"✅ Correction memo written to {args.output}: {len(memo['apply'])} fixes to apply, "
+      f"{len(memo['suppress'])} corrections to suppress (from {memo['feedback_pairs']} corrections with feedback).")
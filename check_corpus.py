@@ -0,0 +1,39 @@
+# check_corpus.py
+import json
+import asyncio
+import argparse
+from src.core.checks import CHECK_TYPES
+from src.core.corpus_checker import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, CorpusChecker
+from src.core.embedding_store import get_embedding_store
+from src.core.ignore_list import IgnoreIndex, IGNORE_FILE_PATH
+from src.core.logging_config import configure_logging
+from src.core.spell_checker import AsyncSpellChecker
+from src.services.gemini_client import AsyncGeminiClient
+from src.services.quota_scheduler import BULK, request_priority
+
+configure_logging()
+
+# Re-running with the same --output resumes from its checkpoint; --previous reuses the
+# results of an earlier run for strings that haven't changed since.
+parser = argparse.ArgumentParser(description="Checks a JSONL or CSV string catalogue offline and writes results as JSONL.")
+parser.add_argument("input", help="JSONL (objects or plain strings) or .csv with a header row")
+parser.add_argument("--output", required=True)
+parser.add_argument("--check", choices=list(CHECK_TYPES), default="spell-check")
+parser.add_argument("--previous", help="output of an earlier run whose still-valid results are reused")
+parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+parser.add_argument("--text-field", default="text")
+parser.add_argument("--id-field", default="id")
+args = parser.parse_args()
+
+spell_checker = AsyncSpellChecker(
+    AsyncGeminiClient(), ignore_index=IgnoreIndex(IGNORE_FILE_PATH), embedding_store=get_embedding_store()
+)
+checker = CorpusChecker(spell_checker, args.check, args.batch_size, args.workers)
+
+# Bulk work only uses quota the API isn't using.
+with request_priority(BULK):
+    report = asyncio.run(checker.run(args.input, args.output, args.previous, args.text_field, args.id_field))
+
+print(json.dumps(report, indent=2))
+print(f"✅ Results written to {args.output}")
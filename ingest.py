@@ -1,10 +1,16 @@
 # ingest.py
 import os
-import json
-import chromadb
+import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
-
+from src.core.ingestion import (
+    KNOWLEDGE_BASE_DIR, COLLECTION_NAME, KnowledgeBaseFormatError,
+    get_or_create_collection, sync_knowledge_base,
+)
+from src.core.logging_config import configure_logging
+from src.services.quota_scheduler import BULK, request_priority
+
+configure_logging()
 print("Starting knowledge base ingestion...")
 
 # --- Configuration ---
@@ -14,9 +20,9 @@ if not api_key:
     raise ValueError("GEMINI_API_KEY not found.")
 genai.configure(api_key=api_key)
 
-KNOWLEDGE_BASE_DIR = "data/knowledge_bases"
-DB_PATH = "db"
-COLLECTION_NAME = "unified_knowledge_base"
+# --rebuild drops the collection and re-adds every rule; the default only touches what changed.
+# Either way, rules already in the embedding store (EMBEDDING_STORE_PATH) are not re-embedded.
+rebuild = "--rebuild" in sys.argv[1:]
 
 if not os.path.isdir(KNOWLEDGE_BASE_DIR):
     print(f"Error: Knowledge base directory not found at '{KNOWLEDGE_BASE_DIR}'")
@@ -24,74 +30,17 @@ if not os.path.isdir(KNOWLEDGE_BASE_DIR):
     exit()
 
 # --- Database Setup ---
-client = chromadb.PersistentClient(path=DB_PATH)
-if COLLECTION_NAME in [c.name for c in client.list_collections()]:
-    print(f"Collection '{COLLECTION_NAME}' already exists. Deleting it.")
-    client.delete_collection(name=COLLECTION_NAME)
-collection = client.create_collection(name=COLLECTION_NAME)
-print(f"Created new collection: {COLLECTION_NAME}")
-
-# --- Data Processing and Ingestion ---
-all_contents = []
-all_metadatas = []
-all_ids = []
-doc_id_counter = 0
-
-# Read all .json files from the knowledge base directory
-for filename in os.listdir(KNOWLEDGE_BASE_DIR):
-    if filename.endswith(".json"):
-        # The source_id will be the filename without the extension
-        # e.g., "spelling_and_terminology" or "grammar_and_style"
-        source_id = filename.replace(".json", "")
-        print(f"Processing source: {source_id}...")
-        
-        file_path = os.path.join(KNOWLEDGE_BASE_DIR, filename)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            for item in data:
-                # --- THIS IS THE KEY CHANGE ---
-                # Construct a descriptive document from the structured JSON
-                try:
-                    guideline = item.get("guideline", "No guideline provided.")
-                    incorrect = item.get("incorrect_example", "N/A")
-                    correct = item.get("correct_example", "N/A")
-                    explanation = item.get("explanation", "No explanation provided.")
-
-                    # This creates a rich, searchable string for the database
-                    content = (
-                        f"Guideline: {guideline} "
-                        f"Incorrect Example: '{incorrect}'. "
-                        f"Correct Example: '{correct}'. "
-                        f"Reason: {explanation}"
-                    )
-                    
-                    all_contents.append(content)
-                    # Add the source_id to the metadata for filtering
-                    all_metadatas.append({"source": source_id})
-                    all_ids.append(f"doc_{doc_id_counter}")
-                    doc_id_counter += 1
-                except (TypeError, AttributeError):
-                    print(f"\n--- ERROR ---")
-                    print(f"Invalid format in {filename}: Item '{item}' is not a valid dictionary or is missing keys.")
-                    exit()
-
-if not all_contents:
-    print("No documents found to ingest.")
-else:
-    print(f"Found {len(all_contents)} total rules to process.")
-    print("Generating embeddings...")
-    result = genai.embed_content(
-        model="models/text-embedding-004",
-        content=all_contents,
-        task_type="RETRIEVAL_DOCUMENT"
-    )
-    embeddings = result['embedding']
-    print("Embeddings generated.")
+collection = get_or_create_collection(rebuild=rebuild)
+print(f"Using collection: {COLLECTION_NAME}")
+
+# --- Incremental Ingestion ---
+try:
+    with request_priority(BULK):
+        stats = sync_knowledge_base(collection)
+except KnowledgeBaseFormatError as e:
+    print(f"\n--- ERROR ---")
+    print(e)
+    exit()
 
-    collection.add(
-        embeddings=embeddings,
-        documents=all_contents,
-        metadatas=all_metadatas,
-        ids=all_ids
-    )
-    print(f"✅ Successfully ingested {collection.count()} rules into the database.")
\ No newline at end of file
+print(f"✅ Knowledge base holds {collection.count()} rules "
+      f"({stats['added']} embedded, {stats['removed']} removed, {stats['unchanged']} unchanged).")
@@ -0,0 +1,253 @@
+# src/core/brand_prechecker.py
+import os
+import re
+import json
+import difflib
+import itertools
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SPELLING_KB_PATH = "data/knowledge_bases/spelling_and_terminology.json"
+
+# Categories whose incorrect -> correct examples are safe to turn into literal replacements.
+# Punctuation and validation rules need judgement and are left to the model.
+MECHANICAL_CATEGORIES = {"Defined Terminology", "Capitalization", "Compound Words", "Spelling", "Abbreviations"}
+TERM_CATEGORIES = {"Defined Terminology", "Capitalization", "Compound Words"}
+HASHTAG_CATEGORY = "Hashtags"
+
+# Sentences up to this many words whose words are all known locally never reach Gemini.
+LOCAL_MAX_WORDS = int(os.getenv("BRAND_PRECHECK_MAX_WORDS", 4))
+
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'’-]*")
+HASHTAG_PATTERN = re.compile(r"(?<![\w#])#\w+")
+QUOTED_TERM_PATTERN = re.compile(r"'([A-Z][\w-]*(?: [A-Za-z][\w-]*)*)'")
+LISTED_TERMS_PATTERN = re.compile(r"\blike ((?:[A-Z][\w-]*, )+(?:and )?[A-Z][\w-]*)")
+NOT_SPELLING_PATTERN = re.compile(r"'([a-z]+)' \(not '([a-z]+)'\)")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every occurrence of every pattern."""
+
+    def __init__(self, patterns: list[str]):
+        self.lengths = [len(p) for p in patterns]
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(pattern_id)
+
+        # Breadth-first pass to wire failure links and inherit outputs from suffixes.
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                candidate = self.goto[f].get(ch, 0)
+                self.fail[nxt] = candidate if candidate != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """Yields (start, end, pattern_id) for every match, overlapping ones included."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for pattern_id in self.out[node]:
+                yield i + 1 - self.lengths[pattern_id], i + 1, pattern_id
+
+
+class PrecheckResult:
+    __slots__ = ("corrections", "resolved")
+
+    def __init__(self, corrections: list, resolved: bool):
+        self.corrections = corrections
+        self.resolved = resolved
+
+    def as_result(self, sentence: str) -> dict:
+        return {
+            "original_text": sentence,
+            "is_correct": len(self.corrections) == 0,
+            "corrections": self.corrections
+        }
+
+
+def _lower_same_length(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+def _separator_variants(term: str) -> set[str]:
+    """Every spacing of a term: 'Multi-currency Account' -> {'multi-currency account',
+    'multi currency account', 'multicurrency-account', ...}."""
+    parts = re.split(r"[ -]", term.lower())
+    variants = set()
+    for separators in itertools.product((" ", "-", ""), repeat=len(parts) - 1):
+        variants.add(parts[0] + "".join(sep + part for sep, part in zip(separators, parts[1:])))
+    return variants
+
+
+def _example_variants(wrong: str, right: str) -> set[str]:
+    """The example's incorrect phrase, plus its other spacings when spacing is all it gets
+    wrong: ('Cash back', 'Cashback') -> {'cash back', 'cash-back', 'cashback'}."""
+    variants = _separator_variants(wrong)
+    if "".join(re.split(r"[ -]", right.lower())) in variants:
+        return variants
+    return {wrong.lower()}
+
+
+def _example_replacements(incorrect: str, correct: str) -> list[tuple[str, str]]:
+    """Word-level diff of an incorrect/correct example pair, e.g. ('Cash back', 'Cashback')."""
+    def tokens(text: str) -> list[str]:
+        words = text.split()
+        if words:
+            words[-1] = words[-1].rstrip(".!?")
+        return words
+
+    a, b = tokens(incorrect), tokens(correct)
+    replacements = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(a=a, b=b, autojunk=False).get_opcodes():
+        if tag == "replace":
+            replacements.append((" ".join(a[i1:i2]), " ".join(b[j1:j2])))
+    return replacements
+
+
+class BrandPrechecker:
+    """Deterministic TYPO_BRAND checks compiled from the spelling and terminology knowledge base."""
+
+    def __init__(self, rules: list[dict]):
+        self.canonical = []
+        variant_to_rule = {}
+        self.hashtags_lowercase = False
+
+        def add(variant: str, canonical: str):
+            variant = variant.lower()
+            if variant and variant not in variant_to_rule:
+                if canonical not in self.canonical:
+                    self.canonical.append(canonical)
+                variant_to_rule[variant] = self.canonical.index(canonical)
+
+        for rule in rules:
+            category = rule.get("category", "")
+            text = f"{rule.get('guideline', '')} {rule.get('explanation', '')}"
+
+            if category == HASHTAG_CATEGORY:
+                self.hashtags_lowercase = True
+                continue
+            if category not in MECHANICAL_CATEGORIES:
+                continue
+
+            for wrong, right in _example_replacements(rule.get("incorrect_example", ""), rule.get("correct_example", "")):
+                for variant in _example_variants(wrong, right):
+                    add(variant, right)
+            for right, wrong in NOT_SPELLING_PATTERN.findall(text):
+                add(wrong, right)
+
+            if category in TERM_CATEGORIES:
+                terms = QUOTED_TERM_PATTERN.findall(text)
+                for listed in LISTED_TERMS_PATTERN.findall(text):
+                    terms.extend(t.strip() for t in re.split(r",\s*(?:and\s+)?", listed))
+                for term in terms:
+                    for variant in _separator_variants(term):
+                        add(variant, term)
+
+        # Words of the terms themselves; rule prose would make stop-words like 'the' count as known.
+        self.known_words = {w.lower() for term in self.canonical for w in WORD_PATTERN.findall(term)}
+        self.variants = list(variant_to_rule)
+        self.variant_rules = [variant_to_rule[v] for v in self.variants]
+        self.matcher = AhoCorasick(self.variants)
+        logger.info("Brand pre-checker compiled %d patterns for %d terms.", len(self.variants), len(self.canonical))
+
+    @classmethod
+    def from_file(cls, path: str = SPELLING_KB_PATH) -> "BrandPrechecker":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _suggestion(self, surface: str, canonical: str) -> str:
+        # Brand terms have one fixed spelling; plain spellings ('colour') follow the input's capitalisation.
+        if canonical != canonical.lower():
+            return canonical
+        if surface[:1].isupper():
+            return canonical[:1].upper() + canonical[1:]
+        return canonical
+
+    def _find_terms(self, sentence: str) -> list[tuple[int, int, int]]:
+        lowered = _lower_same_length(sentence)
+        matches = []
+        for start, end, pattern_id in self.matcher.iter_matches(lowered):
+            before = sentence[start - 1] if start > 0 else " "
+            after = sentence[end] if end < len(sentence) else " "
+            # Whole words only, and never inside a hashtag (the hashtag rule owns those).
+            if before.isalnum() or before == "#" or (after.isalnum() and sentence[end - 1].isalnum()):
+                continue
+            matches.append((start, end, pattern_id))
+
+        # Leftmost-longest, non-overlapping.
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        last_end = -1
+        for start, end, pattern_id in matches:
+            if start >= last_end:
+                selected.append((start, end, pattern_id))
+                last_end = end
+        return selected
+
+    def check(self, sentence: str, known_spans=()) -> PrecheckResult:
+        """`known_spans` are (start, end) ranges another local source already handles; words in
+        them count as known when deciding whether the sentence can skip the model."""
+        corrections = []
+        covered = list(known_spans)
+        for start, end, pattern_id in self._find_terms(sentence):
+            surface = sentence[start:end]
+            suggestion = self._suggestion(surface, self.canonical[self.variant_rules[pattern_id]])
+            covered.append((start, end))
+            if surface != suggestion:
+                corrections.append({"type": "TYPO_BRAND", "original": surface, "suggestion": suggestion})
+
+        if self.hashtags_lowercase:
+            for match in HASHTAG_PATTERN.finditer(sentence):
+                covered.append(match.span())
+                if match.group() != match.group().lower():
+                    corrections.append({"type": "TYPO_BRAND", "original": match.group(), "suggestion": match.group().lower()})
+
+        return PrecheckResult(corrections, self._fully_known(sentence, covered))
+
+    def _fully_known(self, sentence: str, covered: list[tuple[int, int]]) -> bool:
+        words = list(WORD_PATTERN.finditer(sentence))
+        if len(words) > LOCAL_MAX_WORDS:
+            return False
+        tokens = [word.group().lower() for word in words]
+        if any(a == b for a, b in zip(tokens, tokens[1:])):
+            return False  # 'the the account' is a typo the model should see
+        for word in words:
+            inside_term = any(start <= word.start() and word.end() <= end for start, end in covered)
+            if not inside_term and word.group().lower() not in self.known_words:
+                return False
+        return True
+
+
+def merge_corrections(result: dict, corrections: list) -> dict:
+    """Adds local corrections the model did not already report for the same phrase."""
+    if not corrections:
+        return result
+    existing = {(c.get("original") or "").lower() for c in result.get("corrections", [])}
+    merged = list(result.get("corrections", []))
+    merged.extend(c for c in corrections if c["original"].lower() not in existing)
+    return {**result, "is_correct": len(merged) == 0, "corrections": merged}
@@ -0,0 +1,20 @@
+# src/core/checks.py
+# The checks the API exposes, by endpoint name; shared with the offline corpus checker.
+CHECK_TYPES = {"spell-check": "TYPO_BRAND", "content-check": "UX_WRITING", "full-check": "FULL_CHECK"}
+# Sentences with more words than this get a UX rewrite.
+UX_WRITING_MAX_SKIPPED_WORDS = 3
+
+
+def ux_writing_candidates(texts: list[str]) -> list[int]:
+    """Indices of the sentences worth a UX rewrite: only those with more than 3 words."""
+    return [i for i, sentence in enumerate(texts) if len(sentence.split()) > UX_WRITING_MAX_SKIPPED_WORDS]
+
+
+async def run_check(spell_checker, check: str, sentences: list[str], timings: list | None = None) -> list:
+    """Runs the check named like its endpoint. Sentences that failed or were not eligible get no result."""
+    if check == "spell-check":
+        return await spell_checker.batch_check_sentences(sentences, "TYPO_BRAND", timings)
+    indices = ux_writing_candidates(sentences)
+    if check == "content-check":
+        return await spell_checker.batch_check_sentences([sentences[i] for i in indices], "UX_WRITING", timings)
+    return await spell_checker.full_check_sentences(sentences, indices, timings)
@@ -0,0 +1,115 @@
+# src/core/chunking.py
+import os
+import math
+from dataclasses import dataclass, asdict, field
+from .metrics import StageSink
+
+# Rough English average for Gemini tokenizers; good enough for budgeting, not for billing.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+@dataclass
+class ChunkPolicy:
+    """Budget for one Gemini call. Every limit is per chunk except max_concurrency."""
+    max_prompt_tokens: int
+    max_output_tokens: int
+    max_sentences: int
+    max_concurrency: int
+    # Instructions + retrieved rules sent with every chunk.
+    prompt_overhead_tokens: int = 900
+    # JSON wrapping around every sentence in the output ({"id": .., "corrections": [...]}).
+    output_overhead_tokens: int = 12
+    # How many times a sentence's own tokens are expected to appear in the output; the
+    # sentence itself isn't echoed, only the phrases corrected.
+    output_multiplier: float = 0.5
+
+    def prompt_tokens_for(self, sentence: str) -> int:
+        return estimate_tokens(sentence) + 4
+
+    def output_tokens_for(self, sentence: str) -> int:
+        return int(estimate_tokens(sentence) * self.output_multiplier) + self.output_overhead_tokens
+
+    @classmethod
+    def for_check_type(cls, check_type: str) -> "ChunkPolicy":
+        """Default policy for a check_type, overridable with CHUNK_<FIELD>_<CHECK_TYPE> env vars."""
+        base = DEFAULT_POLICIES.get(check_type, DEFAULT_POLICIES["TYPO_BRAND"])
+        overrides = {}
+        for field, value in asdict(base).items():
+            env_value = os.getenv(f"CHUNK_{field.upper()}_{check_type}")
+            if env_value is not None:
+                overrides[field] = type(value)(env_value)
+        return cls(**{**asdict(base), **overrides})
+
+
+DEFAULT_POLICIES = {
+    "TYPO_BRAND": ChunkPolicy(
+        max_prompt_tokens=6000, max_output_tokens=4000, max_sentences=40, max_concurrency=4,
+    ),
+    # A rewrite returns the whole sentence as its suggestion, so the output side is heavier.
+    "UX_WRITING": ChunkPolicy(
+        max_prompt_tokens=6000, max_output_tokens=4000, max_sentences=20, max_concurrency=4,
+        output_multiplier=1.5, output_overhead_tokens=20,
+    ),
+}
+
+
+@dataclass
+class ChunkTiming(StageSink):
+    chunk_index: int
+    sentences: int
+    est_prompt_tokens: int
+    est_output_tokens: int
+    elapsed_ms: int = 0
+    ok: bool = True
+    attempts: int = 1
+    check_type: str | None = None
+    stages_ms: dict = field(default_factory=dict)
+    prompt_chars: int = 0
+    response_chars: int = 0
+    errors: int = 0
+
+
+def plan_chunks(sentences: list[str], policy: ChunkPolicy) -> list[list[int]]:
+    """Greedily packs sentence indices into chunks that stay within the policy's token budgets.
+
+    A single sentence larger than the budget still gets a chunk of its own.
+    """
+    chunks = []
+    current = []
+    prompt_tokens = policy.prompt_overhead_tokens
+    output_tokens = 0
+
+    for i, sentence in enumerate(sentences):
+        p = policy.prompt_tokens_for(sentence)
+        o = policy.output_tokens_for(sentence)
+        over_budget = (
+            prompt_tokens + p > policy.max_prompt_tokens
+            or output_tokens + o > policy.max_output_tokens
+            or len(current) >= policy.max_sentences
+        )
+        if current and over_budget:
+            chunks.append(current)
+            current = []
+            prompt_tokens = policy.prompt_overhead_tokens
+            output_tokens = 0
+        current.append(i)
+        prompt_tokens += p
+        output_tokens += o
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_timing_for(chunk_index: int, chunk: list[str], policy: ChunkPolicy, check_type: str | None = None) -> ChunkTiming:
+    return ChunkTiming(
+        chunk_index=chunk_index,
+        check_type=check_type,
+        sentences=len(chunk),
+        est_prompt_tokens=policy.prompt_overhead_tokens + sum(policy.prompt_tokens_for(s) for s in chunk),
+        est_output_tokens=sum(policy.output_tokens_for(s) for s in chunk),
+    )
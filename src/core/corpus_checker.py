@@ -0,0 +1,218 @@
+# src/core/corpus_checker.py
+import os
+import csv
+import json
+import time
+import asyncio
+import logging
+from .checks import run_check, ux_writing_candidates
+from .result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_WORKERS = 4
+# Estimated USD per million tokens; defaults are gemini-2.5-flash-lite list prices.
+INPUT_PRICE_PER_MILLION = float(os.getenv("GEMINI_INPUT_PRICE_PER_MILLION", 0.10))
+OUTPUT_PRICE_PER_MILLION = float(os.getenv("GEMINI_OUTPUT_PRICE_PER_MILLION", 0.40))
+
+
+def read_corpus(path: str, text_field: str = "text", id_field: str = "id"):
+    """Streams (id, text) from a .csv file (with a header row) or a JSONL file whose lines are
+    objects or plain strings. Rows without an id are numbered by position."""
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for n, row in enumerate(csv.DictReader(f)):
+                yield row.get(id_field) or str(n), row.get(text_field) or ""
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield str(n), record
+            else:
+                yield str(record.get(id_field, n)), record.get(text_field) or ""
+
+
+def load_valid_results(path: str | None, check: str, fingerprint: str) -> dict[str, dict]:
+    """Results from an earlier output file that still hold: same check, same knowledge base."""
+    if not path or not os.path.exists(path):
+        return {}
+    valid = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            if record.get("result") is not None and record.get("check") == check and record.get("fingerprint") == fingerprint:
+                valid[normalize_text(record["text"])] = record["result"]
+    return valid
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class CorpusChecker:
+    """Runs a whole string catalogue through the spell checker and writes one JSONL line per row.
+
+    Rows are read in batches of `batch_size` and up to `workers` batches are checked at once.
+    Output is written in input order as batches finish, and after each write a checkpoint
+    records how many rows and bytes are complete, so a crashed or interrupted run resumes
+    exactly where it stopped. Strings with a valid result in `previous` (an earlier run's output)
+    or already in this output are copied instead of checked. Rows that failed are written with
+    an "error"; running the same command again checks only those. Empty strings, and under
+    content-check strings too short to rewrite, are skipped with no result and no error.
+    """
+
+    def __init__(self, spell_checker, check: str = "spell-check", batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS):
+        self.spell_checker = spell_checker
+        self.check = check
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def _batches(self, rows, skip: int):
+        batch = []
+        for n, row in enumerate(rows):
+            if n < skip:
+                continue
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _eligible(self, text: str) -> bool:
+        # content-check only rewrites strings of more than 3 words; shorter ones get no result by design.
+        return bool(text) and (self.check != "content-check" or bool(ux_writing_candidates([text])))
+
+    async def _check_batch(self, batch: list, known: dict, fingerprint: str, stats: dict) -> list[str]:
+        pending = list(dict.fromkeys(text for _, text in batch if self._eligible(text) and normalize_text(text) not in known))
+        fresh = {}
+        if pending:
+            results = await run_check(self.spell_checker, self.check, pending, None)
+            fresh = {normalize_text(r["original_text"]): r for r in results}
+
+        lines = []
+        for row_id, text in batch:
+            key = normalize_text(text)
+            record = {"id": row_id, "text": text, "check": self.check, "fingerprint": fingerprint}
+            if key in known:
+                record["result"] = known[key]
+                stats["reused"] += 1
+            elif key in fresh:
+                record["result"] = fresh[key]
+                stats["checked"] += 1
+            elif not self._eligible(text):
+                record["result"] = None
+                stats["skipped"] += 1
+            else:
+                record["result"] = None
+                record["error"] = "no result"
+                stats["failed"] += 1
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        # Later batches reuse this one's results for repeated strings.
+        known.update((k, v) for k, v in fresh.items())
+        return lines
+
+    async def run(self, input_path: str, output_path: str, previous_path: str | None = None,
+                  text_field: str = "text", id_field: str = "id") -> dict:
+        checkpoint_path = f"{output_path}.checkpoint.json"
+        fingerprint = self.spell_checker.cache.kb_fingerprint.current()
+        checkpoint = {}
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("input") != input_path or checkpoint.get("check") != self.check:
+                raise ValueError(f"{checkpoint_path} belongs to another run; remove it or choose another output.")
+
+        known = load_valid_results(previous_path, self.check, fingerprint)
+        # Results already in the output are reused either way: after a crash for the rows being
+        # redone, after a finished run so that re-running it only retries the failed rows.
+        known.update(load_valid_results(output_path if checkpoint else None, self.check, fingerprint))
+        if checkpoint.get("complete"):
+            checkpoint = {}
+
+        rows_done = checkpoint.get("rows_done", 0)
+        output_bytes = checkpoint.get("output_bytes", 0)
+        stats = {"reused": 0, "checked": 0, "failed": 0, "skipped": 0, **checkpoint.get("stats", {})}
+        if rows_done:
+            logger.info("Resuming after %d rows.", rows_done)
+        usage_before = dict(self.spell_checker.client.usage)
+        start_time = time.perf_counter()
+
+        mode = "r+b" if rows_done and os.path.exists(output_path) else "wb"
+        with open(output_path, mode) as out:
+            # Drop anything written after the last checkpoint; those rows are redone.
+            out.truncate(output_bytes if mode == "r+b" else 0)
+            out.seek(0, os.SEEK_END)
+
+            semaphore = asyncio.Semaphore(self.workers)
+            tasks = []
+
+            async def check(batch: list) -> list[str]:
+                try:
+                    return await self._check_batch(batch, known, fingerprint, stats)
+                finally:
+                    semaphore.release()
+
+            def flush_ready():
+                nonlocal rows_done
+                while tasks and tasks[0][1].done():
+                    size, task = tasks.pop(0)
+                    out.write("".join(task.result()).encode("utf-8"))
+                    out.flush()
+                    rows_done += size
+                    self._save_checkpoint(checkpoint_path, input_path, rows_done, out.tell(), stats, usage_before, start_time)
+
+            for batch in self._batches(read_corpus(input_path, text_field, id_field), rows_done):
+                await semaphore.acquire()
+                tasks.append((len(batch), asyncio.create_task(check(batch))))
+                flush_ready()
+            while tasks:
+                await asyncio.wait([tasks[0][1]])
+                flush_ready()
+
+        report = self._report(rows_done, stats, usage_before, time.perf_counter() - start_time)
+        self._save_checkpoint(checkpoint_path, input_path, rows_done, os.path.getsize(output_path), stats, usage_before, start_time, complete=True)
+        return report
+
+    def _usage_since(self, before: dict) -> dict:
+        return {k: v - before.get(k, 0) for k, v in self.spell_checker.client.usage.items()}
+
+    def _save_checkpoint(self, path: str, input_path: str, rows_done: int, output_bytes: int, stats: dict,
+                         usage_before: dict, start_time: float, complete: bool = False):
+        _write_json(path, {
+            "input": input_path,
+            "check": self.check,
+            "rows_done": rows_done,
+            "output_bytes": output_bytes,
+            "complete": complete,
+            "stats": stats,
+            "usage": self._usage_since(usage_before),
+            "elapsed_seconds": round(time.perf_counter() - start_time, 1),
+        })
+
+    def _report(self, rows_done: int, stats: dict, usage_before: dict, elapsed: float) -> dict:
+        usage = self._usage_since(usage_before)
+        cost = (usage["prompt_tokens"] * INPUT_PRICE_PER_MILLION + usage["output_tokens"] * OUTPUT_PRICE_PER_MILLION) / 1_000_000
+        return {
+            "rows": rows_done,
+            **stats,
+            "elapsed_seconds": round(elapsed, 1),
+            # This run only; rows restored from the checkpoint aren't counted again.
+            "rows_per_second": round((stats["checked"] + stats["reused"] + stats["failed"]) / elapsed, 1) if elapsed else 0.0,
+            "gemini_calls": usage["calls"],
+            "failed_calls": usage["failed_calls"],
+            "prompt_tokens": usage["prompt_tokens"],
+            "output_tokens": usage["output_tokens"],
+            "estimated_cost_usd": round(cost, 4),
+        }
@@ -0,0 +1,242 @@
+# src/core/correction_memo.py
+import os
+import json
+import time
+import tempfile
+import threading
+import logging
+from datetime import datetime, timezone
+from .database import connect, DB_PATH
+from .brand_prechecker import AhoCorasick, merge_corrections
+from .checks import UX_WRITING_MAX_SKIPPED_WORDS
+from .result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+CORRECTION_MEMO_PATH = os.getenv("CORRECTION_MEMO_PATH", "data/correction_memo.json")
+# A decision is learned once at least MIN_VOTES users made it and at least MIN_RATIO of all
+# votes on that correction agree.
+MIN_VOTES = int(os.getenv("CORRECTION_MEMO_MIN_VOTES", 3))
+MIN_RATIO = float(os.getenv("CORRECTION_MEMO_MIN_RATIO", 0.8))
+# Longer originals are whole-sentence UX rewrites: they only ever match the same sentence. The
+# boundary is content-check's, so any sentence it sends to UX writing can be a learned rewrite.
+MAX_PHRASE_WORDS = UX_WRITING_MAX_SKIPPED_WORDS
+DEFAULT_CHECK_INTERVAL_SECONDS = 1.0
+
+
+# --- Aggregation job ---
+def build_memo(db_path: str = DB_PATH, min_votes: int = MIN_VOTES, min_ratio: float = MIN_RATIO) -> dict:
+    """Aggregates the feedback table into accepted corrections to apply and rejected ones to suppress.
+
+    "suggest" counts as a rejection of the offered correction and an acceptance of the user's own.
+    """
+    votes = {}
+
+    def vote(original, suggestion, accepted=0, rejected=0):
+        if not original or not suggestion or original == suggestion:
+            return
+        counts = votes.setdefault((original, suggestion), [0, 0])
+        counts[0] += accepted
+        counts[1] += rejected
+
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT original_text, corrected_text, action, COUNT(*) FROM feedback GROUP BY original_text, corrected_text, action"
+        ).fetchall()
+        suggested = conn.execute(
+            "SELECT original_text, suggested_text, COUNT(*) FROM feedback "
+            "WHERE action = 'suggest' AND suggested_text IS NOT NULL GROUP BY original_text, suggested_text"
+        ).fetchall()
+    finally:
+        conn.close()
+    for original, corrected, action, count in rows:
+        vote(original, corrected, accepted=count if action == "accept" else 0, rejected=count if action != "accept" else 0)
+    for original, suggestion, count in suggested:
+        vote(original, suggestion, accepted=count)
+
+    apply, suppress = {}, []
+    for (original, suggestion), (accepted, rejected) in votes.items():
+        entry = {"original": original, "suggestion": suggestion, "accepted": accepted, "rejected": rejected}
+        total = accepted + rejected
+        if accepted >= min_votes and accepted / total >= min_ratio:
+            # One fix per phrase: the most accepted one wins.
+            if original not in apply or accepted > apply[original]["accepted"]:
+                apply[original] = entry
+        elif rejected >= min_votes and rejected / total >= min_ratio:
+            suppress.append(entry)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "min_votes": min_votes,
+        "min_ratio": min_ratio,
+        "feedback_pairs": len(votes),
+        "apply": sorted(apply.values(), key=lambda e: e["original"]),
+        "suppress": sorted(suppress, key=lambda e: (e["original"], e["suggestion"])),
+    }
+
+
+def write_memo(memo: dict, path: str = CORRECTION_MEMO_PATH):
+    """Atomically replaces the memo file so running workers never read a partial one."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".correction_memo.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(memo, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# --- Serving ---
+class MemoMatch:
+    __slots__ = ("corrections", "spans", "result")
+
+    def __init__(self, corrections: list, spans: list[tuple[int, int]], result: dict | None = None):
+        self.corrections = corrections
+        self.spans = spans
+        # Set when the whole sentence has a learned fix and needs no model call.
+        self.result = result
+
+
+class _MemoIndex:
+    def __init__(self, memo: dict):
+        self.phrases = {}
+        self.sentences = {}
+        for entry in memo.get("apply", []):
+            if len(entry["original"].split()) > MAX_PHRASE_WORDS:
+                self.sentences[normalize_text(entry["original"])] = entry["suggestion"]
+            else:
+                self.phrases[entry["original"]] = entry["suggestion"]
+        self.suppressed = frozenset(
+            (e["original"].lower(), e["suggestion"].lower()) for e in memo.get("suppress", [])
+        )
+        self.patterns = list(self.phrases)
+        self.matcher = AhoCorasick(self.patterns) if self.patterns else None
+
+
+class CorrectionMemo:
+    """In-memory view of the correction memo file written by build_memo.py.
+
+    Before the model: learned phrases count as known words for the brand pre-checker, and a
+    sentence with a learned UX rewrite is answered without the model. On every returned
+    result, cached ones included: learned phrase fixes are added as TYPO_BRAND corrections and
+    corrections users repeatedly rejected are dropped. Like the ignore list, the file is
+    re-checked at most once per check interval and reloaded when it changed, so every worker
+    picks up a new memo without a restart.
+    """
+
+    def __init__(self, path: str = CORRECTION_MEMO_PATH, check_interval: float = DEFAULT_CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = _MemoIndex({})
+        self._signature = None
+        self._next_check = 0.0
+        self.lookups = 0
+        self.hits = 0
+        self.resolved = 0
+        self.applied = 0
+        self.suppressed = 0
+        self._reload()
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _reload(self):
+        signature = self._stat_signature()
+        memo = {}
+        if signature is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    memo = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Could not load correction memo %s: %s", self.path, e)
+        self._index = _MemoIndex(memo)
+        self._signature = signature
+        self._next_check = time.monotonic() + self.check_interval
+        if memo:
+            logger.info("Correction memo loaded: %d fixes, %d suppressions.",
+                        len(self._index.phrases) + len(self._index.sentences), len(self._index.suppressed))
+
+    def _refresh_if_changed(self):
+        if time.monotonic() < self._next_check:
+            return
+        with self._lock:
+            if self._stat_signature() != self._signature:
+                self._reload()
+            else:
+                self._next_check = time.monotonic() + self.check_interval
+
+    def check(self, sentence: str, check_type: str) -> MemoMatch:
+        """Learned fixes for one sentence. Pure lookup: stats are kept by record()."""
+        self._refresh_if_changed()
+        index = self._index
+        if check_type == "UX_WRITING":
+            rewrite = index.sentences.get(normalize_text(sentence))
+            if rewrite is None:
+                return MemoMatch([], [])
+            correction = {"type": "UX_WRITING", "original": sentence, "suggestion": rewrite}
+            return MemoMatch([correction], [(0, len(sentence))], {"original_text": sentence, "is_correct": False, "corrections": [correction]})
+
+        if check_type != "TYPO_BRAND" or index.matcher is None:
+            return MemoMatch([], [])
+        corrections, spans = [], []
+        last_end = -1
+        matches = sorted(index.matcher.iter_matches(sentence), key=lambda m: (m[0], -(m[1] - m[0])))
+        for start, end, pattern_id in matches:
+            before = sentence[start - 1] if start > 0 else " "
+            after = sentence[end] if end < len(sentence) else " "
+            # Whole words only; leftmost-longest, non-overlapping.
+            if start < last_end or before.isalnum() or after.isalnum():
+                continue
+            original = index.patterns[pattern_id]
+            corrections.append({"type": "TYPO_BRAND", "original": original, "suggestion": index.phrases[original]})
+            spans.append((start, end))
+            last_end = end
+        return MemoMatch(corrections, spans)
+
+    def record(self, applied: int, resolved: bool):
+        """Counts one sentence checked: `applied` learned fixes found, `resolved` if that spared a model call."""
+        self.lookups += 1
+        self.hits += applied > 0
+        self.applied += applied
+        self.resolved += applied > 0 and resolved
+
+    def apply_result(self, result: dict, check_type: str) -> dict:
+        """Adds the learned fixes for the result's sentence; a learned UX rewrite replaces the result."""
+        match = self.check(result["original_text"], check_type)
+        if match.result is not None:
+            return match.result
+        return merge_corrections(result, match.corrections)
+
+    def filter_result(self, result: dict) -> dict:
+        """Drops corrections users have repeatedly rejected."""
+        self._refresh_if_changed()
+        suppressed = self._index.suppressed
+        corrections = result.get("corrections", [])
+        if not suppressed or not corrections:
+            return result
+        kept = [
+            c for c in corrections
+            if ((c.get("original") or "").lower(), (c.get("suggestion") or "").lower()) not in suppressed
+        ]
+        if len(kept) == len(corrections):
+            return result
+        self.suppressed += len(corrections) - len(kept)
+        return {**result, "is_correct": len(kept) == 0, "corrections": kept}
+
+    def stats(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "resolved": self.resolved,
+            "applied": self.applied,
+            "suppressed": self.suppressed,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+        }
@@ -1,8 +1,21 @@
 # src/core/database.py
 import sqlite3
+import logging
 
-def init_db():
-    conn = sqlite3.connect("feedback.db")
+logger = logging.getLogger(__name__)
+
+DB_PATH = "feedback.db"
+
+def connect(db_path: str = DB_PATH, **kwargs) -> sqlite3.Connection:
+    """Opens a connection tuned for one writer and many readers (WAL, relaxed fsync)."""
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+def init_db(db_path: str = DB_PATH):
+    conn = connect(db_path)
     cursor = conn.cursor()
     # Create table if it doesn't exist
     cursor.execute("""
@@ -16,9 +29,12 @@ def init_db():
         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
     )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_correction_id ON feedback (correction_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_phrase ON feedback (original_text, corrected_text, action)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp)")
     conn.commit()
     conn.close()
-    print("Database initialized.")
+    logger.info("Database initialized.")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -0,0 +1,160 @@
+# src/core/documents.py
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from .checks import ux_writing_candidates
+
+DEFAULT_MAX_DOCUMENTS = int(os.getenv("DOCUMENT_STORE_MAX_DOCUMENTS", "1000"))
+
+# A sentence runs to terminal punctuation (plus closing quotes/brackets) followed by whitespace,
+# to a line break, or to the end of the text. "$1.50" and "e.g.x" stay whole: the full stop
+# there is not followed by whitespace.
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+[\"'”’)\]]*(?=\s|\Z)|(?=\n)|\Z)", re.DOTALL)
+# A sentence ending in one of these runs on into the next match on the same line: "Mr. Tan", "e.g. cards".
+_ABBREVIATIONS = frozenset({
+    "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "mt.",
+    "e.g.", "i.e.", "vs.", "approx.", "dept.", "est.", "inc.", "ltd.", "co.",
+})
+
+
+@dataclass
+class Segment:
+    start: int
+    end: int
+    text: str
+
+
+def segment_sentences(text: str) -> list[Segment]:
+    """Splits text into sentences with their [start, end) character offsets in `text`."""
+    segments = []
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group().rstrip()
+        if not sentence:
+            continue
+        start, end = match.start(), match.start() + len(sentence)
+        if segments and "\n" not in text[segments[-1].end:start]:
+            last_word = segments[-1].text.rsplit(None, 1)[-1].lower()
+            if last_word.lstrip("(\"'“‘") in _ABBREVIATIONS:
+                start = segments.pop().start
+        segments.append(Segment(start, end, text[start:end]))
+    return segments
+
+
+def locate_corrections(result: dict, segment: Segment) -> dict:
+    """Adds document `start`/`end` offsets to the result and to each correction whose
+    `original` phrase is found in the sentence (None when the model paraphrased it)."""
+    corrections = []
+    search_from = 0
+    for correction in result.get("corrections", []):
+        original = correction.get("original") or ""
+        position = segment.text.find(original, search_from) if original else -1
+        if position < 0 and original:
+            position = segment.text.find(original)
+        if position < 0:
+            corrections.append({**correction, "start": None, "end": None})
+            continue
+        search_from = position + len(original)
+        start = segment.start + position
+        corrections.append({**correction, "start": start, "end": start + len(original)})
+    return {**result, "start": segment.start, "end": segment.end, "corrections": corrections}
+
+
+@dataclass
+class DocumentRevision:
+    document_id: str
+    revision: int
+    text: str
+    check: str
+    fingerprint: str
+    segments: list[Segment]
+    # Successful results by sentence text; sentences that failed are absent and get re-checked.
+    results: dict[str, dict] = field(default_factory=dict)
+
+
+@dataclass
+class RevisionPlan:
+    segments: list[Segment]
+    reused: dict[str, dict]
+    pending: list[str]
+    # Sentences the check does not apply to (content-check rewrites only those of more than 3 words).
+    skipped: list[str]
+    previous_revision: int
+    removed: int
+
+
+class DocumentStore:
+    """In-process LRU of the latest revision of each document and its per-sentence results.
+
+    A new revision only needs the sentences that are new or changed since the previous one:
+    results are reused by sentence text, as long as the check and the knowledge base
+    fingerprint are the same. Each worker keeps its own store; a document that lands on
+    another worker is still served from the shared result cache.
+    """
+
+    def __init__(self, max_documents: int = DEFAULT_MAX_DOCUMENTS):
+        self.max_documents = max_documents
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self.reused_sentences = 0
+        self.checked_sentences = 0
+        self.skipped_sentences = 0
+
+    def get(self, document_id: str) -> DocumentRevision | None:
+        with self._lock:
+            revision = self._documents.get(document_id)
+            if revision is not None:
+                self._documents.move_to_end(document_id)
+            return revision
+
+    def delete(self, document_id: str) -> bool:
+        with self._lock:
+            return self._documents.pop(document_id, None) is not None
+
+    def plan(self, document_id: str, text: str, check: str, fingerprint: str) -> RevisionPlan:
+        """Segments the new text and splits its sentences into reusable results and sentences to check."""
+        segments = segment_sentences(text)
+        previous = self.get(document_id)
+        known = {}
+        if previous is not None and previous.check == check and previous.fingerprint == fingerprint:
+            known = previous.results
+
+        reused, pending, skipped = {}, [], []
+        for sentence in dict.fromkeys(s.text for s in segments):
+            if sentence in known:
+                reused[sentence] = known[sentence]
+            elif check == "content-check" and not ux_writing_candidates([sentence]):
+                skipped.append(sentence)
+            else:
+                pending.append(sentence)
+
+        removed = 0
+        if previous is not None:
+            current = {s.text for s in segments}
+            removed = sum(1 for s in previous.segments if s.text not in current)
+        return RevisionPlan(segments, reused, pending, skipped, previous.revision if previous else 0, removed)
+
+    def commit(self, document_id: str, text: str, check: str, fingerprint: str, plan: RevisionPlan, fresh: dict[str, dict]) -> DocumentRevision:
+        """Stores the new revision. Its number follows whatever revision is current now, so
+        concurrent saves of one document never reuse a revision number."""
+        results = {**plan.reused, **fresh}
+        with self._lock:
+            previous = self._documents.get(document_id)
+            revision = DocumentRevision(
+                document_id=document_id,
+                revision=(previous.revision if previous else 0) + 1,
+                text=text,
+                check=check,
+                fingerprint=fingerprint,
+                segments=plan.segments,
+                results={s.text: results[s.text] for s in plan.segments if s.text in results},
+            )
+            self._documents[document_id] = revision
+            self._documents.move_to_end(document_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+            self.reused_sentences += len(plan.reused)
+            self.checked_sentences += len(plan.pending)
+            self.skipped_sentences += len(plan.skipped)
+        return revision
@@ -0,0 +1,216 @@
+# src/core/embedding_store.py
+import os
+import time
+import hashlib
+import threading
+import logging
+import numpy as np
+from .database import connect
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "embedding_store")
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", "50000"))
+# Hits refresh their LRU timestamp at most this often, so reads rarely write.
+TOUCH_INTERVAL_SECONDS = 60.0
+
+
+def embedding_key(model: str, task_type: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{task_type}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Persistent embeddings keyed by (model, task_type, text), shared by ingestion and the API.
+
+    Vectors live in one float32 file memory-mapped as a (capacity, dimensions) matrix; a SQLite
+    index maps each key to its row and tracks last use. When all `max_entries` rows are taken,
+    the least recently used ones are overwritten. Several processes can share a directory:
+    rows are reserved in a SQLite write transaction, filled, and only then published under
+    their key, so a reader never sees a half-written vector. When two processes store the same
+    key at once, the first to publish keeps it and the other's row goes back to a free list.
+    """
+
+    def __init__(self, path: str = EMBEDDING_STORE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._conn = connect(os.path.join(path, "index.sqlite"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, slot INTEGER UNIQUE NOT NULL, last_used REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        # Rows given back when another process published the same key first; reserved before new ones.
+        self._conn.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+        self._lock = threading.Lock()
+        self._vectors = None
+        self.dimensions = None
+        self.hits = 0
+        self.misses = 0
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()
+        if row is not None:
+            self._open_vectors(int(row[0]))
+
+    # --- Vector file ---
+    def _open_vectors(self, dimensions: int):
+        row_bytes = dimensions * 4
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        # Never shrink: rows past a lowered cap may still be referenced until they are evicted.
+        capacity = max(self.max_entries, size // row_bytes)
+        if size < capacity * row_bytes:
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)  # sparse on most filesystems
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dimensions))
+        self.dimensions = dimensions
+
+    def _ensure_dimensions(self, dimensions: int) -> bool:
+        if self._vectors is None:
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('dimensions', ?)", (str(dimensions),))
+            stored = int(self._conn.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()[0])
+            self._open_vectors(stored)
+        if dimensions != self.dimensions:
+            logger.warning("Not storing %d-dimensional embeddings in a %d-dimensional store.", dimensions, self.dimensions)
+            return False
+        return True
+
+    # --- Bulk API ---
+    def get_many(self, model: str, task_type: str, texts: list[str]) -> dict[str, np.ndarray]:
+        """Returns {text: embedding} for the texts already stored."""
+        keys = {embedding_key(model, task_type, t): t for t in dict.fromkeys(texts)}
+        if not keys:
+            return {}
+        found = {}
+        now = time.time()
+        with self._lock:
+            if self._vectors is not None:
+                rows = self._select(list(keys))
+                stale = []
+                for key, slot, last_used in rows:
+                    if slot >= len(self._vectors):
+                        # Another process raised the cap and grew the file.
+                        self._open_vectors(self.dimensions)
+                    found[keys[key]] = np.array(self._vectors[slot])
+                    if now - last_used > TOUCH_INTERVAL_SECONDS:
+                        stale.append((now, key))
+                if stale:
+                    self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", stale)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _select(self, keys: list[str]) -> list[tuple]:
+        rows = []
+        # Stay under SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(self._conn.execute(
+                f"SELECT key, slot, last_used FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def set_many(self, model: str, task_type: str, texts: list[str], embeddings: list):
+        """Stores embeddings for texts, evicting the least recently used rows when full. Best
+        effort: a failed write is logged, never raised, since the store is only a cache."""
+        try:
+            self._write(model, task_type, texts, embeddings)
+        except Exception as e:
+            logger.warning("Embedding store write failed (%s).", e)
+
+    def _write(self, model: str, task_type: str, texts: list[str], embeddings: list):
+        items = {}
+        for text, embedding in zip(texts, embeddings):
+            items[embedding_key(model, task_type, text)] = np.asarray(embedding, dtype=np.float32)
+        if not items:
+            return
+        with self._lock:
+            if not self._ensure_dimensions(len(next(iter(items.values())))):
+                return
+            items = {k: v for k, v in items.items() if len(v) == self.dimensions}
+            slots = self._reserve(items)
+            for key, slot in slots.items():
+                self._vectors[slot] = items[key]
+            self._vectors.flush()
+            self._publish(slots)
+
+    def _publish(self, slots: dict[str, int]):
+        """Renames each filled row to its key. A key another process published in the meantime
+        keeps that process's row; the placeholder is dropped and its slot freed."""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "UPDATE OR IGNORE embeddings SET key = ?, last_used = ? WHERE slot = ? AND key = ?",
+                [(key, now, slot, f"pending:{slot}") for key, slot in slots.items()]
+            )
+            freed = [
+                slot for slot in slots.values()
+                if self._conn.execute("DELETE FROM embeddings WHERE key = ?", (f"pending:{slot}",)).rowcount
+            ]
+            self._conn.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(slot,) for slot in freed])
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _reserve(self, items: dict) -> dict[str, int]:
+        """Claims one row per key not stored yet. Rows are held under a placeholder key, which
+        no lookup matches, until their vector is written."""
+        capacity = len(self._vectors)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {row[0] for row in self._select(list(items))}
+            new_keys = [k for k in items if k not in existing][:capacity]
+            free = [row[0] for row in self._conn.execute(
+                "SELECT slot FROM free_slots WHERE slot < ? ORDER BY slot LIMIT ?", (capacity, len(new_keys))
+            ).fetchall()]
+            next_slot = self._conn.execute(
+                "SELECT COALESCE(MAX(slot) + 1, 0) FROM (SELECT slot FROM embeddings UNION ALL SELECT slot FROM free_slots)"
+            ).fetchone()[0]
+            self._conn.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in free])
+            unused = free + list(range(next_slot, min(capacity, next_slot + len(new_keys) - len(free))))
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            evict = max(len(new_keys) - len(unused), count + len(new_keys) - self.max_entries, 0)
+            slots = []
+            if evict:
+                evicted = self._conn.execute(
+                    "SELECT key, slot FROM embeddings ORDER BY last_used LIMIT ?", (evict,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(k,) for k, _ in evicted])
+                slots = [slot for _, slot in evicted]
+            slots = (slots + unused)[:len(new_keys)]
+            unneeded = set(free) - set(slots)
+            self._conn.executemany("INSERT INTO free_slots (slot) VALUES (?)", [(slot,) for slot in unneeded])
+            # Stamped now, so another process doesn't evict a row that is still being written.
+            now = time.time()
+            self._conn.executemany(
+                "INSERT INTO embeddings (key, slot, last_used) VALUES (?, ?, ?)",
+                [(f"pending:{slot}", slot, now) for slot in slots]
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return dict(zip(new_keys, slots))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._vectors = None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore | None:
+    """The process-wide store at EMBEDDING_STORE_PATH, or None when that is set to ""."""
+    global _default_store
+    if not EMBEDDING_STORE_PATH:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = EmbeddingStore(EMBEDDING_STORE_PATH)
+        return _default_store
@@ -0,0 +1,97 @@
+# src/core/feedback_store.py
+import time
+import queue
+import threading
+import logging
+from .database import DB_PATH, connect, init_db
+
+logger = logging.getLogger(__name__)
+
+INSERT_SQL = """
+    INSERT INTO feedback (correction_id, action, original_text, corrected_text, suggested_text)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_STOP = object()
+
+
+class FeedbackQueueFull(Exception):
+    pass
+
+
+class FeedbackWriter:
+    """Write-behind feedback store: requests enqueue rows and return immediately; one background
+    thread owns a long-lived WAL connection and inserts rows in batched transactions, flushing
+    when `batch_size` rows are waiting or `flush_interval` seconds have passed."""
+
+    def __init__(self, db_path: str = DB_PATH, max_queue: int = 10000, batch_size: int = 200, flush_interval: float = 0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self.written = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def start(self):
+        init_db(self.db_path)
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: tuple):
+        """Queues one (correction_id, action, original_text, corrected_text, suggested_text) row.
+
+        Raises FeedbackQueueFull instead of blocking when the writer has fallen behind.
+        """
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.rejected += 1
+            raise FeedbackQueueFull("Feedback queue is full.")
+
+    def close(self, timeout: float = 10.0):
+        """Stops accepting work after everything already queued has been written."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        conn = connect(self.db_path)
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._flush(conn, batch)
+        finally:
+            conn.close()
+
+    def _flush(self, conn, batch: list):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            logger.error("Error writing %d feedback rows: %s", len(batch), e)
@@ -0,0 +1,124 @@
+# src/core/ignore_list.py
+import os
+import time
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+from .result_cache import normalize_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+IGNORE_FILE_PATH = "data/ignore_list.txt"
+DEFAULT_CHECK_INTERVAL_SECONDS = 1.0
+
+
+def _ignore_key(text: str) -> str:
+    return normalize_text(text).lower()
+
+
+class IgnoreIndex:
+    """In-memory view of the ignore list file.
+
+    The file stays the source of truth so every uvicorn worker converges on the same list:
+    reads re-check the file's stat at most once per check interval and reload when it changed,
+    and writes take an exclusive file lock, merge with the current file and atomically replace it.
+    """
+
+    def __init__(self, path: str = IGNORE_FILE_PATH, check_interval: float = DEFAULT_CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries = ()
+        self._keys = frozenset()
+        self._signature = None
+        self._next_check = 0.0
+        self._reload()
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _read_file(self) -> list[str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _reload(self):
+        signature = self._stat_signature()
+        entries = self._read_file()
+        # Swap both views in one assignment each so readers never see a half-built index.
+        self._entries = tuple(entries)
+        self._keys = frozenset(_ignore_key(e) for e in entries)
+        self._signature = signature
+        self._next_check = time.monotonic() + self.check_interval
+
+    def _refresh_if_changed(self):
+        if time.monotonic() < self._next_check:
+            return
+        with self._lock:
+            if self._stat_signature() != self._signature:
+                logger.info("Ignore list changed on disk. Reloading.")
+                self._reload()
+            else:
+                self._next_check = time.monotonic() + self.check_interval
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def entries(self) -> list[str]:
+        self._refresh_if_changed()
+        return list(self._entries)
+
+    def contains(self, text: str) -> bool:
+        self._refresh_if_changed()
+        return _ignore_key(text) in self._keys
+
+    def add(self, word: str) -> bool:
+        """Adds a word or phrase. Returns False if it was already ignored."""
+        with self._lock, self._file_lock():
+            entries = self._read_file()  # includes writes from other workers
+            if _ignore_key(word) in {_ignore_key(e) for e in entries}:
+                self._reload()
+                return False
+
+            entries.append(word.strip())
+            directory = os.path.dirname(self.path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ignore_list.")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write("".join(f"{e}\n" for e in entries))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._reload()
+            return True
+
+    def filter_result(self, result: dict) -> dict:
+        """Drops corrections whose flagged phrase is on the ignore list."""
+        self._refresh_if_changed()
+        corrections = result.get("corrections", [])
+        kept = [c for c in corrections if _ignore_key(c.get("original") or "") not in self._keys]
+        if len(kept) == len(corrections):
+            return result
+        return {**result, "is_correct": len(kept) == 0, "corrections": kept}
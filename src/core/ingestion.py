@@ -0,0 +1,139 @@
+# src/core/ingestion.py
+import os
+import json
+import hashlib
+import threading
+import logging
+from ..services.gemini_client import EMBEDDING_MODEL
+from ..services.quota_scheduler import get_quota
+from .chunking import estimate_tokens
+from .embedding_store import EmbeddingStore, get_embedding_store
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_BASE_DIR = "data/knowledge_bases"
+DB_PATH = "db"
+COLLECTION_NAME = "unified_knowledge_base"
+EMBED_BATCH_SIZE = 100  # Gemini's per-request limit for batch embedding
+
+# Syncs triggered by the API and by the CLI must not interleave their diff and write steps.
+_sync_lock = threading.Lock()
+
+
+class KnowledgeBaseFormatError(ValueError):
+    pass
+
+
+def build_rule_document(item: dict) -> str:
+    """Construct a descriptive, searchable document from one structured JSON rule."""
+    guideline = item.get("guideline", "No guideline provided.")
+    incorrect = item.get("incorrect_example", "N/A")
+    correct = item.get("correct_example", "N/A")
+    explanation = item.get("explanation", "No explanation provided.")
+
+    return (
+        f"Guideline: {guideline} "
+        f"Incorrect Example: '{incorrect}'. "
+        f"Correct Example: '{correct}'. "
+        f"Reason: {explanation}"
+    )
+
+
+def rule_id(source_id: str, content: str) -> str:
+    """Content-addressed id: an edited rule gets a new id, an untouched one keeps its id."""
+    digest = hashlib.sha256(f"{source_id}\0{content}".encode("utf-8")).hexdigest()
+    return f"{source_id}:{digest[:24]}"
+
+
+def load_rules(knowledge_base_dir: str = KNOWLEDGE_BASE_DIR) -> dict[str, dict]:
+    """Reads every .json file in the knowledge base directory into {id: {document, metadata}}."""
+    if not os.path.isdir(knowledge_base_dir):
+        raise FileNotFoundError(f"Knowledge base directory not found at '{knowledge_base_dir}'")
+
+    rules = {}
+    for filename in sorted(os.listdir(knowledge_base_dir)):
+        if not filename.endswith(".json"):
+            continue
+        # The source_id is the filename without the extension,
+        # e.g. "spelling_and_terminology" or "grammar_and_style"
+        source_id = filename.replace(".json", "")
+        with open(os.path.join(knowledge_base_dir, filename), "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        for item in data:
+            try:
+                content = build_rule_document(item)
+            except (TypeError, AttributeError):
+                raise KnowledgeBaseFormatError(
+                    f"Invalid format in {filename}: Item '{item}' is not a valid dictionary or is missing keys."
+                )
+            rules[rule_id(source_id, content)] = {"document": content, "metadata": {"source": source_id}}
+    return rules
+
+
+def embed_documents(texts: list[str], store: EmbeddingStore | None = None) -> list:
+    """Embeds rule documents in batches through the shared quota scheduler. Documents already
+    in the embedding store (the process-wide one unless given) are not sent again, so a
+    rebuild of an unchanged knowledge base makes no embedding calls.
+    Assumes genai.configure has already been called."""
+    store = store if store is not None else get_embedding_store()
+    stored = store.get_many(EMBEDDING_MODEL, "RETRIEVAL_DOCUMENT", texts) if store is not None else {}
+    missing = [t for t in dict.fromkeys(texts) if t not in stored]
+    if stored:
+        logger.info("Reusing %d stored embeddings.", len(stored))
+
+    fresh = {}
+    if missing:
+        import google.generativeai as genai
+    for start in range(0, len(missing), EMBED_BATCH_SIZE):
+        batch = missing[start:start + EMBED_BATCH_SIZE]
+        with get_quota().embed.lease(sum(estimate_tokens(t) for t in batch)):
+            result = genai.embed_content(
+                model=EMBEDDING_MODEL,
+                content=batch,
+                task_type="RETRIEVAL_DOCUMENT"
+            )
+        fresh.update(zip(batch, result['embedding']))
+        # Stored per batch, so an interrupted run resumes where it stopped.
+        if store is not None:
+            store.set_many(EMBEDDING_MODEL, "RETRIEVAL_DOCUMENT", batch, result['embedding'])
+
+    return [fresh[t] if t in fresh else stored[t].tolist() for t in texts]
+
+
+def sync_knowledge_base(collection, knowledge_base_dir: str = KNOWLEDGE_BASE_DIR, embed_fn=embed_documents) -> dict:
+    """Brings the collection in line with the JSON files: embeds and upserts only new or
+    changed rules and deletes rules that no longer exist. Returns counts per action."""
+    with _sync_lock:
+        rules = load_rules(knowledge_base_dir)
+        existing_ids = set(collection.get(include=[])["ids"])
+
+        new_ids = [i for i in rules if i not in existing_ids]
+        removed_ids = [i for i in existing_ids if i not in rules]
+
+        if new_ids:
+            logger.info("Embedding %d new or changed rules...", len(new_ids))
+            documents = [rules[i]["document"] for i in new_ids]
+            collection.upsert(
+                ids=new_ids,
+                embeddings=embed_fn(documents),
+                documents=documents,
+                metadatas=[rules[i]["metadata"] for i in new_ids]
+            )
+        if removed_ids:
+            logger.info("Removing %d rules that are no longer in the knowledge base...", len(removed_ids))
+            collection.delete(ids=removed_ids)
+
+    stats = {"added": len(new_ids), "removed": len(removed_ids), "unchanged": len(rules) - len(new_ids)}
+    logger.info("Knowledge base sync complete: %s", stats, extra=stats)
+    return stats
+
+
+def get_or_create_collection(db_path: str = DB_PATH, rebuild: bool = False):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=db_path)
+    if rebuild and COLLECTION_NAME in [c.name for c in client.list_collections()]:
+        logger.info("Collection '%s' already exists. Deleting it.", COLLECTION_NAME)
+        client.delete_collection(name=COLLECTION_NAME)
+    return client.get_or_create_collection(name=COLLECTION_NAME)
@@ -0,0 +1,267 @@
+# src/core/metrics.py
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Prometheus text exposition format, version 0.0.4.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """The metrics of this process. With several uvicorn workers each one is scraped separately."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Registry | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, *extra) -> str:
+        return _format_labels(list(zip(self.labelnames, key)) + list(extra))
+
+    def _snapshot(self) -> list:
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {_format_number(v)}" for key, v in self._snapshot()]
+
+
+class CallbackCounter(_Metric):
+    """A counter whose values already live elsewhere (e.g. cache hit counters); `fn` returns
+    {label values tuple: value} and is called at scrape time."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, fn, registry: Registry | None = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.fn = fn
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {_format_number(v)}" for key, v in sorted(self.fn().items())]
+
+
+class CallbackGauge(CallbackCounter):
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS, registry: Registry | None = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # bisect_left: a value equal to a bound belongs to that bound's "le" bucket.
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def totals(self) -> dict[tuple, tuple[int, float]]:
+        """{label values: (count, sum)} for every label set observed so far."""
+        return {key: (count, total) for key, (_, total, count) in self._snapshot()}
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in self._snapshot():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_number(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+# --- Hot-path metrics ---
+STAGE_SECONDS = Histogram(
+    "spellcheck_stage_seconds",
+    "Time spent in each stage of a check: cache_lookup, precheck, embedding, retrieval, prompt_build, quota_wait, generation, parse.",
+    ("stage", "check_type"),
+)
+PAYLOAD_CHARS = Histogram(
+    "spellcheck_gemini_payload_chars",
+    "Size of Gemini prompts and responses in characters.",
+    ("direction", "check_type"),
+    buckets=SIZE_BUCKETS,
+)
+ERRORS = Counter("spellcheck_errors_total", "Failures by pipeline stage.", ("stage", "check_type"))
+GEMINI_TOKENS = Counter(
+    "spellcheck_gemini_tokens_total",
+    "Gemini generation tokens from response usage metadata: prompt, output, and cached (prompt tokens served from context caching).",
+    ("kind", "check_type"),
+)
+PROMPT_SENTENCES = Counter(
+    "spellcheck_prompt_sentences_total",
+    "Sentences put in Gemini prompts (sent) and identical ones folded into another in the same prompt (deduplicated).",
+    ("outcome", "check_type"),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "spellcheck_gemini_queue_wait_seconds",
+    "Time Gemini calls waited for quota or concurrency in the scheduler.",
+    ("model", "priority"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "spellcheck_http_request_seconds",
+    "End-to-end API request latency.",
+    ("method", "path", "status"),
+)
+
+
+# --- Per-request and per-chunk breakdowns ---
+_sink_lock = threading.Lock()
+# (sinks receiving stage timings, check_type) for the code currently running.
+_trace = contextvars.ContextVar("spellcheck_trace", default=((), None))
+
+
+class StageSink:
+    """Mixin for dataclasses with `stages_ms`, `prompt_chars`, `response_chars` and `errors` fields."""
+
+    def add_stage(self, stage: str, seconds: float):
+        with _sink_lock:
+            self.stages_ms[stage] = round(self.stages_ms.get(stage, 0.0) + seconds * 1000, 2)
+
+    def add_payload(self, direction: str, chars: int):
+        with _sink_lock:
+            setattr(self, f"{direction}_chars", getattr(self, f"{direction}_chars") + chars)
+
+    def add_error(self, stage: str):
+        with _sink_lock:
+            self.errors += 1
+
+
+@dataclass
+class StageBreakdown(StageSink):
+    """Stage totals for one request, summed over all of its chunks."""
+    stages_ms: dict = field(default_factory=dict)
+    prompt_chars: int = 0
+    response_chars: int = 0
+    errors: int = 0
+
+
+@contextmanager
+def tracking(sink: StageSink | None = None, check_type: str | None = None):
+    """Within the block, stage timings, payload sizes and errors are also added to `sink` (and to
+    any enclosing sinks). Nested blocks inherit the check_type label.
+
+    The trace travels in a ContextVar, so it follows asyncio tasks and asyncio.to_thread;
+    plain thread pools need contextvars.copy_context().run.
+    """
+    sinks, parent_check_type = _trace.get()
+    if sink is not None:
+        sinks = sinks + (sink,)
+    token = _trace.set((sinks, check_type or parent_check_type))
+    try:
+        yield sink
+    finally:
+        _trace.reset(token)
+
+
+def record_stage(stage: str, seconds: float, check_type: str | None = None):
+    sinks, current_check_type = _trace.get()
+    STAGE_SECONDS.observe(seconds, stage=stage, check_type=check_type or current_check_type or "unknown")
+    for sink in sinks:
+        sink.add_stage(stage, seconds)
+
+
+@contextmanager
+def stage(name: str, check_type: str | None = None):
+    """Times the block as one occurrence of a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, check_type)
+
+
+def record_payload(direction: str, chars: int):
+    """direction is "prompt" or "response"."""
+    sinks, check_type = _trace.get()
+    PAYLOAD_CHARS.observe(chars, direction=direction, check_type=check_type or "unknown")
+    for sink in sinks:
+        sink.add_payload(direction, chars)
+
+
+def record_tokens(prompt: int, output: int, cached: int = 0):
+    check_type = _trace.get()[1] or "unknown"
+    GEMINI_TOKENS.inc(prompt, kind="prompt", check_type=check_type)
+    GEMINI_TOKENS.inc(output, kind="output", check_type=check_type)
+    GEMINI_TOKENS.inc(cached, kind="cached", check_type=check_type)
+
+
+def record_prompt_sentences(sent: int, deduplicated: int):
+    check_type = _trace.get()[1] or "unknown"
+    PROMPT_SENTENCES.inc(sent, outcome="sent", check_type=check_type)
+    PROMPT_SENTENCES.inc(deduplicated, outcome="deduplicated", check_type=check_type)
+
+
+def record_error(stage: str, check_type: str | None = None):
+    sinks, current_check_type = _trace.get()
+    ERRORS.inc(stage=stage, check_type=check_type or current_check_type or "unknown")
+    for sink in sinks:
+        sink.add_error(stage)
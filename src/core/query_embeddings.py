@@ -0,0 +1,46 @@
+# src/core/query_embeddings.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class QueryEmbeddingCache:
+    """In-process LRU of query embeddings keyed by a hash of (model, task_type, text)."""
+
+    def __init__(self, model: str, task_type: str = "RETRIEVAL_QUERY", max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.model = model
+        self.task_type = task_type
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{self.task_type}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list[str]) -> dict[str, list[float]]:
+        """Returns {text: embedding} for the texts already embedded."""
+        found = {}
+        with self._lock:
+            for text in texts:
+                if text in found:
+                    continue
+                key = self._key(text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[text] = self._entries[key]
+            self.hits += len(found)
+            self.misses += len(set(texts)) - len(found)
+        return found
+
+    def set_many(self, texts: list[str], embeddings: list):
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self._key(text)
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,171 @@
+# src/core/result_cache.py
+import os
+import copy
+import glob
+import json
+import hashlib
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_BASE_DIR = "data/knowledge_bases"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+REDIS_KEY_PREFIX = "spellcheck:result:"
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes a sentence for cache lookups (unicode form and whitespace only, case is kept)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class KnowledgeBaseFingerprint:
+    """Content hash of the knowledge base files, recomputed only when a file changes on disk."""
+
+    def __init__(self, knowledge_base_dir: str = KNOWLEDGE_BASE_DIR):
+        self.knowledge_base_dir = knowledge_base_dir
+        self._signature = None
+        self._fingerprint = ""
+        self._lock = threading.Lock()
+
+    def _stat_signature(self) -> tuple:
+        signature = []
+        for path in sorted(glob.glob(os.path.join(self.knowledge_base_dir, "*.json"))):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def current(self) -> str:
+        signature = self._stat_signature()
+        with self._lock:
+            if signature != self._signature:
+                digest = hashlib.sha256()
+                for path, _, _ in signature:
+                    digest.update(os.path.basename(path).encode("utf-8"))
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+                self._fingerprint = digest.hexdigest()[:16]
+                self._signature = signature
+            return self._fingerprint
+
+
+class ResultCache:
+    """Two-tier (in-process LRU + optional Redis) cache of per-sentence check results."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        redis_url: str | None = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        knowledge_base_dir: str = KNOWLEDGE_BASE_DIR,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.kb_fingerprint = KnowledgeBaseFingerprint(knowledge_base_dir)
+        self._entries = OrderedDict()
+        self._entries_fingerprint = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redis = None
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(redis_url)
+                self.redis.ping()
+                logger.info("Result cache connected to Redis at %s.", redis_url)
+            except Exception as e:
+                logger.warning("Redis unavailable (%s). Using in-process result cache only.", e)
+                self.redis = None
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            redis_url=os.getenv("REDIS_URL"),
+            ttl_seconds=int(os.getenv("RESULT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+        )
+
+    def make_key(self, sentence: str, check_type: str, fingerprint: str) -> str:
+        text_hash = hashlib.sha256(normalize_text(sentence).encode("utf-8")).hexdigest()
+        return f"{check_type}:{fingerprint}:{text_hash}"
+
+    def _sync_fingerprint(self) -> str:
+        # A knowledge base change drops the local tier; Redis entries are simply no longer addressed.
+        fingerprint = self.kb_fingerprint.current()
+        with self._lock:
+            if fingerprint != self._entries_fingerprint:
+                self._entries.clear()
+                self._entries_fingerprint = fingerprint
+        return fingerprint
+
+    def get_many(self, sentences: list[str], check_type: str) -> dict[int, dict]:
+        """Returns {input index: cached result} for every sentence found in either tier."""
+        fingerprint = self._sync_fingerprint()
+        keys = [self.make_key(s, check_type, fingerprint) for s in sentences]
+        found = {}
+        remote_lookups = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[i] = copy.deepcopy(self._entries[key])
+                else:
+                    remote_lookups.append(i)
+
+        if self.redis and remote_lookups:
+            try:
+                values = self.redis.mget([REDIS_KEY_PREFIX + keys[i] for i in remote_lookups])
+            except Exception as e:
+                logger.warning("Redis lookup failed (%s).", e)
+                values = [None] * len(remote_lookups)
+            for i, raw in zip(remote_lookups, values):
+                if raw is None:
+                    continue
+                result = json.loads(raw)
+                self._store_local(keys[i], copy.deepcopy(result))
+                found[i] = result
+
+        for i, result in found.items():
+            # The caller's exact string is echoed back, even if it only matched after normalization.
+            result["original_text"] = sentences[i]
+
+        self.hits += len(found)
+        self.misses += len(sentences) - len(found)
+        return found
+
+    def set_many(self, items: list[tuple[str, dict]], check_type: str):
+        """Stores (sentence, result) pairs in both tiers."""
+        if not items:
+            return
+        fingerprint = self._sync_fingerprint()
+        keyed = [(self.make_key(s, check_type, fingerprint), r) for s, r in items]
+        for key, result in keyed:
+            self._store_local(key, copy.deepcopy(result))
+
+        if self.redis:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, result in keyed:
+                    pipe.set(REDIS_KEY_PREFIX + key, json.dumps(result), ex=self.ttl_seconds)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Redis write failed (%s).", e)
+
+    def _store_local(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
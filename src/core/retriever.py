@@ -0,0 +1,118 @@
+# src/core/retriever.py
+import os
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "numpy"
+
+
+class ChromaRetriever:
+    """Queries the Chroma collection directly (SQLite + HNSW on every call)."""
+    blocking = True
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def reload(self, collection=None):
+        if collection is not None:
+            self.collection = collection
+
+    def warmup(self):
+        """Loads the HNSW index into memory with one query using a stored embedding."""
+        sample = self.collection.peek(limit=1)
+        embeddings = sample.get("embeddings")
+        if embeddings is not None and len(embeddings):
+            self.collection.query(query_embeddings=[list(map(float, embeddings[0]))], n_results=1)
+
+    def query(self, embeddings: list, source_id: str, n_results: int = 15) -> list[list[str]]:
+        """Returns the top documents for every query embedding, best match first."""
+        results = self.collection.query(
+            query_embeddings=[list(map(float, e)) for e in embeddings],
+            n_results=n_results,
+            where={"source": source_id}
+        )
+        if not results or not results.get('documents'):
+            return [[] for _ in embeddings]
+        return [list(docs) for docs in results['documents']]
+
+
+class NumpyRetriever:
+    """Keeps every rule embedding in memory as one contiguous, L2-normalized float32 matrix
+    per source and answers queries with a vectorized cosine top-k."""
+    blocking = False
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._index = {}
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self, collection=None):
+        """Rebuilds the per-source matrices from the collection and swaps them in atomically."""
+        with self._lock:
+            if collection is not None:
+                self.collection = collection
+            data = self.collection.get(include=["embeddings", "documents", "metadatas"])
+
+            embeddings = data.get("embeddings")
+            if embeddings is None:
+                embeddings = []
+
+            grouped = {}
+            for embedding, document, metadata in zip(embeddings, data["documents"] or [], data["metadatas"] or []):
+                source_id = (metadata or {}).get("source")
+                vectors, documents = grouped.setdefault(source_id, ([], []))
+                vectors.append(embedding)
+                documents.append(document)
+
+            index = {}
+            for source_id, (vectors, documents) in grouped.items():
+                matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.where(norms == 0, 1.0, norms)
+                index[source_id] = (matrix, documents)
+
+            self._index = index
+        logger.info("Vector index loaded: %d rules across %d sources.", sum(len(d) for _, d in index.values()), len(index))
+
+    def warmup(self):
+        """Touches every matrix once so the first request doesn't pay for page faults and BLAS setup."""
+        for matrix, _ in self._index.values():
+            if len(matrix):
+                matrix[:1] @ matrix.T
+
+    def query(self, embeddings: list, source_id: str, n_results: int = 15) -> list[list[str]]:
+        """Returns the top documents for every query embedding, best match first."""
+        entry = self._index.get(source_id)
+        if entry is None or len(embeddings) == 0:
+            return [[] for _ in embeddings]
+        matrix, documents = entry
+
+        queries = np.asarray(embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+
+        scores = queries @ matrix.T
+        k = min(n_results, len(documents))
+        if k < len(documents):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(documents)), scores.shape)
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        ranked = np.take_along_axis(top, order, axis=1)
+        return [[documents[j] for j in row] for row in ranked]
+
+
+def create_retriever(collection, backend: str | None = None):
+    """Builds the retriever selected by `backend` or the RETRIEVER_BACKEND env var ("numpy" or "chroma")."""
+    backend = (backend or os.getenv("RETRIEVER_BACKEND", DEFAULT_BACKEND)).lower()
+    if backend == "chroma":
+        return ChromaRetriever(collection)
+    if backend == "numpy":
+        return NumpyRetriever(collection)
+    raise ValueError(f"Unknown retriever backend '{backend}'. Use 'numpy' or 'chroma'.")
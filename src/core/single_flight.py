@@ -0,0 +1,58 @@
+# src/core/single_flight.py
+import threading
+from concurrent.futures import Future
+from .result_cache import normalize_text
+
+
+class SingleFlight:
+    """Coalesces identical in-flight checks.
+
+    The first caller to claim a (check_type, sentence) key becomes its leader and computes it;
+    concurrent callers get the leader's Future and share its result. Futures are
+    concurrent.futures.Future so both threads (SpellChecker) and coroutines
+    (AsyncSpellChecker, via asyncio.wrap_future) can wait on them.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.led_sentences = 0
+        self.deduplicated_sentences = 0
+        self.deduplicated_calls = 0
+
+    def claim(self, check_type: str, sentences: list[str]) -> tuple[list[str], dict]:
+        """Returns (sentences this caller must compute, {key: Future} for sentences already in flight)."""
+        owned, waiting = [], {}
+        with self._lock:
+            for sentence in sentences:
+                key = normalize_text(sentence)
+                future = self._inflight.get((check_type, key))
+                if future is None:
+                    self._inflight[(check_type, key)] = Future()
+                    owned.append(sentence)
+                else:
+                    waiting[key] = future
+            self.led_sentences += len(owned)
+            self.deduplicated_sentences += len(waiting)
+            if waiting:
+                self.deduplicated_calls += 1
+        return owned, waiting
+
+    def resolve(self, check_type: str, sentences: list[str], results: dict):
+        """Publishes results (keyed by normalized text) for claimed sentences; missing ones resolve to None."""
+        with self._lock:
+            futures = [
+                (self._inflight.pop((check_type, normalize_text(s)), None), results.get(normalize_text(s)))
+                for s in sentences
+            ]
+        for future, result in futures:
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "led_sentences": self.led_sentences,
+            "deduplicated_sentences": self.deduplicated_sentences,
+            "deduplicated_calls": self.deduplicated_calls,
+        }
@@ -1,100 +1,701 @@
 # src/core/spell_checker.py
-import json
-import chromadb
-import google.generativeai as genai
-from ..services.gemini_client import GeminiClient
+import os
+import time
+import random
+import asyncio
+import logging
+import contextvars
+import importlib
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from ..services.gemini_client import GeminiClient, AsyncGeminiClient, GeminiCallError, EMBEDDING_MODEL
+from ..services.prompt_builder import decode_results
+from .result_cache import ResultCache, normalize_text
+from .chunking import ChunkPolicy, ChunkTiming, plan_chunks, chunk_timing_for
+from .retriever import create_retriever
+from .query_embeddings import QueryEmbeddingCache
+from .embedding_store import EmbeddingStore
+from .brand_prechecker import BrandPrechecker
+from .correction_memo import CorrectionMemo
+from .ux_triage import UxTriage
+from .ignore_list import IgnoreIndex
+from .single_flight import SingleFlight
+from .metrics import stage, tracking, record_error
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use: chromadb adds most of a second to worker start-up.
+chromadb = None
+
+SOURCE_MAP = {
+    "TYPO_BRAND": "spelling_and_terminology",
+    "UX_WRITING": "grammar_and_style"
+}
+
+# "per_sentence" embeds every sentence (one batched call) and unions each sentence's top rules;
+# "joined" embeds the whole chunk as a single comma-joined query.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "per_sentence")
+RULES_PER_SENTENCE = int(os.getenv("RULES_PER_SENTENCE", 5))
+MAX_RULES_PER_PROMPT = 15
+BRAND_PRECHECK_ENABLED = os.getenv("BRAND_PRECHECK_ENABLED", "true").lower() == "true"
+CORRECTION_MEMO_ENABLED = os.getenv("CORRECTION_MEMO_ENABLED", "true").lower() == "true"
+# Off by default: the model also rewrites for tone and flow, which no local signal detects.
+UX_TRIAGE_ENABLED = os.getenv("UX_TRIAGE_ENABLED", "false").lower() == "true"
+# Sentences whose results are missing or malformed (and chunks hit by a transient API error)
+# are re-requested on their own, up to this many calls per chunk in total.
+RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", 3))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_DELAY_SECONDS", 0.5))
+RETRY_MAX_DELAY_SECONDS = 8.0
+
+
+def _backoff_delay(retry: int) -> float:
+    """Full-jitter exponential backoff before the given retry (1 = first retry)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (retry - 1)))
+
 
 class SpellChecker:
-    def __init__(self, client: GeminiClient):
+    def __init__(self, client: GeminiClient, cache: ResultCache | None = None, retriever=None, prechecker: BrandPrechecker | None = None, ignore_index: IgnoreIndex | None = None, embedding_store: EmbeddingStore | None = None, memo: CorrectionMemo | None = None, triage: UxTriage | None = None):
         self.client = client
+        self.ignore_index = ignore_index
+        self.single_flight = SingleFlight()
+        self.cache = cache if cache is not None else ResultCache.from_env()
+        global chromadb
+        if chromadb is None:
+            chromadb = importlib.import_module("chromadb")
         db_client = chromadb.PersistentClient(path="db")
         self.collection = db_client.get_collection(name="unified_knowledge_base")
-        print("SpellChecker initialized and connected to DB.")
+        self.retriever = retriever if retriever is not None else create_retriever(self.collection)
+        self.query_embeddings = QueryEmbeddingCache(EMBEDDING_MODEL)
+        # Persistent second tier behind query_embeddings, shared with other workers and restarts.
+        self.embedding_store = embedding_store
+        self.retrieval_mode = RETRIEVAL_MODE
+        if prechecker is None and BRAND_PRECHECK_ENABLED:
+            prechecker = BrandPrechecker.from_file()
+        self.prechecker = prechecker
+        if memo is None and CORRECTION_MEMO_ENABLED:
+            memo = CorrectionMemo()
+        self.memo = memo
+        if triage is None and UX_TRIAGE_ENABLED:
+            triage = UxTriage.from_file()
+        self.triage = triage
+        logger.info("SpellChecker initialized and connected to DB.")
+
+    def reload_knowledge_base(self):
+        """Picks up re-ingested rules without a restart: the vector index and the brand
+        pre-checker are rebuilt, and cached results expire via the knowledge base fingerprint."""
+        self.retriever.reload()
+        if self.prechecker is not None:
+            self.prechecker = BrandPrechecker.from_file()
+        if self.triage is not None:
+            self.triage = UxTriage.from_file(threshold=self.triage.threshold, sample_rate=self.triage.sample_rate)
+        logger.info("SpellChecker reloaded the knowledge base.")
+
+    # --- Retrieval ---
+    def _format_rules(self, documents: list[str], source_id: str) -> str:
+        if not documents:
+            logger.warning("No specific rules found in the database for source: '%s'", source_id)
+            return "No specific brand rules found."
+
+        return "\n".join([f"- {doc}" for doc in documents])
+
+    def _query_rules(self, embedding: list[float], source_id: str) -> str:
+        with stage("retrieval"):
+            documents = self.retriever.query([embedding], source_id, n_results=MAX_RULES_PER_PROMPT)[0]
+        return self._format_rules(documents, source_id)
+
+    def _union_rules(self, embeddings: list, source_id: str) -> str:
+        """Top rules per sentence, merged rank by rank into one deduplicated list for the chunk."""
+        with stage("retrieval"):
+            per_sentence = self.retriever.query(embeddings, source_id, n_results=RULES_PER_SENTENCE)
+        documents = []
+        for rank in range(RULES_PER_SENTENCE):
+            for docs in per_sentence:
+                if rank < len(docs) and docs[rank] not in documents:
+                    documents.append(docs[rank])
+        return self._format_rules(documents[:MAX_RULES_PER_PROMPT], source_id)
+
+    def _split_embedding_lookups(self, texts: list[str]) -> tuple[dict, list[str]]:
+        found = self.query_embeddings.get_many(texts)
+        missing = list(dict.fromkeys(t for t in texts if t not in found))
+        if missing and self.embedding_store is not None:
+            stored = self.embedding_store.get_many(EMBEDDING_MODEL, "RETRIEVAL_QUERY", missing)
+            if stored:
+                self.query_embeddings.set_many(list(stored), list(stored.values()))
+                found.update(stored)
+                missing = [t for t in missing if t not in stored]
+        return found, missing
+
+    def _remember_embeddings(self, texts: list[str], embeddings: list):
+        self.query_embeddings.set_many(texts, embeddings)
+        if self.embedding_store is not None:
+            self.embedding_store.set_many(EMBEDDING_MODEL, "RETRIEVAL_QUERY", texts, embeddings)
+
+    def _embed_sentences(self, texts: list[str]) -> list:
+        """Embeds sentences in one batched call, skipping any whose embedding is already cached."""
+        found, missing = self._split_embedding_lookups(texts)
+        if missing:
+            with stage("embedding"):
+                embeddings = self.client.embed(missing, task_type="RETRIEVAL_QUERY")
+            self._remember_embeddings(missing, embeddings)
+            found.update(zip(missing, embeddings))
+        return [found[t] for t in texts]
 
     def _find_relevant_rules(self, text_list: list[str], source_id: str) -> str:
         if not text_list:
             return "No text provided for context search."
-            
-        combined_text = ", ".join(text_list)
-        embedding = genai.embed_content(
-            model="models/text-embedding-004",
-            content=combined_text,
-            task_type="RETRIEVAL_QUERY"
-        )['embedding']
-        
-        results = self.collection.query(
-            query_embeddings=[embedding],
-            n_results=15,
-            where={"source": source_id} 
-        )
-        
-        if not results or not results.get('documents') or not results['documents'][0]:
-            print(f"Warning: No specific rules found in the database for source: '{source_id}'")
-            return "No specific brand rules found."
-            
-        return "\n".join([f"- {doc}" for doc in results['documents'][0]])
+
+        if self.retrieval_mode == "joined":
+            combined_text = ", ".join(text_list)
+            embedding = self._embed_sentences([combined_text])[0]
+            return self._query_rules(embedding, source_id)
+
+        return self._union_rules(self._embed_sentences(text_list), source_id)
+
+    # --- Generation and post-processing ---
+    def _source_for(self, check_type: str) -> str | None:
+        source_id = SOURCE_MAP.get(check_type)
+        if not source_id:
+            logger.error("Invalid check_type '%s'. Cannot find relevant rules.", check_type)
+        return source_id
+
+    def _parse_response(self, response_str: str) -> list:
+        """Cleaned results for every well-formed item; malformed items are dropped so the
+        sentences they belonged to are re-requested."""
+        with stage("parse"):
+            cleaned = (self._clean_result(r) for r in decode_results(response_str))
+            return [r for r in cleaned if r is not None]
+
+    def _clean_result(self, r) -> dict | None:
+        if not isinstance(r, dict) or not isinstance(r.get("original_text"), str):
+            return None
+        original_text = r["original_text"]
+        corrections = r.get("corrections") or []
+        if not isinstance(corrections, list):
+            return None
+
+        # ✅ Fix: Only mark is_correct = false if suggestion differs
+        valid_corrections = []
+        for c in corrections:
+            if not isinstance(c, dict) or not isinstance(c.get("original"), str) or not isinstance(c.get("suggestion"), str):
+                return None
+            # 1. Reconstruct the full sentence for any incomplete UX_WRITING suggestions
+            if c.get("type") == "UX_WRITING" and c.get("original") != original_text:
+                # If the AI returned a word instead of the sentence, fix it.
+                c["suggestion"] = original_text.replace(c.get("original"), c.get("suggestion"))
+                c["original"] = original_text
+
+            # 2. Ensure there's an actual, visible change before adding it
+            if c.get("suggestion") != c.get("original"):
+                valid_corrections.append(c)
+
+        # 3. Build the final, clean result object (once per sentence, even without corrections)
+        return {
+            "original_text": original_text,
+            "is_correct": len(valid_corrections) == 0,
+            "corrections": valid_corrections
+        }
 
     def _process_sentences(self, sentences: list[str], check_type: str) -> list:
         if not sentences:
             return []
-        
-        source_map = {
-            "TYPO_BRAND": "spelling_and_terminology",
-            "UX_WRITING": "grammar_and_style"
-        }
-        
-        source_id = source_map.get(check_type)
+
+        source_id = self._source_for(check_type)
         if not source_id:
-            print(f"Error: Invalid check_type '{check_type}'. Cannot find relevant rules.")
-            return []
+            raise ValueError(f"Invalid check_type '{check_type}'.")
 
-        print(f"Finding relevant rules from source: '{source_id}'...")
+        logger.debug("Finding relevant rules from source: '%s'", source_id)
         relevant_rules = self._find_relevant_rules(sentences, source_id)
-        
+
         response_str = self.client.correct_batch_of_sentences(
             sentences, "en-GB", relevant_rules, check_type
         )
-        
-        try:
-            response_json = json.loads(response_str)
-            results = response_json.get("results", [])
-            
-            # ✅ Fix: Only mark is_correct = false if suggestion differs
-            cleaned_results = []
-            for r in results:
-                original_text = r.get("original_text")
-                corrections = r.get("corrections", [])
-
-                valid_corrections = []
-                for c in corrections:
-                # 1. Reconstruct the full sentence for any incomplete UX_WRITING suggestions
-                    if c.get("type") == "UX_WRITING" and c.get("original") != original_text:
-                    # If the AI returned a word instead of the sentence, fix it.
-                        c["suggestion"] = original_text.replace(c.get("original"), c.get("suggestion"))
-                        c["original"] = original_text
-                
-                # 2. Ensure there's an actual, visible change before adding it
-                    if c.get("suggestion") != c.get("original"):
-                        valid_corrections.append(c)
-
-            # 3. Build the final, clean result object
-                    cleaned_results.append({
-                    "original_text": original_text,
-                    "is_correct": len(valid_corrections) == 0,
-                    "corrections": valid_corrections
-                })
-        
-            
-            return cleaned_results
-
-        except json.JSONDecodeError:
-            print("Failed to decode JSON from Gemini API.")
+        return self._parse_response(response_str)
+
+    def _align_results(self, sentences: list[str], results: list) -> list:
+        """Matches model results back to the input sentences; unmatched inputs get None."""
+        by_text = {}
+        for r in results:
+            if isinstance(r.get("original_text"), str):
+                by_text.setdefault(normalize_text(r["original_text"]), r)
+
+        aligned = [by_text.get(normalize_text(s)) for s in sentences]
+        if None in aligned and len(results) == len(sentences):
+            # The model rewrote some original_text values; fall back to position.
+            aligned = [a if a is not None else results[i] for i, a in enumerate(aligned)]
+        return aligned
+
+    # --- Chunked fan-out ---
+    def _finish_chunk(self, timing: ChunkTiming, start_time: float, aligned: list) -> list:
+        timing.elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+        timing.ok = None not in aligned
+        return aligned
+
+    def _retryable(self, error: Exception, timing: ChunkTiming) -> bool:
+        record_error("chunk")
+        retryable = isinstance(error, GeminiCallError) and error.retryable
+        logger.warning("Error processing chunk %d (attempt %d): %s", timing.chunk_index, timing.attempts, error)
+        return retryable
+
+    def _fill_missing(self, chunk: list[str], aligned: list, missing: list[int], results: list):
+        """Places results for the `missing` positions of the chunk into `aligned`."""
+        for i, result in zip(missing, self._align_results([chunk[i] for i in missing], results)):
+            aligned[i] = result
+        if None in aligned:
+            record_error("incomplete_response")
+            logger.info("Gemini returned no usable result for %d of %d sentences.", aligned.count(None), len(missing))
+
+    def _check_chunk(self, chunk: list[str], check_type: str, timing: ChunkTiming) -> list:
+        """Checks one chunk. Sentences without a usable result are re-requested on their own,
+        with jittered exponential backoff, until RETRY_ATTEMPTS calls have been made."""
+        start_time = time.perf_counter()
+        aligned = [None] * len(chunk)
+        with tracking(timing, check_type):
+            for attempt in range(RETRY_ATTEMPTS):
+                if attempt:
+                    time.sleep(_backoff_delay(attempt))
+                timing.attempts = attempt + 1
+                missing = [i for i, r in enumerate(aligned) if r is None]
+                try:
+                    results = self._process_sentences([chunk[i] for i in missing], check_type)
+                except Exception as e:
+                    if self._retryable(e, timing):
+                        continue
+                    break
+                self._fill_missing(chunk, aligned, missing, results)
+                if None not in aligned:
+                    break
+        return self._finish_chunk(timing, start_time, aligned)
+
+    def _plan_chunks(self, sentences: list[str], check_type: str):
+        policy = ChunkPolicy.for_check_type(check_type)
+        plan = plan_chunks(sentences, policy)
+        chunks = [[sentences[i] for i in indices] for indices in plan]
+        chunk_timings = [chunk_timing_for(n, chunk, policy, check_type) for n, chunk in enumerate(chunks)]
+        logger.debug("Processing %d sentences in %d chunk(s)", len(sentences), len(chunks))
+        return policy, plan, chunks, chunk_timings
+
+    def _reassemble(self, sentences: list[str], plan: list, outputs: list, chunk_timings: list, timings: list | None) -> list:
+        aligned = [None] * len(sentences)
+        for indices, output in zip(plan, outputs):
+            for i, result in zip(indices, output):
+                aligned[i] = result
+
+        if timings is not None:
+            timings.extend(chunk_timings)
+        return aligned
+
+    def _run_chunks(self, sentences: list[str], check_type: str, timings: list | None = None) -> list:
+        """Splits sentences into token-budgeted chunks, checks them concurrently and
+        returns results aligned to the input (None where the model gave no result)."""
+        policy, plan, chunks, chunk_timings = self._plan_chunks(sentences, check_type)
+
+        if len(chunks) == 1:
+            outputs = [self._check_chunk(chunks[0], check_type, chunk_timings[0])]
+        else:
+            # One context copy per chunk so stage timings reach the caller's tracking() sinks.
+            contexts = [contextvars.copy_context() for _ in chunks]
+            with ThreadPoolExecutor(max_workers=min(policy.max_concurrency, len(chunks))) as pool:
+                outputs = list(pool.map(
+                    lambda n: contexts[n].run(self._check_chunk, chunks[n], check_type, chunk_timings[n]),
+                    range(len(chunks)),
+                ))
+        return self._reassemble(sentences, plan, outputs, chunk_timings, timings)
+
+    # --- Cache split and merge ---
+    def _ignored_results(self, sentences: list[str]) -> dict[int, dict]:
+        """Inputs that are themselves on the ignore list are correct by definition and never checked."""
+        if self.ignore_index is None:
+            return {}
+        return {
+            i: {"original_text": s, "is_correct": True, "corrections": []}
+            for i, s in enumerate(sentences) if self.ignore_index.contains(s)
+        }
+
+    def _pending_sentences(self, sentences: list[str], cached: dict) -> list[str]:
+        # Deduplicate the misses so repeated strings in one batch are only sent once.
+        pending = {}
+        for i, sentence in enumerate(sentences):
+            if i not in cached:
+                pending.setdefault(normalize_text(sentence), sentence)
+        if pending:
+            logger.debug("Result cache: %d hits, %d sentences to check.", len(cached), len(pending))
+        return list(pending.values())
+
+    def _fresh_results(self, to_check: list[str], aligned: list) -> dict:
+        return {normalize_text(s): r for s, r in zip(to_check, aligned) if r is not None}
+
+    def _cacheable(self, to_check: list[str], fresh: dict, uncached=frozenset()) -> list[tuple[str, dict]]:
+        return [(s, fresh[key]) for s in to_check if (key := normalize_text(s)) in fresh and key not in uncached]
+
+    def _local_check(self, sentence: str, check_type: str, record: bool = False) -> tuple[dict | None, int]:
+        """Correction memo, then brand pre-checker or UX triage. Returns (the result if no model
+        call is needed, else None; how many learned fixes the memo has for the sentence).
+        `record` counts the triage decision. Learned fixes themselves are applied by
+        _finalize_result."""
+        match = self.memo.check(sentence, check_type) if self.memo is not None else None
+        from_memo = len(match.corrections) if match is not None else 0
+        if match is not None and match.result is not None:
+            return match.result, from_memo
+        if check_type == "UX_WRITING" and self.triage is not None:
+            decision = self.triage.decide(sentence)
+            if record:
+                self.triage.record(decision)
+            if not decision.send:
+                return {"original_text": sentence, "is_correct": True, "corrections": []}, 0
+        if check_type != "TYPO_BRAND" or self.prechecker is None:
+            return None, from_memo
+        precheck = self.prechecker.check(sentence, match.spans if match is not None else ())
+        if precheck.resolved:
+            return precheck.as_result(sentence), from_memo
+        # The model judges every sentence it is sent; its answer is not overridden by the pre-checker.
+        return None, from_memo
+
+    def _precheck(self, to_check: list[str], check_type: str) -> tuple[dict, list[str], set]:
+        """Runs the correction memo and the brand pre-checker or UX triage. Returns (results
+        resolved locally, sentences that still need Gemini, keys of local results that must
+        not be cached)."""
+        local_stage = {"TYPO_BRAND": self.prechecker, "UX_WRITING": self.triage}.get(check_type)
+        if self.memo is None and local_stage is None:
+            return {}, to_check, set()
+
+        local, remaining, uncached = {}, [], set()
+        with stage("precheck", check_type):
+            for sentence in to_check:
+                result, from_memo = self._local_check(sentence, check_type, record=True)
+                if self.memo is not None:
+                    self.memo.record(from_memo, result is not None)
+                key = normalize_text(sentence)
+                if result is not None:
+                    local[key] = result
+                    # Verdicts that depend on the memo or the triage settings, which the cache key
+                    # doesn't cover; they are cheap to reach again.
+                    if from_memo or (check_type == "UX_WRITING" and self.triage is not None):
+                        uncached.add(key)
+                else:
+                    remaining.append(sentence)
+        if local:
+            logger.debug("Resolved %d of %d sentences locally.", len(local), len(to_check))
+        return local, remaining, uncached
+
+    def _needs_gemini(self, sentence: str, check_type: str) -> bool:
+        return self._local_check(sentence, check_type)[0] is None
+
+    def _combine_fresh(self, remaining: list[str], aligned: list, local: dict) -> dict:
+        fresh = self._fresh_results(remaining, aligned)
+        fresh.update(local)
+        return fresh
+
+    def _record_triage_samples(self, remaining: list[str], fresh: dict, check_type: str):
+        """Scores triage on the sentences it only sent to the model to be measured."""
+        if check_type != "UX_WRITING" or self.triage is None:
+            return
+        for sentence in remaining:
+            result = fresh.get(normalize_text(sentence))
+            if result is not None and self.triage.decide(sentence).sampled:
+                self.triage.record_sample(result)
+
+    def _finalize_result(self, result: dict, sentence: str, check_type: str) -> dict:
+        result = {**result, "original_text": sentence}
+        # Applied on the way out, so cached results follow the current memo: its learned fixes...
+        if self.memo is not None:
+            result = self.memo.apply_result(result, check_type)
+        # ...words ignored after the result was cached...
+        if self.ignore_index is not None:
+            result = self.ignore_index.filter_result(result)
+        # ...and corrections users have since rejected often enough to suppress.
+        if self.memo is not None:
+            result = self.memo.filter_result(result)
+        return result
+
+    def _merge_indexed(self, sentences: list[str], cached: dict, fresh: dict, check_type: str) -> dict[int, dict]:
+        # Merge cached and fresh results back in input order.
+        merged = {}
+        for i, sentence in enumerate(sentences):
+            result = cached.get(i)
+            if result is None:
+                result = fresh.get(normalize_text(sentence))
+            if result is not None:
+                merged[i] = self._finalize_result(result, sentence, check_type)
+        return merged
+
+    def _merge_results(self, sentences: list[str], cached: dict, fresh: dict, check_type: str) -> list:
+        return list(self._merge_indexed(sentences, cached, fresh, check_type).values())
+
+    def _combine_checks(self, sentence: str, results: dict[str, dict]) -> dict:
+        """One result for a sentence checked by several check types; `checks` lists the ones that completed."""
+        corrections = [c for result in results.values() for c in result["corrections"]]
+        return {
+            "original_text": sentence,
+            "is_correct": len(corrections) == 0,
+            "corrections": corrections,
+            "checks": list(results),
+        }
+
+    def _compute_fresh(self, owned: list[str], check_type: str, timings: list | None) -> dict:
+        local, remaining, uncached = self._precheck(owned, check_type)
+        aligned = self._run_chunks(remaining, check_type, timings) if remaining else []
+        fresh = self._combine_fresh(remaining, aligned, local)
+        self._record_triage_samples(remaining, fresh, check_type)
+        self.cache.set_many(self._cacheable(owned, fresh, uncached), check_type)
+        return fresh
+
+    def batch_check_sentences(self, sentences: list[str], check_type: str, timings: list | None = None) -> list:
+        """Checks a batch, serving repeat sentences from the result cache and sending only misses to Gemini.
+
+        Pass a list as `timings` to receive one ChunkTiming per Gemini call.
+        """
+        if not sentences:
+            return []
+
+        with stage("cache_lookup", check_type):
+            cached = self.cache.get_many(sentences, check_type)
+        cached.update(self._ignored_results(sentences))
+        to_check = self._pending_sentences(sentences, cached)
+
+        fresh = {}
+        if to_check:
+            owned, waiting = self.single_flight.claim(check_type, to_check)
+            try:
+                if owned:
+                    fresh = self._compute_fresh(owned, check_type, timings)
+            finally:
+                self.single_flight.resolve(check_type, owned, fresh)
+            # Sentences another caller was already checking: wait for its result instead.
+            for key, future in waiting.items():
+                if future.result() is not None:
+                    fresh[key] = future.result()
+        return self._merge_results(sentences, cached, fresh, check_type)
+
+
+class AsyncSpellChecker(SpellChecker):
+    """SpellChecker for the API: embedding and generation are awaited and chunks run as
+    concurrent tasks, so a slow Gemini call never blocks the event loop."""
+
+    def __init__(self, client: AsyncGeminiClient, cache: ResultCache | None = None, retriever=None, prechecker: BrandPrechecker | None = None, ignore_index: IgnoreIndex | None = None, embedding_store: EmbeddingStore | None = None, memo: CorrectionMemo | None = None, triage: UxTriage | None = None):
+        super().__init__(client, cache, retriever, prechecker, ignore_index, embedding_store, memo, triage)
+
+    async def _cache_call(self, fn, *args):
+        # The local LRU tier is cheap; only Redis round trips are worth a worker thread.
+        if self.cache.redis is not None:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def _store_call(self, fn, *args):
+        # The persistent embedding store does SQLite reads and writes and flushes its memmap.
+        if self.embedding_store is not None:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def _embed_sentences(self, texts: list[str]) -> list:
+        found, missing = await self._store_call(self._split_embedding_lookups, texts)
+        if missing:
+            with stage("embedding"):
+                embeddings = await self.client.embed(missing, task_type="RETRIEVAL_QUERY")
+            await self._store_call(self._remember_embeddings, missing, embeddings)
+            found.update(zip(missing, embeddings))
+        return [found[t] for t in texts]
+
+    async def _find_relevant_rules(self, text_list: list[str], source_id: str) -> str:
+        if not text_list:
+            return "No text provided for context search."
+
+        if self.retrieval_mode == "joined":
+            embeddings = await self._embed_sentences([", ".join(text_list)])
+            retrieve = self._query_rules
+            query = embeddings[0]
+        else:
+            query = await self._embed_sentences(text_list)
+            retrieve = self._union_rules
+
+        if self.retriever.blocking:
+            return await asyncio.to_thread(retrieve, query, source_id)
+        return retrieve(query, source_id)
+
+    async def _process_sentences(self, sentences: list[str], check_type: str) -> list:
+        if not sentences:
+            return []
+
+        source_id = self._source_for(check_type)
+        if not source_id:
+            raise ValueError(f"Invalid check_type '{check_type}'.")
+
+        relevant_rules = await self._find_relevant_rules(sentences, source_id)
+        response_str = await self.client.correct_batch_of_sentences(
+            sentences, "en-GB", relevant_rules, check_type
+        )
+        return self._parse_response(response_str)
+
+    async def _check_chunk(self, chunk: list[str], check_type: str, timing: ChunkTiming) -> list:
+        start_time = time.perf_counter()
+        aligned = [None] * len(chunk)
+        with tracking(timing, check_type):
+            for attempt in range(RETRY_ATTEMPTS):
+                if attempt:
+                    await asyncio.sleep(_backoff_delay(attempt))
+                timing.attempts = attempt + 1
+                missing = [i for i, r in enumerate(aligned) if r is None]
+                try:
+                    results = await self._process_sentences([chunk[i] for i in missing], check_type)
+                except Exception as e:
+                    if self._retryable(e, timing):
+                        continue
+                    break
+                self._fill_missing(chunk, aligned, missing, results)
+                if None not in aligned:
+                    break
+        return self._finish_chunk(timing, start_time, aligned)
+
+    async def _run_chunks(self, sentences: list[str], check_type: str, timings: list | None = None) -> list:
+        policy, plan, chunks, chunk_timings = self._plan_chunks(sentences, check_type)
+        semaphore = asyncio.Semaphore(policy.max_concurrency)
+
+        async def run(n: int) -> list:
+            async with semaphore:
+                return await self._check_chunk(chunks[n], check_type, chunk_timings[n])
+
+        outputs = await asyncio.gather(*(run(n) for n in range(len(chunks))))
+        return self._reassemble(sentences, plan, outputs, chunk_timings, timings)
+
+    async def _compute_fresh(self, owned: list[str], check_type: str, timings: list | None) -> dict:
+        local, remaining, uncached = self._precheck(owned, check_type)
+        aligned = await self._run_chunks(remaining, check_type, timings) if remaining else []
+        fresh = self._combine_fresh(remaining, aligned, local)
+        self._record_triage_samples(remaining, fresh, check_type)
+        await self._cache_call(self.cache.set_many, self._cacheable(owned, fresh, uncached), check_type)
+        return fresh
+
+    async def _await_shared(self, waiting: dict) -> dict:
+        """Waits for sentences another request is already checking and returns their results."""
+        if not waiting:
+            return {}
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in waiting.values()))
+        return {key: result for key, result in zip(waiting, results) if result is not None}
+
+    async def _lookup(self, sentences: list[str], check_type: str) -> tuple[dict, list[str]]:
+        """Cache and ignore-list hits by input index, plus the distinct sentences still to check."""
+        with stage("cache_lookup", check_type):
+            cached = await self._cache_call(self.cache.get_many, sentences, check_type)
+        cached.update(self._ignored_results(sentences))
+        return cached, self._pending_sentences(sentences, cached)
+
+    async def _resolve_pending(self, to_check: list[str], check_type: str, timings: list | None) -> dict:
+        fresh = {}
+        if to_check:
+            owned, waiting = self.single_flight.claim(check_type, to_check)
+            try:
+                if owned:
+                    fresh = await self._compute_fresh(owned, check_type, timings)
+            finally:
+                self.single_flight.resolve(check_type, owned, fresh)
+            fresh.update(await self._await_shared(waiting))
+        return fresh
+
+    async def batch_check_sentences(self, sentences: list[str], check_type: str, timings: list | None = None) -> list:
+        if not sentences:
             return []
 
-    def batch_check_sentences(self, sentences: list[str], check_type: str) -> list:
-        """Send all sentences at once (no chunking)."""
+        cached, to_check = await self._lookup(sentences, check_type)
+        fresh = await self._resolve_pending(to_check, check_type, timings)
+        return self._merge_results(sentences, cached, fresh, check_type)
+
+    async def _prefetch_embeddings(self, texts: list[str]):
+        """Embeds texts in one call up front so checks running side by side find every
+        vector in the query-embedding cache instead of each embedding the same sentences."""
+        if texts and self.retrieval_mode == "per_sentence":
+            await self._embed_sentences(list(dict.fromkeys(texts)))
+
+    async def full_check_sentences(self, sentences: list[str], ux_indices: list[int], timings: list | None = None) -> list:
+        """TYPO_BRAND on every sentence and UX_WRITING on the sentences at `ux_indices`, merged
+        into one result per sentence. Sentences are embedded once for both checks' retrieval
+        and the two checks' Gemini calls run concurrently."""
         if not sentences:
             return []
-        
-        print(f"Processing {len(sentences)} sentences at once...")
-        return self._process_sentences(sentences, check_type)
+
+        ux_sentences = [sentences[i] for i in ux_indices]
+        typo_cached, typo_pending = await self._lookup(sentences, "TYPO_BRAND")
+        ux_cached, ux_pending = await self._lookup(ux_sentences, "UX_WRITING") if ux_sentences else ({}, [])
+        await self._prefetch_embeddings(
+            [s for s in typo_pending if self._needs_gemini(s, "TYPO_BRAND")] + ux_pending
+        )
+
+        typo_fresh, ux_fresh = await asyncio.gather(
+            self._resolve_pending(typo_pending, "TYPO_BRAND", timings),
+            self._resolve_pending(ux_pending, "UX_WRITING", timings),
+        )
+        typo = self._merge_indexed(sentences, typo_cached, typo_fresh, "TYPO_BRAND")
+        ux = {ux_indices[j]: r for j, r in self._merge_indexed(ux_sentences, ux_cached, ux_fresh, "UX_WRITING").items()}
+
+        merged = []
+        for i, sentence in enumerate(sentences):
+            results = {name: r for name, r in (("TYPO_BRAND", typo.get(i)), ("UX_WRITING", ux.get(i))) if r is not None}
+            if results:
+                merged.append(self._combine_checks(sentence, results))
+        return merged
+
+    async def stream_check_sentences(self, sentences: list[str], check_type: str, timings: list | None = None):
+        """Async generator of (input index, result) pairs. Cached and locally resolved sentences
+        come first; the rest follow chunk by chunk as each Gemini response is parsed, so
+        nothing is held back for the slowest chunk."""
+        if not sentences:
+            return
+
+        cached, to_check = await self._lookup(sentences, check_type)
+        for i, result in cached.items():
+            yield i, self._finalize_result(result, sentences[i], check_type)
+
+        if not to_check:
+            return
+
+        indices_by_key = {}
+        for i, sentence in enumerate(sentences):
+            if i not in cached:
+                indices_by_key.setdefault(normalize_text(sentence), []).append(i)
+
+        owned, waiting = self.single_flight.claim(check_type, to_check)
+        try:
+            local, remaining, uncached = self._precheck(owned, check_type)
+            if local:
+                await self._cache_call(self.cache.set_many, self._cacheable(owned, local, uncached), check_type)
+                self.single_flight.resolve(check_type, [s for s in owned if normalize_text(s) in local], local)
+            for key, result in local.items():
+                for i in indices_by_key[key]:
+                    yield i, self._finalize_result(result, sentences[i], check_type)
+
+            if remaining:
+                async with aclosing(self._stream_chunks(remaining, check_type, timings)) as chunk_results:
+                    async for key, result in chunk_results:
+                        for i in indices_by_key[key]:
+                            yield i, self._finalize_result(result, sentences[i], check_type)
+        finally:
+            # Anything still claimed (failed chunk, client gone) must not leave waiters hanging.
+            self.single_flight.resolve(check_type, owned, {})
+
+        for key, result in (await self._await_shared(waiting)).items():
+            for i in indices_by_key[key]:
+                yield i, self._finalize_result(result, sentences[i], check_type)
+
+    async def _stream_chunks(self, remaining: list[str], check_type: str, timings: list | None):
+        """Runs chunks concurrently and yields (normalized sentence, result) as each one completes."""
+        policy, plan, chunks, chunk_timings = self._plan_chunks(remaining, check_type)
+        semaphore = asyncio.Semaphore(policy.max_concurrency)
+
+        async def run(n: int) -> tuple[int, list]:
+            async with semaphore:
+                return n, await self._check_chunk(chunks[n], check_type, chunk_timings[n])
+
+        tasks = [asyncio.ensure_future(run(n)) for n in range(len(chunks))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                n, aligned = await next_done
+                fresh = self._fresh_results(chunks[n], aligned)
+                self._record_triage_samples(chunks[n], fresh, check_type)
+                await self._cache_call(self.cache.set_many, self._cacheable(chunks[n], fresh), check_type)
+                self.single_flight.resolve(check_type, chunks[n], fresh)
+                for key, result in fresh.items():
+                    yield key, result
+        finally:
+            # The client went away (or the consumer stopped early): don't keep paying for Gemini calls.
+            for task in tasks:
+                task.cancel()
+            if timings is not None:
+                timings.extend(chunk_timings)
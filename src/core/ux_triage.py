@@ -0,0 +1,159 @@
+# src/core/ux_triage.py
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from ..services.prompt_builder import SYSTEM_INSTRUCTIONS
+
+logger = logging.getLogger(__name__)
+
+GRAMMAR_KB_PATH = "data/knowledge_bases/grammar_and_style.json"
+
+# Sentences scoring below the threshold are answered locally as needing no rewrite.
+# 0 sends every sentence to the model, as before triage existed.
+THRESHOLD = float(os.getenv("UX_TRIAGE_THRESHOLD", 1.0))
+# Share of below-threshold sentences sent to the model anyway to measure what triage misses.
+SAMPLE_RATE = float(os.getenv("UX_TRIAGE_SAMPLE_RATE", 0.05))
+
+NEGATION = re.compile(r"\b(?:not|no|never|nothing|nobody|none|nowhere|neither|nor|cannot)\b|n['’]t\b", re.IGNORECASE)
+LIST_PATTERN = re.compile(
+    r"\b([\w'’-]+)((?:, [\w'’-]+(?: [\w'’-]+)?)+),? (?:and|or) ([\w'’-]+)", re.IGNORECASE
+)
+
+
+def _double_negative(sentence: str) -> bool:
+    return len(NEGATION.findall(sentence)) >= 2
+
+
+def _non_parallel_list(sentence: str) -> bool:
+    """A list whose items start with different verb forms: 'spending, savings, and to invest'."""
+    def form(word: str) -> str:
+        word = word.lower()
+        return "infinitive" if word == "to" else "gerund" if word.endswith("ing") else "other"
+
+    for match in LIST_PATTERN.finditer(sentence):
+        heads = [match.group(1)] + [item.split()[0] for item in match.group(2).split(", ")[1:]] + [match.group(3)]
+        forms = {form(h) for h in heads}
+        if len(forms) > 1 and forms != {"other"}:
+            return True
+    return False
+
+
+def _pattern(regex: str):
+    compiled = re.compile(regex, re.IGNORECASE)
+    return lambda sentence: compiled.search(sentence) is not None
+
+
+# (signal, pattern matched against a rule's guideline, detector). A signal is active when the
+# grammar and style knowledge base has a rule for it or the static UX instructions ask for it.
+SIGNALS = [
+    ("future_tense", r"future tense", _pattern(r"\b(?:will|shall|won['’]t)\b|\bgoing to\b|['’]ll\b")),
+    ("passive_voice", r"passive voice", _pattern(
+        r"\b(?:am|is|are|was|were|be|been|being|gets?|got)\s+(?:\w+ly\s+)?"
+        r"(?:\w+ed|\w+en|made|sent|done|paid|held|kept|set|put|built|sold|told|shown|seen)\b"
+    )),
+    ("non_parallel_list", r"parallel", _non_parallel_list),
+    ("third_person", r"second person", _pattern(r"\b(?:the|each|every|all|a)\s+(?:users?|customers?|members?|clients?)\b")),
+    ("missing_contraction", r"contraction", _pattern(
+        r"\b(?:do|does|did|is|are|was|were|has|have|had|will|would|could|should|can|must)\s+not\b|\bcannot\b"
+        r"|\b(?:you|we|they)\s+(?:are|will|have|would)\b|\b(?:it|that|there)\s+is\b"
+    )),
+    ("agreement", r"subject.verb agreement", _pattern(
+        r"\b\w+s\s+of\s+(?:the\s+|your\s+|this\s+|our\s+)?\w+\s+(?:is|was|has)\b"
+        r"|\b(?:he|she|it)\s+(?:are|were|have)\b|\b(?:they|we|you|these|those)\s+(?:is|was|has)\b"
+    )),
+    ("double_negative", r"double negative", _double_negative),
+    ("pronoun_agreement", r"pronouns? match|antecedent", _pattern(
+        r"\b(?:each|every|any|no)\s+\w+\b[^.!?]*\b(?:their|they|them|themselves)\b"
+    )),
+    ("missing_oxford_comma", r"oxford comma|serial comma", _pattern(r"\b\w+, (?:\w+ ){1,2}(?:and|or) \w+")),
+]
+
+
+class TriageDecision:
+    __slots__ = ("score", "signals", "send", "sampled")
+
+    def __init__(self, score: float, signals: list[str], send: bool, sampled: bool):
+        self.score = score
+        self.signals = signals
+        # True when the sentence goes to the model; `sampled` if only to measure triage.
+        self.send = send
+        self.sampled = sampled
+
+
+class UxTriage:
+    """Cheap local scoring of UX_WRITING candidates, compiled from the grammar and style knowledge base.
+
+    Each rule or static instruction with a known local signal (future tense, passive voice, Oxford
+    comma, ...) adds its weight to a sentence's score when the signal fires. Sentences below `threshold` get a no-rewrite result
+    without a model call, except a deterministic `sample_rate` share that still goes to the model:
+    when those come back with a rewrite, triage missed it, which gives the false-negative rate
+    to tune the threshold against.
+    """
+
+    def __init__(self, rules: list[dict], threshold: float = THRESHOLD, sample_rate: float = SAMPLE_RATE,
+                 instructions: str = SYSTEM_INSTRUCTIONS["UX_WRITING"]):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.signals = []
+        for name, guideline_pattern, detector in SIGNALS:
+            matching = [r for r in rules if re.search(guideline_pattern, r.get("guideline", ""), re.IGNORECASE)]
+            if not matching and not re.search(guideline_pattern, instructions, re.IGNORECASE):
+                continue
+            self.signals.append((name, 1.0, detector))
+            missed = [r["incorrect_example"] for r in matching if r.get("incorrect_example") and not detector(r["incorrect_example"])]
+            if missed:
+                logger.warning("UX triage signal '%s' does not fire on its rule's example: %s", name, missed[0])
+        self._lock = threading.Lock()
+        self.scored = 0
+        self.skipped = 0
+        self.sampled = 0
+        self.sample_results = 0
+        self.false_negatives = 0
+        logger.info("UX triage compiled %d of %d rules into signals (threshold %.2f).", len(self.signals), len(rules), threshold)
+
+    @classmethod
+    def from_file(cls, path: str = GRAMMAR_KB_PATH, **kwargs) -> "UxTriage":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def score(self, sentence: str) -> tuple[float, list[str]]:
+        fired = [(name, weight) for name, weight, detector in self.signals if detector(sentence)]
+        return sum((weight for _, weight in fired), 0.0), [name for name, _ in fired]
+
+    def _in_sample(self, sentence: str) -> bool:
+        # Hash-based, so a sentence is sampled the same way on every call and in every worker.
+        digest = hashlib.md5(sentence.encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") / 0xFFFFFFFF < self.sample_rate
+
+    def decide(self, sentence: str) -> TriageDecision:
+        """Pure decision; counts are kept by record()."""
+        score, signals = self.score(sentence)
+        if score >= self.threshold:
+            return TriageDecision(score, signals, True, False)
+        sampled = self._in_sample(sentence)
+        return TriageDecision(score, signals, sampled, sampled)
+
+    def record(self, decision: TriageDecision):
+        with self._lock:
+            self.scored += 1
+            self.skipped += not decision.send
+            self.sampled += decision.sampled
+
+    def record_sample(self, result: dict):
+        """The model's answer for a sampled sentence: any correction means triage would have missed it."""
+        with self._lock:
+            self.sample_results += 1
+            self.false_negatives += not result.get("is_correct", True)
+
+    def stats(self) -> dict:
+        return {
+            "scored": self.scored,
+            "skipped": self.skipped,
+            "sampled": self.sampled,
+            "false_negatives": self.false_negatives,
+            "filter_rate": round(self.skipped / self.scored, 4) if self.scored else 0.0,
+            "false_negative_rate": round(self.false_negatives / self.sample_results, 4) if self.sample_results else 0.0,
+        }
@@ -2,27 +2,57 @@
 from importlib import metadata
 import time
 import json
-import sqlite3
 import re
-import subprocess
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from fastapi import FastAPI, BackgroundTasks, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 
 # Import all Pydantic models from their correct location
-from .models.request_models import SpellCheckRequest, FeedbackRequest, IgnoreRequest
+from .models.request_models import SpellCheckRequest, DocumentRequest, FeedbackRequest, IgnoreRequest
 from .models.response_models import Metadata
-from .services.gemini_client import GeminiClient
-from .core.spell_checker import SpellChecker
+from .services.container import ServiceContainer
+from .services.quota_scheduler import BACKGROUND, request_priority
+from .core.ingestion import sync_knowledge_base
+from .core.feedback_store import FeedbackQueueFull
+from .core.documents import DocumentRevision, locate_corrections
+from .core.checks import CHECK_TYPES, ux_writing_candidates, run_check
+from .core.logging_config import configure_logging
+from .core.metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS, CallbackCounter, CallbackGauge, StageBreakdown, tracking
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # --- Constants and App Setup ---
-KNOWLEDGE_BASE_PATH = "data/brand_guide_knowledge_base.json"
-IGNORE_FILE_PATH = "data/ignore_list.txt"
+KNOWLEDGE_BASE_PATH = "data/knowledge_bases/spelling_and_terminology.json"
+
+def services_for(app: FastAPI) -> ServiceContainer:
+    """The app's service container; set app.state.services before startup to inject your own."""
+    if getattr(app.state, "services", None) is None:
+        app.state.services = ServiceContainer()
+    return app.state.services
+
+def _log_startup_failure(task: asyncio.Task):
+    # Already logged by the container; retrieved here so asyncio doesn't warn about it.
+    if not task.cancelled():
+        task.exception()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services = services_for(app)
+    # Build in the background: the worker accepts connections (and answers /ready) right away.
+    asyncio.create_task(services.start()).add_done_callback(_log_startup_failure)
+    yield
+    await services.close()
 
 app = FastAPI(
     title="Advanced Spell Checker AI",
     description="An intelligent spell and grammar checker using Gemini and RAG.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = ["*"]
@@ -34,80 +64,267 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Service Initialization ---
-gemini_client = GeminiClient()
-spell_checker = SpellChecker(client=gemini_client)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start_time = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep the series count bounded.
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start_time,
+        method=request.method,
+        path=route.path if route is not None else "unmatched",
+        status=response.status_code,
+    )
+    return response
+
+# --- Service Injection ---
+async def get_services(request: Request) -> ServiceContainer:
+    """Waits for the services on the first requests of a worker; 503 if they failed to start."""
+    services = services_for(request.app)
+    try:
+        return await services.start()
+    except Exception:
+        raise HTTPException(status_code=503, detail=f"Service unavailable: {services.error}")
+
+def _ready_services() -> ServiceContainer | None:
+    services = getattr(app.state, "services", None)
+    return services if services is not None and services.ready else None
+
+# Counters kept by the services themselves, read at scrape time (empty until the services are up).
+def _cache_lookups() -> dict:
+    if (services := _ready_services()) is None:
+        return {}
+    spell_checker = services.spell_checker
+    return {
+        ("result", "hit"): spell_checker.cache.hits,
+        ("result", "miss"): spell_checker.cache.misses,
+        ("query_embedding", "hit"): spell_checker.query_embeddings.hits,
+        ("query_embedding", "miss"): spell_checker.query_embeddings.misses,
+        **({
+            ("embedding_store", "hit"): spell_checker.embedding_store.hits,
+            ("embedding_store", "miss"): spell_checker.embedding_store.misses,
+        } if spell_checker.embedding_store is not None else {}),
+    }
+
+def _single_flight_sentences() -> dict:
+    if (services := _ready_services()) is None:
+        return {}
+    single_flight = services.spell_checker.single_flight
+    return {("leader",): single_flight.led_sentences, ("deduplicated",): single_flight.deduplicated_sentences}
+
+def _feedback_rows() -> dict:
+    if (services := _ready_services()) is None:
+        return {}
+    return {("written",): services.feedback_writer.written, ("rejected",): services.feedback_writer.rejected}
+
+def _document_sentences() -> dict:
+    if (services := _ready_services()) is None:
+        return {}
+    documents = services.documents
+    return {
+        ("reused",): documents.reused_sentences,
+        ("checked",): documents.checked_sentences,
+        ("skipped",): documents.skipped_sentences,
+    }
+
+def _correction_memo() -> dict:
+    if (services := _ready_services()) is None or services.spell_checker.memo is None:
+        return {}
+    stats = services.spell_checker.memo.stats()
+    return {(field,): stats[field] for field in ("lookups", "hits", "resolved", "applied", "suppressed")}
+
+def _ux_triage() -> dict | None:
+    if (services := _ready_services()) is None or services.spell_checker.triage is None:
+        return None
+    return services.spell_checker.triage.stats()
+
+def _quota_stats() -> dict:
+    if (services := _ready_services()) is None:
+        return {}
+    return services.gemini_client.quota.stats()
+
+CallbackCounter(
+    "spellcheck_cache_lookups_total", "Cache lookups by cache and outcome.", ("cache", "outcome"), _cache_lookups,
+)
+CallbackCounter(
+    "spellcheck_single_flight_sentences_total", "Sentences computed by a leader or shared with a concurrent request.", ("role",),
+    _single_flight_sentences,
+)
+CallbackCounter(
+    "spellcheck_feedback_rows_total", "Feedback rows written or rejected because the queue was full.", ("outcome",),
+    _feedback_rows,
+)
+CallbackCounter(
+    "spellcheck_document_sentences_total", "Document sentences reused from the previous revision, sent to be checked, or skipped by the check.", ("outcome",),
+    _document_sentences,
+)
+CallbackCounter(
+    "spellcheck_correction_memo_total", "Correction memo activity: sentences looked up, sentences with a learned fix (hits), "
+    "sentences answered without the model (resolved), fixes applied and rejected corrections suppressed.", ("event",),
+    _correction_memo,
+)
+CallbackCounter(
+    "spellcheck_ux_triage_sentences_total", "UX_WRITING sentences scored by local triage, skipped without a model call, "
+    "sampled to the model below the threshold, and sampled ones the model still rewrote (false_negatives).", ("outcome",),
+    lambda: {(field,): stats[field] for field in ("scored", "skipped", "sampled", "false_negatives")} if (stats := _ux_triage()) else {},
+)
+CallbackGauge(
+    "spellcheck_ux_triage_rate", "UX triage filter_rate (share of sentences skipped) and false_negative_rate (share of sampled "
+    "sentences the model rewrote), for tuning UX_TRIAGE_THRESHOLD.", ("rate",),
+    lambda: {(field,): stats[field] for field in ("filter_rate", "false_negative_rate")} if (stats := _ux_triage()) else {},
+)
+CallbackGauge(
+    "spellcheck_gemini_scheduler", "Gemini scheduler state: queue_depth, in_flight and the adaptive concurrency_limit.", ("model", "field"),
+    lambda: {
+        (model, field): value
+        for model, stats in _quota_stats().items()
+        for field, value in stats.items() if field in ("queue_depth", "in_flight", "concurrency_limit")
+    },
+)
+CallbackCounter(
+    "spellcheck_gemini_rate_limited_total", "Gemini calls rejected with 429.", ("model",),
+    lambda: {(model,): stats["rate_limited"] for model, stats in _quota_stats().items()},
+)
 
 
 # --- Helper Functions for Learning ---
-def add_new_rule_to_knowledge_base(rule_content: str):
-    """Adds a new learned rule to the JSON knowledge base and re-ingests."""
+def add_new_rule_to_knowledge_base(rule_content: str, example: str) -> bool:
+    """Adds a new learned rule to the JSON knowledge base. Returns True if the file changed."""
     try:
-        with open(KNOWLEDGE_BASE_PATH, "r+") as f:
+        with open(KNOWLEDGE_BASE_PATH, "r+", encoding="utf-8") as f:
             knowledge_base = json.load(f)
-            if any(rule["content"] == rule_content for rule in knowledge_base):
-                print("Rule already exists in knowledge base.")
-                return
+            if any(rule.get("guideline") == rule_content for rule in knowledge_base):
+                logger.info("Rule already exists in knowledge base.")
+                return False
             
             knowledge_base.append({
-                "rule_type": "Formatting",
-                "content": rule_content,
-                "source": "Learned from user feedback"
+                "category": "Formatting",
+                "guideline": rule_content,
+                "correct_example": example,
+                "explanation": "Learned from user feedback."
             })
             f.seek(0)
-            json.dump(knowledge_base, f, indent=2)
+            json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
             f.truncate()
-        
-        print("Knowledge base updated. Re-running ingestion script...")
-        subprocess.run(["python", "ingest.py"], check=True, capture_output=True, text=True)
-        print("Ingestion complete. The AI has learned the new rule.")
+        return True
     except Exception as e:
-        print(f"Error updating knowledge base: {e}")
+        logger.error("Error updating knowledge base: %s", e)
+        return False
 
-def add_to_simple_ignore_list(word: str):
-    """Adds a word to the simple text-file ignore list."""
+async def refresh_knowledge_base(spell_checker):
+    """Incrementally re-ingests the knowledge base in-process and reloads the live index."""
     try:
-        with open(IGNORE_FILE_PATH, "r") as f:
-            ignored_words = {line.strip().lower() for line in f}
-    except FileNotFoundError:
-        ignored_words = set()
-
-    if word.lower() not in ignored_words:
-        with open(IGNORE_FILE_PATH, "a") as f:
-            f.write(f"{word}\n")
+        # Re-embedding queues behind interactive checks.
+        with request_priority(BACKGROUND):
+            await asyncio.to_thread(sync_knowledge_base, spell_checker.collection)
+        await asyncio.to_thread(spell_checker.reload_knowledge_base)
+        logger.info("Ingestion complete. The AI has learned the new rule.")
+    except Exception as e:
+        logger.error("Error re-ingesting knowledge base: %s", e)
+
+def add_to_simple_ignore_list(ignore_index, word: str):
+    """Adds a word to the simple text-file ignore list."""
+    if ignore_index.add(word):
         return f"'{word}' added to simple ignore list."
     return f"'{word}' is already in the simple ignore list."
 
 
+def document_sentences(revision: DocumentRevision, ignore_index, reused: set | None = None) -> list[dict]:
+    """Per-sentence results of a revision with character offsets into its text."""
+    sentences = []
+    for i, segment in enumerate(revision.segments):
+        result = revision.results.get(segment.text)
+        if result is not None:
+            # Stored results predate words ignored since; filter them again.
+            result = locate_corrections(ignore_index.filter_result(result), segment)
+        sentences.append({
+            "index": i,
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text,
+            "reused": reused is not None and segment.text in reused,
+            "result": result,
+        })
+    return sentences
+
+def encode_stream_record(kind: str, payload: dict, use_sse: bool) -> str:
+    if use_sse:
+        return f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({"type": kind, **payload}) + "\n"
+
+def stream_check(spell_checker, http_request: Request, texts: list[str], indices: list[int], check_type: str) -> StreamingResponse:
+    """Streams one record per sentence as soon as its chunk is parsed, then a metadata record.
+
+    Records are NDJSON by default, or Server-Sent Events when the client accepts text/event-stream.
+    `index` always refers to the position in the request's `texts`.
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    start_time = time.time()
+
+    async def records():
+        chunk_timings = []
+        processed = 0
+        async for i, result in spell_checker.stream_check_sentences(texts, check_type, chunk_timings):
+            processed += 1
+            yield encode_stream_record("result", {"index": indices[i], "result": result}, use_sse)
+
+        metadata = Metadata(
+            total_processed=processed,
+            processing_time_ms=int((time.time() - start_time) * 1000),
+            model_version="3.0.0-categorized",
+            chunk_timings=[asdict(t) for t in chunk_timings]
+        )
+        yield encode_stream_record("metadata", {"metadata": metadata.model_dump()}, use_sse)
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(records(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
 # --- API Endpoints ---
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the services are built (and warmed, if enabled), 503 before."""
+    services = services_for(app)
+    if services.ready:
+        return {"status": "ready", "warmup": services.warmup, "timings_ms": services.timings_ms}
+    status = "failed" if services.error else "starting"
+    return JSONResponse(status_code=503, content={"status": status, "error": services.error})
+
 @app.post("/v1/spell-check")
-async def spell_check(request: SpellCheckRequest):
-    """Runs only the typo and brand rule check."""
+async def spell_check(request: SpellCheckRequest, breakdown: bool = False, services: ServiceContainer = Depends(get_services)):
+    """Runs only the typo and brand rule check. Pass ?breakdown=true for per-stage timings."""
 
-    print("Received for spell-check:", request.texts)
+    logger.debug("Received for spell-check", extra={"texts": request.texts})
     start_time = time.time()
-    batch_results = spell_checker.batch_check_sentences(request.texts, "TYPO_BRAND")
+    chunk_timings = []
+    with tracking(StageBreakdown(), "TYPO_BRAND") as stages:
+        batch_results = await services.spell_checker.batch_check_sentences(request.texts, "TYPO_BRAND", chunk_timings)
     end_time = time.time()
     
   
     metadata = Metadata(
         total_processed=len(batch_results),
         processing_time_ms=int((end_time - start_time) * 1000),
-        model_version="3.0.0-categorized"
+        model_version="3.0.0-categorized",
+        chunk_timings=[asdict(t) for t in chunk_timings],
+        stage_breakdown=asdict(stages) if breakdown else None
     )
     return {"results": batch_results, "metadata": metadata}
 
 @app.post("/v1/content-check")
-async def content_check(request: SpellCheckRequest):
-    """Runs only the grammar and UX writing check."""
+async def content_check(request: SpellCheckRequest, breakdown: bool = False, services: ServiceContainer = Depends(get_services)):
+    """Runs only the grammar and UX writing check. Pass ?breakdown=true for per-stage timings."""
 
-    print("Received for content-check:", request.texts)
+    logger.debug("Received for content-check", extra={"texts": request.texts})
     start_time = time.time()
 
-    # Filter the list to only include sentences with more than 3 words.
-    texts_to_check = [
-        sentence for sentence in request.texts if len(sentence.split()) > 3
-    ]
+    texts_to_check = [request.texts[i] for i in ux_writing_candidates(request.texts)]
     
     if not texts_to_check:
         # If no sentences meet the criteria, return an empty result immediately.
@@ -117,19 +334,118 @@ async def content_check(request: SpellCheckRequest):
             "model_version": "3.0.0-categorized"
         }}
 
-    batch_results = spell_checker.batch_check_sentences(texts_to_check, "UX_WRITING")
+    chunk_timings = []
+    with tracking(StageBreakdown(), "UX_WRITING") as stages:
+        batch_results = await services.spell_checker.batch_check_sentences(texts_to_check, "UX_WRITING", chunk_timings)
     
     end_time = time.time()
     metadata = Metadata(
         total_processed=len(batch_results),
         processing_time_ms=int((end_time - start_time) * 1000),
-        model_version="3.0.0-categorized"
+        model_version="3.0.0-categorized",
+        chunk_timings=[asdict(t) for t in chunk_timings],
+        stage_breakdown=asdict(stages) if breakdown else None
     )
     return {"results": batch_results, "metadata": metadata}
 
+@app.post("/v1/full-check")
+async def full_check(request: SpellCheckRequest, breakdown: bool = False, services: ServiceContainer = Depends(get_services)):
+    """Runs the typo and brand check on every sentence and the UX writing check on sentences with
+    more than 3 words in one pass, returning one merged result per sentence."""
+
+    logger.debug("Received for full-check", extra={"texts": request.texts})
+    start_time = time.time()
+    chunk_timings = []
+    with tracking(StageBreakdown(), "FULL_CHECK") as stages:
+        batch_results = await services.spell_checker.full_check_sentences(
+            request.texts, ux_writing_candidates(request.texts), chunk_timings
+        )
+
+    end_time = time.time()
+    metadata = Metadata(
+        total_processed=len(batch_results),
+        processing_time_ms=int((end_time - start_time) * 1000),
+        model_version="3.0.0-categorized",
+        chunk_timings=[asdict(t) for t in chunk_timings],
+        stage_breakdown=asdict(stages) if breakdown else None
+    )
+    return {"results": batch_results, "metadata": metadata}
+
+
+@app.put("/v1/documents/{document_id}")
+async def check_document(document_id: str, request: DocumentRequest, breakdown: bool = False, services: ServiceContainer = Depends(get_services)):
+    """Saves a new revision of a document and checks it. The text is split into sentences
+    server-side and only sentences that are new or changed since the previous revision are
+    checked; offsets in the response refer to this revision's text."""
+
+    start_time = time.time()
+    spell_checker = services.spell_checker
+    fingerprint = spell_checker.cache.kb_fingerprint.current()
+    plan = services.documents.plan(document_id, request.text, request.check, fingerprint)
+
+    chunk_timings = []
+    with tracking(StageBreakdown(), CHECK_TYPES[request.check]) as stages:
+        results = await run_check(spell_checker, request.check, plan.pending, chunk_timings) if plan.pending else []
+    fresh = {r["original_text"]: r for r in results}
+    revision = services.documents.commit(document_id, request.text, request.check, fingerprint, plan, fresh)
+
+    metadata = Metadata(
+        total_processed=len(results),
+        processing_time_ms=int((time.time() - start_time) * 1000),
+        model_version="3.0.0-categorized",
+        chunk_timings=[asdict(t) for t in chunk_timings],
+        stage_breakdown=asdict(stages) if breakdown else None
+    )
+    return {
+        "document_id": document_id,
+        "revision": revision.revision,
+        "sentences": document_sentences(revision, services.ignore_index, set(plan.reused)),
+        "diff": {
+            "previous_revision": plan.previous_revision,
+            "sentences": len(plan.segments),
+            "reused": len(plan.reused),
+            "checked": len(plan.pending),
+            "skipped": len(plan.skipped),
+            "removed": plan.removed,
+        },
+        "metadata": metadata,
+    }
+
+@app.get("/v1/documents/{document_id}")
+async def get_document(document_id: str, services: ServiceContainer = Depends(get_services)):
+    """Returns the latest revision of a document with its stored results."""
+    revision = services.documents.get(document_id)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Unknown document.")
+    return {
+        "document_id": document_id,
+        "revision": revision.revision,
+        "check": revision.check,
+        "text": revision.text,
+        "sentences": document_sentences(revision, services.ignore_index),
+    }
+
+@app.delete("/v1/documents/{document_id}", status_code=204)
+async def delete_document(document_id: str, services: ServiceContainer = Depends(get_services)):
+    if not services.documents.delete(document_id):
+        raise HTTPException(status_code=404, detail="Unknown document.")
+    return Response(status_code=204)
+
+
+@app.post("/v1/spell-check/stream")
+async def spell_check_stream(request: SpellCheckRequest, http_request: Request, services: ServiceContainer = Depends(get_services)):
+    """Streaming variant of /v1/spell-check for long documents."""
+    return stream_check(services.spell_checker, http_request, request.texts, list(range(len(request.texts))), "TYPO_BRAND")
+
+@app.post("/v1/content-check/stream")
+async def content_check_stream(request: SpellCheckRequest, http_request: Request, services: ServiceContainer = Depends(get_services)):
+    """Streaming variant of /v1/content-check for long documents."""
+    indices = ux_writing_candidates(request.texts)
+    return stream_check(services.spell_checker, http_request, [request.texts[i] for i in indices], indices, "UX_WRITING")
+
 
 @app.post("/v1/ignore")
-async def handle_ignore_request(request: IgnoreRequest):
+async def handle_ignore_request(request: IgnoreRequest, background_tasks: BackgroundTasks, services: ServiceContainer = Depends(get_services)):
     """Saves ignored words and learns new patterns intelligently."""
     word_to_ignore = request.word.strip()
     if not word_to_ignore:
@@ -137,50 +453,39 @@ async def handle_ignore_request(request: IgnoreRequest):
 
     # Use Advanced Learning ONLY for detectable patterns
     if re.match(r'^\S*\$\d+(\.\d+)?$', word_to_ignore):
-        print(f"Detected currency pattern in '{word_to_ignore}'. Using advanced learning.")
+        logger.info("Detected currency pattern in '%s'. Using advanced learning.", word_to_ignore)
         rule = f"Formatting Rule: Currency formats like '{word_to_ignore}' are valid."
-        add_new_rule_to_knowledge_base(rule)
+        if add_new_rule_to_knowledge_base(rule, word_to_ignore):
+            background_tasks.add_task(refresh_knowledge_base, services.spell_checker)
         status = f"Learned new currency pattern from '{word_to_ignore}'."
     else:
         # For EVERYTHING else, use the simple ignore list that the frontend reads
-        print(f"'{word_to_ignore}' does not match a known pattern. Using simple ignore list.")
-        status = add_to_simple_ignore_list(word_to_ignore)
+        logger.info("'%s' does not match a known pattern. Using simple ignore list.", word_to_ignore)
+        status = await asyncio.to_thread(add_to_simple_ignore_list, services.ignore_index, word_to_ignore)
     
     return {"status": status}
 
 @app.get("/v1/ignore-list")
-async def get_ignore_list():
+async def get_ignore_list(services: ServiceContainer = Depends(get_services)):
     """Provides the simple ignore list to the frontend."""
-    try:
-        with open(IGNORE_FILE_PATH, "r") as f:
-            ignored_words = [line.strip() for line in f]
-        return {"ignore_list": ignored_words}
-    except FileNotFoundError:
-        return {"ignore_list": []}
+    return {"ignore_list": services.ignore_index.entries()}
 
 @app.post("/v1/feedback", status_code=202)
-async def submit_feedback(feedback: FeedbackRequest):
-    """Receives and stores detailed user feedback on corrections."""
-    conn = None
+async def submit_feedback(feedback: FeedbackRequest, services: ServiceContainer = Depends(get_services)):
+    """Receives user feedback on corrections and queues it for a batched write."""
     try:
-        conn = sqlite3.connect("feedback.db")
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO feedback (correction_id, action, original_text, corrected_text, suggested_text)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                feedback.correction_id,
-                feedback.action,
-                feedback.original_text,
-                feedback.corrected_text,
-                feedback.suggested_text,
-            ),
+        services.feedback_writer.submit((
+            feedback.correction_id,
+            feedback.action,
+            feedback.original_text,
+            feedback.corrected_text,
+            feedback.suggested_text,
+        ))
+    except FeedbackQueueFull:
+        return JSONResponse(
+            status_code=503,
+            content={"message": "Feedback queue is full. Please retry shortly."},
+            headers={"Retry-After": "1"}
         )
-        conn.commit()
-    finally:
-        if conn:
-            conn.close()
     
-    return {"status": "Feedback received"}
\ No newline at end of file
+    return {"status": "Feedback received"}
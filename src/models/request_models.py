@@ -6,6 +6,11 @@ class SpellCheckRequest(BaseModel):
     language: str = Field("en-GB", description="Language standard to use.")
     # We will add other fields like confidence_threshold later
 
+class DocumentRequest(BaseModel):
+    text: str = Field(..., description="The full document text; it is split into sentences server-side.")
+    check: Literal["spell-check", "content-check", "full-check"] = Field("spell-check", description="Which check to run, named like its endpoint.")
+    language: str = Field("en-GB", description="Language standard to use.")
+
 class FeedbackRequest(BaseModel):
     correction_id: str
     action: Literal["accept", "reject", "suggest"]
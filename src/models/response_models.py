@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 import uuid 
 
 class CorrectionLogEntry(BaseModel):
@@ -21,10 +21,32 @@ class CorrectionResult(BaseModel):
     # corrections_log: List[str] = []
     corrections_log: List[CorrectionLogEntry] = []
 
+class ChunkTiming(BaseModel):
+    chunk_index: int
+    sentences: int
+    est_prompt_tokens: int
+    est_output_tokens: int
+    elapsed_ms: int
+    ok: bool
+    attempts: int = 1
+    check_type: Optional[str] = None
+    stages_ms: Dict[str, float] = {}
+    prompt_chars: int = 0
+    response_chars: int = 0
+    errors: int = 0
+
+class StageBreakdown(BaseModel):
+    stages_ms: Dict[str, float]
+    prompt_chars: int
+    response_chars: int
+    errors: int
+
 class Metadata(BaseModel):
     total_processed: int
     processing_time_ms: int
     model_version: str
+    chunk_timings: Optional[List[ChunkTiming]] = None
+    stage_breakdown: Optional[StageBreakdown] = None
 
 class SpellCheckResponse(BaseModel):
     results: List[CorrectionResult]
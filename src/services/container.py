@@ -0,0 +1,96 @@
+# src/services/container.py
+import os
+import time
+import asyncio
+import logging
+from ..core.database import DB_PATH
+from ..core.ignore_list import IgnoreIndex, IGNORE_FILE_PATH
+from ..core.feedback_store import FeedbackWriter
+from ..core.documents import DocumentStore
+from ..core.embedding_store import get_embedding_store
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP", "false").lower() in ("1", "true", "yes")
+
+
+class ServiceContainer:
+    """Owns the API's long-lived services and builds them once per worker, off the event loop.
+
+    Nothing heavy happens at import or construction time: chromadb, google.generativeai and the
+    vector index are loaded by start(), which the lifespan kicks off in the background and every
+    request awaits. Services passed in (fakes in benchmarks and tests) are used as they are.
+    With `warmup` (or WARMUP=true) start() also preloads the index, fingerprint and ignore list
+    so the first request pays nothing extra.
+    """
+
+    def __init__(self, gemini_client=None, spell_checker=None, ignore_index: IgnoreIndex | None = None,
+                 feedback_writer: FeedbackWriter | None = None, documents: DocumentStore | None = None,
+                 warmup: bool | None = None):
+        self.gemini_client = gemini_client
+        self.spell_checker = spell_checker
+        self.ignore_index = ignore_index
+        self.feedback_writer = feedback_writer or FeedbackWriter(DB_PATH)
+        self.documents = documents or DocumentStore()
+        self.warmup = warmup_enabled() if warmup is None else warmup
+        self.ready = False
+        self.error = None
+        self.timings_ms = {}
+        self._starting = None
+
+    def _build(self):
+        # Imported here so that importing the app doesn't import chromadb and genai.
+        from .gemini_client import AsyncGeminiClient
+        from ..core.spell_checker import AsyncSpellChecker
+
+        start_time = time.perf_counter()
+        if self.ignore_index is None:
+            self.ignore_index = IgnoreIndex(IGNORE_FILE_PATH)
+        if self.gemini_client is None:
+            self.gemini_client = AsyncGeminiClient()
+        if self.spell_checker is None:
+            self.spell_checker = AsyncSpellChecker(
+                client=self.gemini_client, ignore_index=self.ignore_index, embedding_store=get_embedding_store()
+            )
+        self.feedback_writer.start()
+        self.timings_ms["build"] = round((time.perf_counter() - start_time) * 1000, 1)
+
+        if self.warmup:
+            start_time = time.perf_counter()
+            self._warm()
+            self.timings_ms["warmup"] = round((time.perf_counter() - start_time) * 1000, 1)
+
+    def _warm(self):
+        self.spell_checker.cache.kb_fingerprint.current()
+        self.spell_checker.retriever.warmup()
+        self.ignore_index.entries()
+
+    async def _start(self):
+        try:
+            await asyncio.to_thread(self._build)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.error("Service startup failed: %s", self.error)
+            raise
+        self.error = None
+        self.ready = True
+        logger.info("Services ready.", extra=self.timings_ms)
+
+    async def start(self) -> "ServiceContainer":
+        """Builds the services on first call; concurrent callers share the same build. After a
+        failure the next call tries again."""
+        if self.ready:
+            return self
+        if self._starting is None or (self._starting.done() and not self.ready):
+            self._starting = asyncio.ensure_future(self._start())
+        # Shielded so a cancelled request doesn't cancel the build other requests are waiting on.
+        await asyncio.shield(self._starting)
+        return self
+
+    async def close(self):
+        if self._starting is not None and not self._starting.done():
+            await asyncio.wait([self._starting])
+        # Drain queued feedback before the worker exits.
+        await asyncio.to_thread(self.feedback_writer.close)
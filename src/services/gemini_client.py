@@ -1,84 +1,186 @@
 # src/services/gemini_client.py
 import os
 import json
-import google.generativeai as genai
+import logging
+import asyncio
+import threading
 from dotenv import load_dotenv
+from ..core.metrics import stage, record_payload, record_error, record_tokens, record_prompt_sentences
+from ..core.chunking import estimate_tokens
+from .quota_scheduler import GeminiQuota, get_quota
+from .prompt_builder import Prompt, build_prompt, expand_results
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts and server-side failures are worth another attempt after a backoff."""
+    # Imported on first failure rather than with the module: google.api_core pulls in grpc.
+    from google.api_core import exceptions as api_exceptions
+    return isinstance(error, (
+        api_exceptions.TooManyRequests,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.InternalServerError,
+        api_exceptions.BadGateway,
+        api_exceptions.GatewayTimeout,
+        api_exceptions.DeadlineExceeded,
+        asyncio.TimeoutError,
+        ConnectionError,
+    ))
+
+
+class GeminiCallError(Exception):
+    """A generation call failed. `retryable` is False for errors a retry cannot fix (bad request, auth, blocked output)."""
+
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
 
 class GeminiClient:
-    def __init__(self):
+    def __init__(self, model=None, embedder=None, quota: GeminiQuota | None = None):
+        """`model` and `embedder` default to the real Gemini services; pass stand-ins (see
+        benchmarks/fake_gemini.py) to run without an API key. Every call is admitted by
+        `quota`, the process-wide scheduler unless given.
+
+        google.generativeai is only imported when a real service is needed; it takes about a
+        second, so importing this module stays cheap."""
+        self.quota = quota or get_quota()
+        # Running totals for cost reporting; token counts come from the responses' usage metadata.
+        self.usage = {"calls": 0, "failed_calls": 0, "prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+        self._usage_lock = threading.Lock()
+        if embedder is None or model is None:
+            import google.generativeai as genai
+        # Anything exposing embed_content/embed_content_async, like the genai module itself.
+        self.embedder = embedder or genai
+        self.model = model
+        self._genai = None
+        if model is not None:
+            return
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables.")
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        self._genai = genai
+        # One model per check_type, each carrying that check's system instruction.
+        self._models = {}
+
+    def _model_for(self, prompt: Prompt):
+        """(model, contents) for a prompt. The real service gets the static instructions as the
+        system instruction of a model kept per check_type; stand-ins get them as the prefix of
+        one text."""
+        if self._genai is None:
+            return self.model, prompt.text
+        model = self._models.get(prompt.check_type)
+        if model is None:
+            model = self._genai.GenerativeModel(MODEL_NAME, system_instruction=prompt.system)
+            self._models[prompt.check_type] = model
+        return model, prompt.user
+
+    def _prepare(self, sentences: list[str], context_rules: str, check_type: str):
+        with stage("prompt_build"):
+            prompt = build_prompt(sentences, context_rules, check_type)
+            model, contents = self._model_for(prompt)
+        record_payload("prompt", len(prompt.text))
+        record_prompt_sentences(len(prompt.unique), prompt.deduplicated)
+        return prompt, model, contents
+
+    def _generation_config(self) -> dict:
+        # The dict form of genai.types.GenerationConfig, which would need google.generativeai imported.
+        return {
+            "response_mime_type": "application/json",
+            "temperature": 0.0  # Set to 0 for maximum consistency
+        }
 
     def correct_batch_of_sentences(self, sentences: list[str], language: str, context_rules: str, check_type: str) -> str:
-        """Processes a batch of sentences and categorizes the corrections based on the check type."""
-        sentences_json_string = json.dumps(sentences, indent=2)
-        
-       
-        analysis_instructions = ""
-        correction_type = ""
-        if check_type == "TYPO_BRAND":
-            analysis_instructions = (
-                "You are a Spelling and Brand Terminology Specialist. You will ONLY perform Typo & Brand Rule Analysis. Your primary directive is to find and correct spelling mistakes, punctuation errors, and brand rule violations based on the provided guidelines. These guidelines are the absolute source of truth and MUST override your general knowledge."
-            )
-            correction_type = "TYPO_BRAND"
-        # This condition now exactly matches the 'check_type' from the /content-check endpoint
-        elif check_type == "UX_WRITING": 
-            analysis_instructions = (
-                "You are a UX Writing and Style Editor. Your task is to rewrite sentences to improve clarity, tone, and grammatical structure, "
-                "following the stylistic examples provided. Focus on punctuation (like the Oxford comma), tone of voice, and sentence flow. "
-                "You should improve the text to make it more professional and user-friendly. You will ONLY perform Grammar & UX Writing Analysis. Your primary directive is to rewrite the sentence to improve its clarity, tone, and grammatical structure based on the provided guidelines."
-            )
-            correction_type = "UX_WRITING"
-
-        prompt = f"""
-        You are an expert proofreader with a specific role.
-        
-        **Your Role and Task:**
-        {analysis_instructions}
-
-        **Contextual Rules to Enforce (These are your source of truth):**
-        {context_rules}
-
-        **CRITICAL OUTPUT RULE:**
-    For "UX_WRITING" corrections, the "suggestion" field MUST contain the complete, rewritten sentence. The "original" field MUST also contain the complete original sentence. DO NOT provide only the single word that was changed.
-
-        After you have generated a `corrected_text`, you MUST compare it to the `original_text`.
-        - If they are identical, you MUST set `is_correct` to `true` and the `corrections` array MUST be empty.
-        - Only set `is_correct` to `false` if there is a genuine, visible change.
-
-        **Additional Instructions:**
-        - **Hashtag Rule**: Hashtags (words starting with #) must always be in lowercase, even if they contain a brand term. Example: '#hugoheroes' is correct, '#Hugoheroes' is incorrect.
-        - **Do Not Flag Correct Terms**: If a brand term like 'Hugosave' or 'Hugosave Debit Card' is already spelled and capitalized correctly, do not flag it as an error.
-
-        **Output Format:**
-        Your response MUST be a single, valid JSON object with one key: "results".
-        The value must be an array of objects, one for each input sentence. Each object must have:
-        - "original_text": The original, unmodified sentence.
-        - "is_correct": A boolean (true if you made NO changes, false otherwise).
-        - "corrections": An array of objects detailing every single change. Each correction object must have:
-            - "type": The category of the correction. This MUST be "{correction_type}".
-            - "original": The specific word or phrase that was changed.
-            - "suggestion": The corrected word or phrase.
-        
-        ---
-        **Input Sentences (JSON Array):**
-        {sentences_json_string}
-
-        **Your Strict JSON Response:**
+        """Processes a batch of sentences and categorizes the corrections based on the check type.
+
+        Raises GeminiCallError if the API call fails; the caller decides whether to retry.
         """
+        prompt, model, contents = self._prepare(sentences, context_rules, check_type)
         try:
-            generation_config = genai.types.GenerationConfig(
-                response_mime_type="application/json",
-                temperature=0.0 # Set to 0 for maximum consistency
-            )
-            response = self.model.generate_content(prompt, generation_config=generation_config)
-            print(f"--- RAW RESPONSE FROM GEMINI ---\n{response.text}\n---------------------------------")
-            return response.text
+            with self.quota.generate.lease(estimate_tokens(prompt.text)) as ticket:
+                with stage("generation"):
+                    response = model.generate_content(contents, generation_config=self._generation_config())
+                ticket.actual_tokens = self._usage_tokens(response)
+            self._record_usage(response)
+            return self._response_text(response, prompt)
+        except Exception as e:
+            raise self._call_error(e, check_type, sentences) from e
+
+    def _call_error(self, error: Exception, check_type: str, sentences: list[str]) -> GeminiCallError:
+        record_error("generation")
+        with self._usage_lock:
+            self.usage["failed_calls"] += 1
+        retryable = is_retryable(error)
+        logger.warning(
+            "Error calling Gemini API: %s", error,
+            extra={"check_type": check_type, "sentences": len(sentences), "retryable": retryable}
+        )
+        return GeminiCallError(f"{type(error).__name__}: {error}", retryable)
+
+    def _record_usage(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        record_tokens(prompt_tokens, output_tokens, cached_tokens)
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += prompt_tokens
+            self.usage["output_tokens"] += output_tokens
+            self.usage["cached_tokens"] += cached_tokens
+
+    @staticmethod
+    def _usage_tokens(response) -> int | None:
+        usage = getattr(response, "usage_metadata", None)
+        return getattr(usage, "total_token_count", None) or None
+
+    @staticmethod
+    def _embed_tokens(content) -> int:
+        return sum(estimate_tokens(t) for t in ([content] if isinstance(content, str) else content))
+
+    def _response_text(self, response, prompt: Prompt) -> str:
+        """The model's compact answer expanded to the full {"results": [...]} form, one result per input sentence."""
+        record_payload("response", len(response.text))
+        logger.debug("Raw response from Gemini", extra={"response": response.text})
+        return json.dumps({"results": expand_results(response.text, prompt)}, ensure_ascii=False)
+
+    def embed(self, content, task_type: str = "RETRIEVAL_QUERY"):
+        """Embeds a string (or a list of strings) with the knowledge base embedding model."""
+        with self.quota.embed.lease(self._embed_tokens(content)):
+            return self.embedder.embed_content(
+                model=EMBEDDING_MODEL,
+                content=content,
+                task_type=task_type
+            )['embedding']
+
+
+class AsyncGeminiClient(GeminiClient):
+    """GeminiClient whose generation and embedding calls are awaitable, for use inside the API."""
+
+    async def correct_batch_of_sentences(self, sentences: list[str], language: str, context_rules: str, check_type: str) -> str:
+        prompt, model, contents = self._prepare(sentences, context_rules, check_type)
+        try:
+            async with self.quota.generate.lease_async(estimate_tokens(prompt.text)) as ticket:
+                with stage("generation"):
+                    response = await model.generate_content_async(contents, generation_config=self._generation_config())
+                ticket.actual_tokens = self._usage_tokens(response)
+            self._record_usage(response)
+            return self._response_text(response, prompt)
         except Exception as e:
-            print(f"Error calling Gemini API: {e}")
-            return '{ "results": [] }'
\ No newline at end of file
+            raise self._call_error(e, check_type, sentences) from e
+
+    async def embed(self, content, task_type: str = "RETRIEVAL_QUERY"):
+        async with self.quota.embed.lease_async(self._embed_tokens(content)):
+            result = await self.embedder.embed_content_async(
+                model=EMBEDDING_MODEL,
+                content=content,
+                task_type=task_type
+            )
+        return result['embedding']
@@ -0,0 +1,149 @@
+# src/services/prompt_builder.py
+import re
+import json
+import logging
+from dataclasses import dataclass
+from ..core.metrics import record_error
+
+logger = logging.getLogger(__name__)
+
+SENTENCES_HEADER = "Sentences (id: JSON string):"
+SENTENCE_LINE = re.compile(r"^(\d+): (\".*\")$")
+
+_OUTPUT_RULES = """
+Compare your corrected text with the original before answering: if nothing visibly changed, "corrections" MUST be empty.
+
+Additional rules:
+- Hashtags (words starting with #) are always lowercase, even when they contain a brand term: '#hugoheroes' is correct, '#Hugoheroes' is not.
+- Do not flag brand terms that are already spelled and capitalized correctly, such as 'Hugosave' or 'Hugosave Debit Card'.
+- The rules given with each request are the source of truth and override your general knowledge.
+
+Output: one JSON object {"results": [...]} with exactly one item per input id, in any order:
+{"id": <input id>, "corrections": [...]}"""
+
+# Static per check_type, so every request of a type starts with the same text: sent as the
+# system instruction, it is also the prefix Gemini's context caching can reuse.
+SYSTEM_INSTRUCTIONS = {
+    "TYPO_BRAND": (
+        "You are an expert proofreader and a Spelling and Brand Terminology Specialist. You ONLY perform "
+        "Typo & Brand Rule Analysis: find and correct spelling mistakes, punctuation errors and brand rule "
+        "violations based on the rules provided."
+        + _OUTPUT_RULES
+        + '\nEach correction is {"original": <the exact word or phrase changed>, "suggestion": <its replacement>}.'
+    ),
+    "UX_WRITING": (
+        "You are an expert proofreader and a UX Writing and Style Editor. You ONLY perform Grammar & UX Writing "
+        "Analysis: rewrite sentences to improve clarity, tone and grammatical structure based on the rules "
+        "provided, focusing on punctuation (like the Oxford comma), tone of voice and sentence flow, so the text "
+        "is professional and user-friendly."
+        + _OUTPUT_RULES
+        + '\nA sentence that needs a rewrite gets exactly one correction {"suggestion": <the complete rewritten '
+        "sentence>}. Never return only the words that changed."
+    ),
+}
+
+
+@dataclass
+class Prompt:
+    check_type: str
+    system: str
+    user: str
+    # Distinct input sentences in first-seen order; their index is the id sent to the model.
+    unique: list[str]
+    # The id of each input sentence, in input order.
+    ids: list[int]
+
+    @property
+    def text(self) -> str:
+        """System instruction and request as one text, for models that take no system instruction."""
+        return f"{self.system}\n\n{self.user}"
+
+    @property
+    def deduplicated(self) -> int:
+        return len(self.ids) - len(self.unique)
+
+
+def encode_sentences(sentences: list[str]) -> str:
+    # One JSON string per line: compact, and quotes or newlines in a sentence stay unambiguous.
+    return "\n".join(f"{i}: {json.dumps(s, ensure_ascii=False)}" for i, s in enumerate(sentences))
+
+
+def decode_sentences(text: str) -> list[str]:
+    """The sentences of a request built by build_prompt, by id."""
+    body = text.split(SENTENCES_HEADER, 1)[1]
+    return [json.loads(m.group(2)) for m in map(SENTENCE_LINE.match, body.strip().splitlines()) if m]
+
+
+def build_prompt(sentences: list[str], context_rules: str, check_type: str) -> Prompt:
+    """Static instructions for the check type plus a compact request: the retrieved rules, then
+    each distinct sentence once under a numeric id."""
+    system = SYSTEM_INSTRUCTIONS.get(check_type)
+    if system is None:
+        raise ValueError(f"Invalid check_type '{check_type}'.")
+    positions = {}
+    ids = [positions.setdefault(s, len(positions)) for s in sentences]
+    unique = list(positions)
+    user = f"Rules:\n{context_rules}\n\n{SENTENCES_HEADER}\n{encode_sentences(unique)}"
+    return Prompt(check_type, system, user, unique, ids)
+
+
+def salvage_results(response_str: str) -> list:
+    """Recovers the complete result objects from a truncated or otherwise broken
+    {"results": [...]} response, stopping at the first one that does not parse."""
+    key = response_str.find('"results"')
+    start = response_str.find("[", key) if key != -1 else -1
+    if start == -1:
+        return []
+    decoder = json.JSONDecoder()
+    results, pos = [], start + 1
+    while True:
+        while pos < len(response_str) and response_str[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(response_str) or response_str[pos] == "]":
+            return results
+        try:
+            item, pos = decoder.raw_decode(response_str, pos)
+        except json.JSONDecodeError:
+            return results
+        results.append(item)
+
+
+def decode_results(response_str: str) -> list:
+    """The items of a {"results": [...]} response, salvaging what it can from a broken one."""
+    try:
+        results = json.loads(response_str).get("results", [])
+        return results if isinstance(results, list) else []
+    except (json.JSONDecodeError, AttributeError):
+        record_error("parse")
+        results = salvage_results(response_str)
+        logger.warning("Failed to decode JSON from Gemini API; salvaged %d complete results.", len(results))
+        return results
+
+
+def expand_results(response_str: str, prompt: Prompt) -> list[dict]:
+    """Turns the model's compact answer back into one full result per input sentence, in input
+    order, duplicates included. Sentences whose id is missing from the answer get no result."""
+    items = {}
+    for item in decode_results(response_str):
+        if isinstance(item, dict) and isinstance(item.get("id"), int) and 0 <= item["id"] < len(prompt.unique):
+            items.setdefault(item["id"], item)
+
+    results = []
+    for sentence_id in prompt.ids:
+        sentence, item = prompt.unique[sentence_id], items.get(sentence_id)
+        if item is None:
+            continue
+        corrections = item.get("corrections")
+        if isinstance(corrections, list):
+            # Malformed corrections are passed through; the spell checker drops those results.
+            corrections = [
+                {
+                    "type": prompt.check_type,
+                    # Rewrites come without "original": it is the whole sentence.
+                    "original": c.get("original") or (sentence if prompt.check_type == "UX_WRITING" else None),
+                    "suggestion": c.get("suggestion"),
+                } if isinstance(c, dict) else c
+                for c in corrections
+            ]
+        results.append({"original_text": sentence, "is_correct": not corrections, "corrections": corrections})
+    return results
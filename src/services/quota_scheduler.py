@@ -0,0 +1,310 @@
+# src/services/quota_scheduler.py
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager, asynccontextmanager
+from ..core.metrics import QUEUE_WAIT_SECONDS, record_stage
+
+# Lower runs first.
+INTERACTIVE, BACKGROUND, BULK = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BULK: "bulk"}
+
+RATE_LIMIT_BASE_COOLDOWN_SECONDS = 1.0
+RATE_LIMIT_MAX_COOLDOWN_SECONDS = 30.0
+
+# Defaults sized for a paid-tier gemini-2.5-flash-lite / text-embedding-004 project.
+# Quotas are per project while each process schedules on its own: with N workers, divide by N.
+DEFAULT_LIMITS = {
+    "generate": {"rpm": 4000, "tpm": 4_000_000, "max_concurrency": 32},
+    "embed": {"rpm": 3000, "tpm": 1_000_000, "max_concurrency": 16},
+}
+
+_priority = contextvars.ContextVar("gemini_priority", default=INTERACTIVE)
+
+
+def is_rate_limit(error: Exception) -> bool:
+    # Imported lazily: google.api_core pulls in grpc.
+    from google.api_core import exceptions as api_exceptions
+    return isinstance(error, (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests))
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Gemini calls made inside the block (including asyncio tasks and asyncio.to_thread
+    started from it) queue at this priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Allows `per_minute` units per minute with bursts up to one minute's worth. 0 disables it."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available. Requests larger than the bucket only wait for a full one."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        # May go negative: an oversized request is paid back before anything else is let through.
+        self.level -= amount
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens", "enqueued_at", "granted", "abandoned", "actual_tokens", "rate_limited", "wake")
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.abandoned = False
+        self.actual_tokens = None
+        self.rate_limited = False
+        self.wake = None
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class QuotaScheduler:
+    """Admits calls to one Gemini model within its requests- and tokens-per-minute quota.
+
+    Waiting calls are served strictly by priority, then arrival. Concurrency adapts AIMD-style:
+    every 429 halves the limit and pauses admissions for a growing cooldown, every success
+    raises it by 1/limit. Works for threads (`lease`) and coroutines (`lease_async`) alike.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float, max_concurrency: int, min_concurrency: int = 1):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self._lock = threading.Lock()
+        self._queue = []
+        self._seq = itertools.count()
+        self._waiting = 0
+        self._in_flight = 0
+        self._cooldown_until = 0.0
+        self._consecutive_rate_limits = 0
+        self.granted = 0
+        self.rate_limited = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "QuotaScheduler":
+        """Limits from GEMINI_<NAME>_RPM, GEMINI_<NAME>_TPM and GEMINI_<NAME>_MAX_CONCURRENCY."""
+        defaults = DEFAULT_LIMITS[name]
+        prefix = f"GEMINI_{name.upper()}"
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(f"{prefix}_RPM", defaults["rpm"])),
+            tokens_per_minute=float(os.getenv(f"{prefix}_TPM", defaults["tpm"])),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", defaults["max_concurrency"])),
+        )
+
+    # --- Admission ---
+    def _enqueue(self, tokens: int) -> _Ticket:
+        ticket = _Ticket(_priority.get(), next(self._seq), tokens)
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            self._waiting += 1
+        return ticket
+
+    def _head(self) -> _Ticket | None:
+        while self._queue and self._queue[0].abandoned:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _grant(self, ticket: _Ticket, now: float):
+        heapq.heappop(self._queue)
+        self._waiting -= 1
+        self._in_flight += 1
+        self.requests.take(1)
+        self.tokens.take(ticket.tokens)
+        ticket.granted = True
+        waited = now - ticket.enqueued_at
+        self.granted += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        QUEUE_WAIT_SECONDS.observe(waited, model=self.name, priority=PRIORITY_NAMES.get(ticket.priority, ticket.priority))
+
+    def _dispatch(self, caller: _Ticket | None = None, wake_head: bool = False) -> float | None:
+        """Grants queued tickets in order while concurrency and quota allow. Returns how long
+        `caller` should sleep before calling again, or None to sleep until woken."""
+        to_wake = []
+        delay = None
+        now = time.monotonic()
+        with self._lock:
+            while (head := self._head()) is not None:
+                if self._in_flight >= max(self.min_concurrency, int(self.concurrency_limit)):
+                    delay = None
+                    break
+                delay = max(
+                    self._cooldown_until - now,
+                    self.requests.delay_for(1, now),
+                    self.tokens.delay_for(head.tokens, now),
+                )
+                if delay > 0:
+                    break
+                self._grant(head, now)
+                to_wake.append(head)
+                wake_head = True
+            head = self._head()
+            if wake_head and head is not None:
+                # The new head owns the refill timer; make sure it is awake to set it.
+                to_wake.append(head)
+            caller_is_head = head is caller
+        for ticket in to_wake:
+            if ticket is not caller and ticket.wake is not None:
+                ticket.wake()
+        return delay if caller_is_head else None
+
+    def acquire(self, tokens: int) -> _Ticket:
+        """Blocks until the call may start. Pair with release()."""
+        ticket = self._enqueue(tokens)
+        event = threading.Event()
+        ticket.wake = event.set
+        while True:
+            delay = self._dispatch(ticket)
+            if ticket.granted:
+                return ticket
+            event.wait(delay)
+            event.clear()
+
+    async def acquire_async(self, tokens: int) -> _Ticket:
+        ticket = self._enqueue(tokens)
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket.wake = lambda: loop.call_soon_threadsafe(event.set)
+        try:
+            while True:
+                delay = self._dispatch(ticket)
+                if ticket.granted:
+                    return ticket
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def _abandon(self, ticket: _Ticket):
+        with self._lock:
+            granted = ticket.granted
+            if not granted:
+                ticket.abandoned = True
+                self._waiting -= 1
+        if granted:
+            self.release(ticket)
+        else:
+            self._dispatch(wake_head=True)
+
+    def release(self, ticket: _Ticket):
+        """Ends a call. Set ticket.rate_limited on a 429 and ticket.actual_tokens when the real usage is known."""
+        with self._lock:
+            self._in_flight -= 1
+            if ticket.actual_tokens is not None:
+                self.tokens.take(ticket.actual_tokens - ticket.tokens)
+            if ticket.rate_limited:
+                self.rate_limited += 1
+                self._consecutive_rate_limits += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                cooldown = RATE_LIMIT_BASE_COOLDOWN_SECONDS * 2 ** (self._consecutive_rate_limits - 1)
+                self._cooldown_until = time.monotonic() + min(RATE_LIMIT_MAX_COOLDOWN_SECONDS, cooldown)
+            else:
+                self._consecutive_rate_limits = 0
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+        self._dispatch(wake_head=True)
+
+    # --- Leases ---
+    @contextmanager
+    def lease(self, tokens: int):
+        """Holds one admission for the duration of the block; 429s raised inside it throttle the scheduler."""
+        start = time.perf_counter()
+        ticket = self.acquire(tokens)
+        record_stage("quota_wait", time.perf_counter() - start)
+        try:
+            yield ticket
+        except Exception as e:
+            ticket.rate_limited = is_rate_limit(e)
+            raise
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def lease_async(self, tokens: int):
+        start = time.perf_counter()
+        ticket = await self.acquire_async(tokens)
+        record_stage("quota_wait", time.perf_counter() - start)
+        try:
+            yield ticket
+        except Exception as e:
+            ticket.rate_limited = is_rate_limit(e)
+            raise
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+class GeminiQuota:
+    """One scheduler per quota: generation and embedding are limited separately by Gemini."""
+
+    def __init__(self, generate: QuotaScheduler, embed: QuotaScheduler):
+        self.generate = generate
+        self.embed = embed
+
+    @classmethod
+    def from_env(cls) -> "GeminiQuota":
+        return cls(QuotaScheduler.from_env("generate"), QuotaScheduler.from_env("embed"))
+
+    def stats(self) -> dict:
+        return {"generate": self.generate.stats(), "embed": self.embed.stats()}
+
+
+_default_quota = None
+_default_quota_lock = threading.Lock()
+
+
+def get_quota() -> GeminiQuota:
+    """The process-wide scheduler shared by every client, ingestion and the API."""
+    global _default_quota
+    with _default_quota_lock:
+        if _default_quota is None:
+            _default_quota = GeminiQuota.from_env()
+        return _default_quota
@@ -0,0 +1,21 @@
+# tests/unit/conftest.py
+import pytest
+from unittest.mock import MagicMock, patch
+from src.core.spell_checker import SpellChecker
+
+LOCAL_STAGES = ("prechecker", "triage", "memo")
+
+
+@pytest.fixture
+def make_spell_checker():
+    """Builds a SpellChecker (or `cls`) without opening the vector store. The local stages
+    (brand pre-checker, UX triage, correction memo) are off unless the test passes its own."""
+    def make(client, cls=SpellChecker, **kwargs):
+        kwargs.setdefault("retriever", MagicMock())
+        with patch("src.core.spell_checker.chromadb"):
+            spell_checker = cls(client=client, **kwargs)
+        for name in LOCAL_STAGES:
+            if kwargs.get(name) is None:
+                setattr(spell_checker, name, None)
+        return spell_checker
+    return make
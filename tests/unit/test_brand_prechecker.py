@@ -0,0 +1,97 @@
+# tests/unit/test_brand_prechecker.py
+import json
+from unittest.mock import MagicMock
+from src.core.brand_prechecker import SPELLING_KB_PATH, BrandPrechecker
+
+RULES = [
+    {
+        "category": "Defined Terminology",
+        "guideline": "Use 'Cashback' as a single, closed-compound word.",
+        "incorrect_example": "We offer great Cash back rewards.",
+        "correct_example": "We offer great Cashback rewards.",
+        "explanation": "Proprietary product terms are always written as one word.",
+    },
+    {
+        "category": "Hashtags",
+        "guideline": "In hashtags, keep all letters lowercase.",
+        "incorrect_example": "Join the #HugoHeroes movement.",
+        "correct_example": "Join the #hugoheroes movement.",
+        "explanation": "Hashtags are styled in lowercase.",
+    },
+]
+
+
+def test_precheck_finds_terms_and_hashtags():
+    # 1. Arrange
+    prechecker = BrandPrechecker(RULES)
+
+    # 2. Act
+    result = prechecker.check("Earn cash-back with #HugoHeroes today")
+
+    # 3. Assert
+    assert result.corrections == [
+        {"type": "TYPO_BRAND", "original": "cash-back", "suggestion": "Cashback"},
+        {"type": "TYPO_BRAND", "original": "#HugoHeroes", "suggestion": "#hugoheroes"},
+    ]
+    assert result.resolved is False
+    assert prechecker.check("Cash back").resolved is True
+
+
+def test_locally_resolved_sentences_skip_gemini(make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.correct_batch_of_sentences.return_value = json.dumps({"results": [
+        {"original_text": "Earn Cash back on every purchase today", "is_correct": True, "corrections": []},
+    ]})
+    spell_checker = make_spell_checker(mock_client, cache=MagicMock(), prechecker=BrandPrechecker(RULES))
+    spell_checker.cache.get_many.return_value = {}
+    spell_checker._find_relevant_rules = MagicMock(return_value="- rule")
+
+    # 2. Act
+    results = spell_checker.batch_check_sentences(["Cash back", "Earn Cash back on every purchase today"], "TYPO_BRAND")
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.call_args[0][0] == ["Earn Cash back on every purchase today"]
+    assert results[0]["corrections"][0]["suggestion"] == "Cashback"
+    # The model's own verdict on a sentence it was sent is kept.
+    assert results[1]["is_correct"] and results[1]["corrections"] == []
+
+
+def test_only_known_variants_of_a_term_are_flagged():
+    # 1. Arrange
+    prechecker = BrandPrechecker.from_file(SPELLING_KB_PATH)
+
+    # 2. Act
+    ordinary = prechecker.check("We will send your gold back soon.")
+    known = prechecker.check("We offer great cash back rewards.")
+
+    # 3. Assert
+    assert ordinary.corrections == []
+    assert known.corrections == [{"type": "TYPO_BRAND", "original": "cash back", "suggestion": "Cashback"}]
+
+
+def test_lowercased_multi_word_terms_are_flagged():
+    # 1. Arrange
+    prechecker = BrandPrechecker.from_file(SPELLING_KB_PATH)
+
+    # 2. Act
+    result = prechecker.check("Open a multi-currency account")
+
+    # 3. Assert
+    assert result.corrections == [
+        {"type": "TYPO_BRAND", "original": "multi-currency account", "suggestion": "Multi-currency Account"}
+    ]
+
+
+def test_repeated_or_common_words_are_not_resolved_locally():
+    # 1. Arrange
+    prechecker = BrandPrechecker.from_file(SPELLING_KB_PATH)
+
+    # 2. Act
+    repeated = prechecker.check("the the account")
+    stop_words = prechecker.check("to to to to")
+    terms_only = prechecker.check("Cashback")
+
+    # 3. Assert
+    assert not repeated.resolved and not stop_words.resolved
+    assert terms_only.resolved and terms_only.corrections == []
@@ -0,0 +1,33 @@
+# tests/unit/test_chunking.py
+from src.core.chunking import ChunkPolicy, plan_chunks
+
+
+def test_plan_chunks_respects_budgets_and_keeps_every_index_once():
+    # 1. Arrange
+    policy = ChunkPolicy(
+        max_prompt_tokens=1000, max_output_tokens=200, max_sentences=5,
+        max_concurrency=2, prompt_overhead_tokens=100,
+    )
+    sentences = [f"Sentence number {i} about your Save Account." for i in range(23)]
+
+    # 2. Act
+    plan = plan_chunks(sentences, policy)
+
+    # 3. Assert
+    assert [i for chunk in plan for i in chunk] == list(range(23))
+    for chunk in plan:
+        assert len(chunk) <= 5
+        assert sum(policy.output_tokens_for(sentences[i]) for i in chunk) <= 200
+
+
+def test_oversized_sentence_gets_its_own_chunk(monkeypatch):
+    # 1. Arrange
+    monkeypatch.setenv("CHUNK_MAX_OUTPUT_TOKENS_UX_WRITING", "50")
+    policy = ChunkPolicy.for_check_type("UX_WRITING")
+
+    # 2. Act
+    plan = plan_chunks(["Short one.", "x" * 400, "Another short one."], policy)
+
+    # 3. Assert
+    assert policy.max_output_tokens == 50
+    assert plan == [[0], [1], [2]]
@@ -0,0 +1,51 @@
+# tests/unit/test_container.py
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from src.services.container import ServiceContainer
+
+
+def test_injected_services_are_used_and_warmed_once():
+    # 1. Arrange
+    spell_checker = MagicMock()
+    services = ServiceContainer(
+        gemini_client=MagicMock(), spell_checker=spell_checker, ignore_index=MagicMock(),
+        feedback_writer=MagicMock(), warmup=True
+    )
+
+    async def run():
+        return await asyncio.gather(services.start(), services.start())
+
+    # 2. Act
+    started = asyncio.run(run())
+
+    # 3. Assert
+    assert started == [services, services]
+    assert services.ready and services.spell_checker is spell_checker
+    spell_checker.retriever.warmup.assert_called_once()
+    services.feedback_writer.start.assert_called_once()
+    assert set(services.timings_ms) == {"build", "warmup"}
+
+
+def test_failed_startup_is_reported_and_retried():
+    # 1. Arrange
+    feedback_writer = MagicMock()
+    feedback_writer.start.side_effect = [OSError("disk full"), None]
+    services = ServiceContainer(
+        gemini_client=MagicMock(), spell_checker=MagicMock(), ignore_index=MagicMock(),
+        feedback_writer=feedback_writer, warmup=False
+    )
+
+    async def run():
+        with pytest.raises(OSError):
+            await services.start()
+        error = services.error
+        await services.start()
+        return error
+
+    # 2. Act
+    error = asyncio.run(run())
+
+    # 3. Assert
+    assert error == "OSError: disk full"
+    assert services.ready and services.error is None
@@ -0,0 +1,109 @@
+# tests/unit/test_corpus_checker.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.corpus_checker import CorpusChecker
+
+
+def _spell_checker(fingerprint: str = "kb1", fail: set = frozenset()):
+    spell_checker = MagicMock()
+    spell_checker.cache.kb_fingerprint.current.return_value = fingerprint
+    spell_checker.client.usage = {"calls": 0, "failed_calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+
+    async def check(sentences, check_type, timings):
+        spell_checker.client.usage["calls"] += 1
+        spell_checker.client.usage["prompt_tokens"] += 100
+        return [{"original_text": s, "is_correct": True, "corrections": []} for s in sentences if s not in fail]
+
+    spell_checker.batch_check_sentences = AsyncMock(side_effect=check)
+    return spell_checker
+
+
+def _write_corpus(path, texts):
+    path.write_text("".join(json.dumps({"id": f"s{i}", "text": t}) + "\n" for i, t in enumerate(texts)))
+
+
+def _read_output(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_writes_results_in_input_order_and_reports_usage(tmp_path):
+    # 1. Arrange
+    corpus, output = tmp_path / "corpus.jsonl", tmp_path / "out.jsonl"
+    texts = [f"String {i}" for i in range(7)] + ["String 0"]
+    _write_corpus(corpus, texts)
+    checker = CorpusChecker(_spell_checker(), batch_size=2, workers=3)
+
+    # 2. Act
+    report = asyncio.run(checker.run(str(corpus), str(output)))
+
+    # 3. Assert
+    records = _read_output(output)
+    assert [r["text"] for r in records] == texts
+    assert all(r["result"]["original_text"] == r["text"] for r in records)
+    assert report["rows"] == 8 and report["checked"] + report["reused"] == 8
+    assert report["gemini_calls"] == 4 and report["prompt_tokens"] == 400
+
+
+def test_resumes_from_checkpoint_and_retries_failed_rows(tmp_path):
+    # 1. Arrange
+    corpus, output = tmp_path / "corpus.jsonl", tmp_path / "out.jsonl"
+    _write_corpus(corpus, ["A", "B", "C", "D"])
+    checkpoint_path = tmp_path / "out.jsonl.checkpoint.json"
+    asyncio.run(CorpusChecker(_spell_checker(fail={"C"}), batch_size=2, workers=1).run(str(corpus), str(output)))
+    finished = output.read_text()
+    first_batch = "".join(finished.splitlines(keepends=True)[:2])
+    # As if the run had crashed halfway through writing the second batch.
+    checkpoint = {**json.loads(checkpoint_path.read_text()), "complete": False, "rows_done": 2, "output_bytes": len(first_batch.encode())}
+    checkpoint_path.write_text(json.dumps(checkpoint))
+    output.write_text(first_batch + '{"id": "s2", "text": "C", "res')
+    resumed, rerun = _spell_checker(fail={"C"}), _spell_checker()
+
+    # 2. Act
+    asyncio.run(CorpusChecker(resumed, batch_size=2, workers=1).run(str(corpus), str(output)))
+    after_resume = output.read_text()
+    asyncio.run(CorpusChecker(rerun, batch_size=2, workers=1).run(str(corpus), str(output)))
+
+    # 3. Assert
+    assert after_resume == finished
+    resumed.batch_check_sentences.assert_awaited_once_with(["C", "D"], "TYPO_BRAND", None)
+    records = _read_output(output)
+    assert [r["text"] for r in records] == ["A", "B", "C", "D"]
+    assert all(r["result"] is not None for r in records)
+    rerun.batch_check_sentences.assert_awaited_once_with(["C"], "TYPO_BRAND", None)
+
+
+def test_previous_results_are_reused_only_for_the_same_knowledge_base(tmp_path):
+    # 1. Arrange
+    corpus, previous = tmp_path / "corpus.jsonl", tmp_path / "previous.jsonl"
+    _write_corpus(corpus, ["Unchanged string", "New string"])
+    asyncio.run(CorpusChecker(_spell_checker()).run(str(corpus), str(previous)))
+    same_kb, new_kb = _spell_checker(), _spell_checker(fingerprint="kb2")
+
+    # 2. Act
+    reused = asyncio.run(CorpusChecker(same_kb).run(str(corpus), str(tmp_path / "a.jsonl"), str(previous)))
+    rechecked = asyncio.run(CorpusChecker(new_kb).run(str(corpus), str(tmp_path / "b.jsonl"), str(previous)))
+
+    # 3. Assert
+    assert reused["reused"] == 2 and reused["gemini_calls"] == 0
+    same_kb.batch_check_sentences.assert_not_awaited()
+    assert rechecked["checked"] == 2
+
+
+def test_short_strings_are_skipped_under_content_check(tmp_path):
+    # 1. Arrange
+    corpus, output = tmp_path / "corpus.jsonl", tmp_path / "out.jsonl"
+    _write_corpus(corpus, ["Top up", "Send money to your friends today"])
+    spell_checker = _spell_checker()
+    checker = CorpusChecker(spell_checker, check="content-check")
+
+    # 2. Act
+    report = asyncio.run(checker.run(str(corpus), str(output)))
+    rerun = asyncio.run(checker.run(str(corpus), str(output)))
+
+    # 3. Assert
+    records = _read_output(output)
+    assert records[0]["result"] is None and "error" not in records[0]
+    assert (report["checked"], report["skipped"], report["failed"]) == (1, 1, 0)
+    assert (rerun["reused"], rerun["skipped"], rerun["failed"]) == (1, 1, 0)
+    assert spell_checker.batch_check_sentences.call_count == 1
@@ -0,0 +1,108 @@
+# tests/unit/test_correction_memo.py
+import json
+from unittest.mock import MagicMock
+from src.core.database import connect, init_db
+from src.core.brand_prechecker import BrandPrechecker
+from src.core.correction_memo import CorrectionMemo, build_memo, write_memo
+from src.core.result_cache import ResultCache
+
+
+def _feedback(db_path, rows):
+    init_db(db_path)
+    conn = connect(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO feedback (correction_id, action, original_text, corrected_text, suggested_text) VALUES (?, ?, ?, ?, ?)",
+            [(f"c{i}", action, original, corrected, suggested) for i, (action, original, corrected, suggested) in enumerate(rows)]
+        )
+    conn.close()
+
+
+def test_memo_learns_repeated_accepts_and_rejects_only(tmp_path):
+    # 1. Arrange
+    db_path = str(tmp_path / "feedback.db")
+    _feedback(db_path, [
+        *[("accept", "save account", "Save Account", None)] * 3,
+        *[("reject", "Hugosave", "HugoSave", None)] * 2,
+        ("suggest", "Hugosave", "HugoSave", "Hugosave app"),
+        *[("accept", "top up", "Top up", None)] * 3,
+        ("reject", "top up", "Top up", None),
+    ])
+
+    # 2. Act
+    memo = build_memo(db_path, min_votes=3, min_ratio=0.8)
+
+    # 3. Assert
+    assert [(e["original"], e["suggestion"]) for e in memo["apply"]] == [("save account", "Save Account")]
+    assert [(e["original"], e["suggestion"], e["rejected"]) for e in memo["suppress"]] == [("Hugosave", "HugoSave", 3)]
+
+
+def test_learned_fixes_skip_the_model_and_rejected_corrections_are_dropped(tmp_path, make_spell_checker):
+    # 1. Arrange
+    memo_path = str(tmp_path / "memo.json")
+    write_memo({
+        "apply": [{"original": "save account", "suggestion": "Save Account"}],
+        "suppress": [{"original": "Hugosave", "suggestion": "HugoSave"}],
+    }, memo_path)
+    mock_client = MagicMock()
+    mock_client.correct_batch_of_sentences.return_value = json.dumps({"results": [
+        {"original_text": "Open a save account with Hugosave today", "is_correct": False, "corrections": [
+            {"type": "TYPO_BRAND", "original": "Hugosave", "suggestion": "HugoSave"},
+        ]},
+    ]})
+    spell_checker = make_spell_checker(
+        mock_client, cache=MagicMock(), prechecker=BrandPrechecker([]), memo=CorrectionMemo(memo_path)
+    )
+    spell_checker.cache.get_many.return_value = {}
+    spell_checker._find_relevant_rules = MagicMock(return_value="- rule")
+
+    # 2. Act
+    results = spell_checker.batch_check_sentences(["save account", "Open a save account with Hugosave today"], "TYPO_BRAND")
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.call_args[0][0] == ["Open a save account with Hugosave today"]
+    assert [[c["suggestion"] for c in r["corrections"]] for r in results] == [["Save Account"], ["Save Account"]]
+    assert spell_checker.memo.stats() == {
+        "lookups": 2, "hits": 2, "resolved": 1, "applied": 2, "suppressed": 1, "hit_rate": 1.0,
+    }
+
+
+def test_cached_results_pick_up_a_rebuilt_memo(tmp_path, make_spell_checker):
+    # 1. Arrange
+    memo_path = str(tmp_path / "memo.json")
+    write_memo({"apply": [], "suppress": []}, memo_path)
+    (tmp_path / "kb").mkdir()
+    sentence = "Open a save account with Hugosave today"
+    mock_client = MagicMock()
+    mock_client.embed.side_effect = lambda texts, task_type: [[0.1, 0.2] for _ in texts]
+    mock_client.correct_batch_of_sentences.return_value = json.dumps({"results": [
+        {"original_text": sentence, "is_correct": True, "corrections": []},
+    ]})
+    spell_checker = make_spell_checker(
+        mock_client, cache=ResultCache(knowledge_base_dir=str(tmp_path / "kb")),
+        prechecker=BrandPrechecker([]), memo=CorrectionMemo(memo_path, check_interval=0)
+    )
+    spell_checker.batch_check_sentences([sentence], "TYPO_BRAND")
+
+    # 2. Act
+    write_memo({"apply": [{"original": "save account", "suggestion": "Save Account"}], "suppress": []}, memo_path)
+    results = spell_checker.batch_check_sentences([sentence], "TYPO_BRAND")
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.call_count == 1
+    assert [c["suggestion"] for c in results[0]["corrections"]] == ["Save Account"]
+
+
+def test_a_four_word_ux_rewrite_is_a_sentence_fix_not_a_phrase(tmp_path):
+    # 1. Arrange
+    memo_path = str(tmp_path / "memo.json")
+    write_memo({"apply": [{"original": "Click here to continue", "suggestion": "Select Continue to proceed"}], "suppress": []}, memo_path)
+    memo = CorrectionMemo(memo_path)
+
+    # 2. Act
+    ux = memo.check("Click here to continue", "UX_WRITING")
+    typo = memo.check("Click here to continue with your top-up.", "TYPO_BRAND")
+
+    # 3. Assert
+    assert ux.result["corrections"][0]["suggestion"] == "Select Continue to proceed"
+    assert typo.corrections == []
@@ -0,0 +1,82 @@
+# tests/unit/test_documents.py
+from src.core.documents import DocumentStore, segment_sentences, locate_corrections
+
+
+def _result(sentence: str, corrections=()) -> dict:
+    return {"original_text": sentence, "is_correct": not corrections, "corrections": list(corrections)}
+
+
+def test_segments_keep_offsets_into_the_original_text():
+    # 1. Arrange
+    text = "Top up for $1.50 today!  Then withdraw.\nNo punctuation here\n\n  Last one?"
+
+    # 2. Act
+    segments = segment_sentences(text)
+
+    # 3. Assert
+    assert [s.text for s in segments] == ["Top up for $1.50 today!", "Then withdraw.", "No punctuation here", "Last one?"]
+    assert all(text[s.start:s.end] == s.text for s in segments)
+
+
+def test_new_revision_only_checks_new_or_changed_sentences():
+    # 1. Arrange
+    store = DocumentStore()
+    first = store.plan("doc", "Log in now. Open a save account.", "spell-check", "kb1")
+    store.commit("doc", "Log in now. Open a save account.", "spell-check", "kb1", first,
+                 {s: _result(s) for s in first.pending})
+
+    # 2. Act
+    second = store.plan("doc", "Open a save account. Log in later.", "spell-check", "kb1")
+    after_kb_change = store.plan("doc", "Open a save account. Log in later.", "spell-check", "kb2")
+
+    # 3. Assert
+    assert first.pending == ["Log in now.", "Open a save account."]
+    assert list(second.reused) == ["Open a save account."]
+    assert second.pending == ["Log in later."]
+    assert second.previous_revision == 1 and second.removed == 1
+    assert after_kb_change.reused == {}
+
+
+def test_corrections_map_to_document_offsets():
+    # 1. Arrange
+    text = "Hello. Open a save account and a save account."
+    segment = segment_sentences(text)[1]
+    result = _result(segment.text, [
+        {"type": "TYPO_BRAND", "original": "save account", "suggestion": "Save Account"},
+        {"type": "TYPO_BRAND", "original": "save account", "suggestion": "Save Account"},
+        {"type": "TYPO_BRAND", "original": "not in sentence", "suggestion": "x"},
+    ])
+
+    # 2. Act
+    located = locate_corrections(result, segment)
+
+    # 3. Assert
+    starts = [c["start"] for c in located["corrections"]]
+    assert [text[c["start"]:c["end"]] for c in located["corrections"][:2]] == ["save account", "save account"]
+    assert starts[0] < starts[1] and starts[2] is None
+    assert (located["start"], located["end"]) == (segment.start, segment.end)
+
+
+def test_common_abbreviations_do_not_end_a_sentence():
+    # 1. Arrange
+    text = "Mr. Tan paid (e.g. by card). Dr.\nLim withdrew."
+
+    # 2. Act
+    segments = segment_sentences(text)
+
+    # 3. Assert
+    assert [s.text for s in segments] == ["Mr. Tan paid (e.g. by card).", "Dr.", "Lim withdrew."]
+    assert all(text[s.start:s.end] == s.text for s in segments)
+
+
+def test_content_check_skips_sentences_too_short_to_rewrite():
+    # 1. Arrange
+    store = DocumentStore()
+
+    # 2. Act
+    plan = store.plan("doc", "Top up. Send money to your friends today.", "content-check", "kb1")
+    store.commit("doc", "Top up. Send money to your friends today.", "content-check", "kb1", plan, {})
+
+    # 3. Assert
+    assert plan.pending == ["Send money to your friends today."] and plan.skipped == ["Top up."]
+    assert (store.checked_sentences, store.skipped_sentences) == (1, 1)
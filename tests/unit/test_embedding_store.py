@@ -0,0 +1,107 @@
+# tests/unit/test_embedding_store.py
+import asyncio
+import threading
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock
+from src.core.embedding_store import EmbeddingStore
+from src.core.ingestion import embed_documents
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def test_embeddings_persist_across_reopen_and_are_keyed_by_task_type(tmp_path):
+    # 1. Arrange
+    store = EmbeddingStore(str(tmp_path), max_entries=10)
+    store.set_many("model", "RETRIEVAL_QUERY", ["Top up", "Withdraw"], [[1.0, 0.0], [0.0, 1.0]])
+    store.close()
+
+    # 2. Act
+    reopened = EmbeddingStore(str(tmp_path), max_entries=10)
+    found = reopened.get_many("model", "RETRIEVAL_QUERY", ["Withdraw", "Top up", "Cashback"])
+    other_task = reopened.get_many("model", "RETRIEVAL_DOCUMENT", ["Top up"])
+
+    # 3. Assert
+    assert np.allclose(found["Withdraw"], [0.0, 1.0]) and np.allclose(found["Top up"], [1.0, 0.0])
+    assert "Cashback" not in found and other_task == {}
+    assert (reopened.hits, reopened.misses) == (2, 2)
+
+
+def test_least_recently_used_entries_are_evicted_at_the_cap(tmp_path, monkeypatch):
+    # 1. Arrange
+    monkeypatch.setattr("src.core.embedding_store.TOUCH_INTERVAL_SECONDS", 0)
+    store = EmbeddingStore(str(tmp_path), max_entries=2)
+    store.set_many("model", "RETRIEVAL_QUERY", ["a"], [[1.0, 0.0]])
+    store.set_many("model", "RETRIEVAL_QUERY", ["b"], [[0.0, 1.0]])
+    store.get_many("model", "RETRIEVAL_QUERY", ["a"])
+
+    # 2. Act
+    store.set_many("model", "RETRIEVAL_QUERY", ["c"], [[1.0, 1.0]])
+
+    # 3. Assert
+    assert len(store) == 2
+    assert set(store.get_many("model", "RETRIEVAL_QUERY", ["a", "b", "c"])) == {"a", "c"}
+    assert np.allclose(store.get_many("model", "RETRIEVAL_QUERY", ["c"])["c"], [1.0, 1.0])
+
+
+def test_stored_documents_and_queries_cost_no_embedding_calls(tmp_path, make_spell_checker):
+    # 1. Arrange
+    store = EmbeddingStore(str(tmp_path))
+    store.set_many("models/text-embedding-004", "RETRIEVAL_DOCUMENT", ["Rule one"], [[0.5, 0.5]])
+    store.set_many("models/text-embedding-004", "RETRIEVAL_QUERY", ["Top up now"], [[1.0, 0.0]])
+    mock_client = MagicMock()
+    spell_checker = make_spell_checker(mock_client, embedding_store=store)
+
+    # 2. Act
+    documents = embed_documents(["Rule one"], store=store)
+    queries = spell_checker._embed_sentences(["Top up now"])
+
+    # 3. Assert
+    assert documents == [[0.5, 0.5]]
+    assert np.allclose(queries[0], [1.0, 0.0])
+    mock_client.embed.assert_not_called()
+
+
+def test_async_checker_touches_the_store_off_the_event_loop(tmp_path, make_spell_checker):
+    # 1. Arrange
+    store = EmbeddingStore(str(tmp_path))
+    threads = []
+    for name in ("get_many", "set_many"):
+        method = getattr(store, name)
+        setattr(store, name, lambda *args, method=method: threads.append(threading.get_ident()) or method(*args))
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(return_value=[[1.0, 0.0]])
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, embedding_store=store)
+
+    # 2. Act
+    async def embed():
+        return threading.get_ident(), await spell_checker._embed_sentences(["Top up now"])
+    loop_thread, queries = asyncio.run(embed())
+
+    # 3. Assert
+    assert np.allclose(queries[0], [1.0, 0.0])
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+
+def test_two_stores_writing_the_same_key_keep_one_row_and_free_the_other(tmp_path):
+    # 1. Arrange
+    first = EmbeddingStore(str(tmp_path), max_entries=4)
+    second = EmbeddingStore(str(tmp_path), max_entries=4)
+    publish = first._publish
+
+    def racing_publish(slots):
+        # The other worker stores the same key between this one's reserve and publish.
+        second.set_many("model", "RETRIEVAL_QUERY", ["Top up"], [[0.0, 1.0]])
+        publish(slots)
+    first._publish = racing_publish
+
+    # 2. Act
+    first.set_many("model", "RETRIEVAL_QUERY", ["Top up"], [[1.0, 0.0]])
+    first._publish = publish
+    first.set_many("model", "RETRIEVAL_QUERY", ["Withdraw"], [[1.0, 1.0]])
+
+    # 3. Assert
+    assert np.allclose(first.get_many("model", "RETRIEVAL_QUERY", ["Top up"])["Top up"], [0.0, 1.0])
+    assert np.allclose(second.get_many("model", "RETRIEVAL_QUERY", ["Withdraw"])["Withdraw"], [1.0, 1.0])
+    slots = first._conn.execute("SELECT key, slot FROM embeddings").fetchall()
+    assert len(slots) == 2 and not any(key.startswith("pending:") for key, _ in slots)
+    assert sorted(slot for _, slot in slots) == [0, 1]
@@ -0,0 +1,36 @@
+# tests/unit/test_feedback_store.py
+import sqlite3
+import pytest
+from src.core.feedback_store import FeedbackWriter, FeedbackQueueFull
+
+
+def test_writer_batches_rows_and_drains_on_close(tmp_path):
+    # 1. Arrange
+    db_path = str(tmp_path / "feedback.db")
+    writer = FeedbackWriter(db_path, batch_size=50, flush_interval=5)
+    writer.start()
+
+    # 2. Act
+    for i in range(120):
+        writer.submit((f"c{i}", "accept", "Cash back", "Cashback", None))
+    writer.close()
+
+    # 3. Assert
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0] == 120
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    assert writer.written == 120
+    assert writer.batches <= 3
+
+
+def test_submit_applies_backpressure_when_queue_is_full(tmp_path):
+    # 1. Arrange (not started, so nothing drains the queue)
+    writer = FeedbackWriter(str(tmp_path / "feedback.db"), max_queue=2)
+    writer.submit(("c1", "accept", "a", "b", None))
+    writer.submit(("c2", "accept", "a", "b", None))
+
+    # 2. Act / 3. Assert
+    with pytest.raises(FeedbackQueueFull):
+        writer.submit(("c3", "accept", "a", "b", None))
+    assert writer.rejected == 1
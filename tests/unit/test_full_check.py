@@ -0,0 +1,41 @@
+# tests/unit/test_full_check.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def test_full_check_embeds_once_and_merges_both_checks_per_sentence(tmp_path, make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+
+    async def correct(sentences, language, rules, check_type):
+        results = []
+        for s in sentences:
+            corrections = []
+            if check_type == "TYPO_BRAND" and "hugosave" in s:
+                corrections.append({"type": "TYPO_BRAND", "original": "hugosave", "suggestion": "Hugosave"})
+            if check_type == "UX_WRITING":
+                corrections.append({"type": "UX_WRITING", "original": s, "suggestion": s + " now"})
+            results.append({"original_text": s, "is_correct": not corrections, "corrections": corrections})
+        return json.dumps({"results": results})
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=correct)
+
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)), retriever=MagicMock(blocking=False))
+    sentences = ["Open hugosave", "Top up your hugosave wallet today", "Save more every month with us"]
+    timings = []
+
+    # 2. Act
+    results = asyncio.run(spell_checker.full_check_sentences(sentences, [1, 2], timings))
+
+    # 3. Assert
+    assert mock_client.embed.await_count == 1
+    assert mock_client.embed.call_args[0][0] == sentences
+    assert mock_client.correct_batch_of_sentences.await_count == 2
+    assert [r["original_text"] for r in results] == sentences
+    assert results[0]["checks"] == ["TYPO_BRAND"]
+    assert [c["type"] for c in results[1]["corrections"]] == ["TYPO_BRAND", "UX_WRITING"]
+    assert results[2]["checks"] == ["TYPO_BRAND", "UX_WRITING"] and not results[2]["is_correct"]
+    assert sorted(t.check_type for t in timings) == ["TYPO_BRAND", "UX_WRITING"]
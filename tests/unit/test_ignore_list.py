@@ -0,0 +1,46 @@
+# tests/unit/test_ignore_list.py
+import json
+from unittest.mock import MagicMock
+from src.core.ignore_list import IgnoreIndex
+
+
+def test_index_picks_up_writes_from_another_worker(tmp_path):
+    # 1. Arrange
+    path = tmp_path / "ignore_list.txt"
+    path.write_text("Top up\n")
+    worker_a = IgnoreIndex(str(path), check_interval=0)
+    worker_b = IgnoreIndex(str(path), check_interval=0)
+
+    # 2. Act
+    added = worker_b.add("HugoHub")
+    added_again = worker_a.add("hugohub")
+
+    # 3. Assert
+    assert added is True and added_again is False
+    assert worker_a.contains("  HUGOHUB ")
+    assert worker_a.entries() == ["Top up", "HugoHub"]
+
+
+def test_ignored_inputs_skip_gemini_and_ignored_corrections_are_dropped(tmp_path, make_spell_checker):
+    # 1. Arrange
+    path = tmp_path / "ignore_list.txt"
+    path.write_text("Top up\nS$\n")
+    mock_client = MagicMock()
+    mock_client.correct_batch_of_sentences.return_value = json.dumps({"results": [
+        {"original_text": "Pay S$ 8 now", "is_correct": False, "corrections": [
+            {"type": "TYPO_BRAND", "original": "S$", "suggestion": "SGD"},
+        ]},
+    ]})
+    spell_checker = make_spell_checker(mock_client, cache=MagicMock(), ignore_index=IgnoreIndex(str(path)))
+    spell_checker.cache.get_many.return_value = {}
+    spell_checker._find_relevant_rules = MagicMock(return_value="- rule")
+
+    # 2. Act
+    results = spell_checker.batch_check_sentences(["top up", "Pay S$ 8 now"], "TYPO_BRAND")
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.call_args[0][0] == ["Pay S$ 8 now"]
+    assert results == [
+        {"original_text": "top up", "is_correct": True, "corrections": []},
+        {"original_text": "Pay S$ 8 now", "is_correct": True, "corrections": []},
+    ]
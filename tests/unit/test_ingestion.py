@@ -0,0 +1,29 @@
+# tests/unit/test_ingestion.py
+import json
+from unittest.mock import MagicMock
+from src.core.ingestion import load_rules, sync_knowledge_base
+
+
+def test_sync_embeds_only_new_rules_and_deletes_removed(tmp_path):
+    # 1. Arrange
+    rules = [
+        {"guideline": "Use 'Cashback'.", "incorrect_example": "Cash back", "correct_example": "Cashback"},
+        {"guideline": "Use 'Top-up'.", "incorrect_example": "topup", "correct_example": "Top-up"},
+    ]
+    (tmp_path / "spelling_and_terminology.json").write_text(json.dumps(rules))
+    unchanged_id = list(load_rules(str(tmp_path)))[0]
+    rules[1]["correct_example"] = "Top-up (edited)"
+    (tmp_path / "spelling_and_terminology.json").write_text(json.dumps(rules))
+
+    mock_collection = MagicMock()
+    mock_collection.get.return_value = {"ids": [unchanged_id, "doc_7"]}
+    embed_fn = MagicMock(side_effect=lambda texts: [[0.0, 1.0] for _ in texts])
+
+    # 2. Act
+    stats = sync_knowledge_base(mock_collection, knowledge_base_dir=str(tmp_path), embed_fn=embed_fn)
+
+    # 3. Assert
+    assert stats == {"added": 1, "removed": 1, "unchanged": 1}
+    assert "Top-up (edited)" in embed_fn.call_args[0][0][0]
+    assert mock_collection.upsert.call_args.kwargs["metadatas"] == [{"source": "spelling_and_terminology"}]
+    mock_collection.delete.assert_called_once_with(ids=["doc_7"])
@@ -0,0 +1,53 @@
+# tests/unit/test_metrics.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.metrics import Registry, Histogram, StageBreakdown, tracking
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    # 1. Arrange
+    registry = Registry()
+    histogram = Histogram("test_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0), registry=registry)
+
+    # 2. Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="parse")
+    text = registry.render()
+
+    # 3. Assert
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{stage="parse",le="1.0"} 3' in text
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 4' in text
+    assert 'test_seconds_count{stage="parse"} 4' in text
+
+
+def test_stage_breakdown_sums_stages_across_concurrent_chunks(tmp_path, monkeypatch, make_spell_checker):
+    # 1. Arrange
+    monkeypatch.setenv("CHUNK_MAX_SENTENCES_TYPO_BRAND", "1")
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+
+    async def correct(sentences, language, rules, check_type):
+        return json.dumps({"results": [{"original_text": s, "is_correct": True, "corrections": []} for s in sentences]})
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=correct)
+
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)), retriever=MagicMock(blocking=False))
+
+    async def check():
+        timings = []
+        with tracking(StageBreakdown(), "TYPO_BRAND") as stages:
+            await spell_checker.batch_check_sentences(["First one", "Second one", "Third one"], "TYPO_BRAND", timings)
+        return stages, timings
+
+    # 2. Act
+    stages, timings = asyncio.run(check())
+
+    # 3. Assert
+    assert len(timings) == 3
+    assert all({"embedding", "retrieval", "parse"} <= set(t.stages_ms) for t in timings)
+    assert {"cache_lookup", "embedding", "retrieval", "parse"} <= set(stages.stages_ms)
+    assert stages.errors == 0
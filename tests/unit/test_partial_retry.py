@@ -0,0 +1,78 @@
+# tests/unit/test_partial_retry.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core import spell_checker as spell_checker_module
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+from src.services.prompt_builder import salvage_results
+from src.services.gemini_client import GeminiCallError
+
+
+def _result(sentence: str) -> dict:
+    return {"original_text": sentence, "is_correct": True, "corrections": []}
+
+
+def _checker(make_spell_checker, mock_client, tmp_path):
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)), retriever=MagicMock(blocking=False))
+    return spell_checker
+
+
+def test_salvage_keeps_complete_items_of_a_truncated_response():
+    # 1. Arrange
+    text = json.dumps({"results": [_result("One"), _result("Two"), _result("Three")]})
+
+    # 2. Act
+    salvaged = salvage_results(text[:text.index("Three") - 5])
+
+    # 3. Assert
+    assert [r["original_text"] for r in salvaged] == ["One", "Two"]
+
+
+def test_only_missing_and_malformed_sentences_are_re_requested_in_order(tmp_path, monkeypatch, make_spell_checker):
+    # 1. Arrange
+    monkeypatch.setattr(spell_checker_module, "RETRY_BASE_DELAY_SECONDS", 0)
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+    calls = []
+
+    async def correct(sentences, language, rules, check_type):
+        calls.append(list(sentences))
+        if len(calls) == 1:
+            # "Second one" is missing, "Third one" is malformed, and the JSON is cut off.
+            text = json.dumps({"results": [_result("First one"), {"original_text": "Third one", "corrections": "bad"}, _result("Fourth one")]})
+            return text[:-10]
+        return json.dumps({"results": [_result(s) for s in reversed(sentences)]})
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=correct)
+    spell_checker = _checker(make_spell_checker, mock_client, tmp_path)
+    timings = []
+
+    # 2. Act
+    results = asyncio.run(spell_checker.batch_check_sentences(["First one", "Second one", "Third one", "Fourth one"], "TYPO_BRAND", timings))
+
+    # 3. Assert
+    assert calls[1] == ["Second one", "Third one", "Fourth one"]
+    assert [r["original_text"] for r in results] == ["First one", "Second one", "Third one", "Fourth one"]
+    assert timings[0].attempts == 2 and timings[0].ok
+
+
+def test_retryable_api_errors_are_retried_and_others_are_not(tmp_path, monkeypatch, make_spell_checker):
+    # 1. Arrange
+    monkeypatch.setattr(spell_checker_module, "RETRY_BASE_DELAY_SECONDS", 0)
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=[
+        GeminiCallError("ResourceExhausted: quota", retryable=True),
+        json.dumps({"results": [_result("Top up now")]}),
+        GeminiCallError("InvalidArgument: prompt too long", retryable=False),
+    ])
+    spell_checker = _checker(make_spell_checker, mock_client, tmp_path)
+
+    # 2. Act
+    first = asyncio.run(spell_checker.batch_check_sentences(["Top up now"], "TYPO_BRAND"))
+    second = asyncio.run(spell_checker.batch_check_sentences(["Withdraw later"], "TYPO_BRAND"))
+
+    # 3. Assert
+    assert [r["original_text"] for r in first] == ["Top up now"]
+    assert second == []
+    assert mock_client.correct_batch_of_sentences.await_count == 3
@@ -0,0 +1,58 @@
+# tests/unit/test_prompt_builder.py
+import json
+from unittest.mock import MagicMock
+from src.services.gemini_client import GeminiClient
+from src.services.prompt_builder import build_prompt, decode_sentences, expand_results
+
+
+def test_prompts_of_a_check_type_share_a_static_prefix():
+    # 1. Arrange
+    sentences = ['Say "hi"\nto Hugosave', "Top up now"]
+
+    # 2. Act
+    first = build_prompt(sentences, "- Rule A", "TYPO_BRAND")
+    second = build_prompt(["Something else"], "- Rule B", "TYPO_BRAND")
+    ux = build_prompt(sentences, "- Rule A", "UX_WRITING")
+
+    # 3. Assert
+    assert first.system == second.system != ux.system
+    assert first.text.startswith(first.system) and "- Rule A" not in first.system
+    assert decode_sentences(first.text) == sentences
+
+
+def test_duplicates_are_sent_once_and_fanned_back_out():
+    # 1. Arrange
+    model = MagicMock()
+    model.generate_content.return_value = MagicMock(
+        text=json.dumps({"results": [
+            {"id": 1, "corrections": [{"original": "hugosave", "suggestion": "Hugosave"}]},
+            {"id": 0, "corrections": []},
+        ]}),
+        usage_metadata=MagicMock(prompt_token_count=120, candidates_token_count=30, cached_content_token_count=0),
+    )
+    client = GeminiClient(model=model, embedder=MagicMock(), quota=MagicMock())
+    sentences = ["Top up now", "Open hugosave", "Top up now"]
+
+    # 2. Act
+    response = json.loads(client.correct_batch_of_sentences(sentences, "en-GB", "- Rule", "TYPO_BRAND"))
+
+    # 3. Assert
+    assert decode_sentences(model.generate_content.call_args[0][0]) == ["Top up now", "Open hugosave"]
+    assert [r["original_text"] for r in response["results"]] == sentences
+    assert response["results"][1]["corrections"] == [{"type": "TYPO_BRAND", "original": "hugosave", "suggestion": "Hugosave"}]
+    assert response["results"][2]["is_correct"]
+    assert (client.usage["prompt_tokens"], client.usage["output_tokens"]) == (120, 30)
+
+
+def test_truncated_answers_keep_complete_items_and_rewrites_get_their_sentence():
+    # 1. Arrange
+    prompt = build_prompt(["We will send it", "Tap to pay"], "- Rule", "UX_WRITING")
+    text = json.dumps({"results": [{"id": 0, "corrections": [{"suggestion": "We send it"}]}, {"id": 1, "corrections": []}]})
+
+    # 2. Act
+    results = expand_results(text[:text.index('{"id": 1')] + '{"id": 1, "corr', prompt)
+
+    # 3. Assert
+    assert results == [{"original_text": "We will send it", "is_correct": False, "corrections": [
+        {"type": "UX_WRITING", "original": "We will send it", "suggestion": "We send it"}
+    ]}]
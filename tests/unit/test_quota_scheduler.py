@@ -0,0 +1,66 @@
+# tests/unit/test_quota_scheduler.py
+import asyncio
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+from src.services.quota_scheduler import QuotaScheduler, TokenBucket, INTERACTIVE, BULK, request_priority
+
+
+def test_interactive_calls_are_admitted_ahead_of_queued_bulk_calls():
+    # 1. Arrange
+    scheduler = QuotaScheduler("generate", requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+    order = []
+
+    async def call(name: str, priority: int):
+        with request_priority(priority):
+            async with scheduler.lease_async(tokens=10):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+    async def run():
+        first = asyncio.create_task(call("running", INTERACTIVE))
+        await asyncio.sleep(0)
+        bulk = [asyncio.create_task(call(f"bulk-{n}", BULK)) for n in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await asyncio.gather(first, *bulk, interactive)
+
+    # 2. Act
+    asyncio.run(run())
+
+    # 3. Assert
+    assert order == ["running", "interactive", "bulk-0", "bulk-1"]
+    assert scheduler.stats()["queue_depth"] == 0 and scheduler.stats()["granted"] == 4
+
+
+def test_rate_limit_halves_concurrency_and_success_recovers_it():
+    # 1. Arrange
+    scheduler = QuotaScheduler("generate", requests_per_minute=0, tokens_per_minute=0, max_concurrency=8)
+
+    # 2. Act
+    with pytest.raises(ResourceExhausted):
+        with scheduler.lease(tokens=10):
+            raise ResourceExhausted("quota exceeded")
+    after_429 = scheduler.concurrency_limit
+    scheduler._cooldown_until = 0.0
+    for _ in range(40):
+        with scheduler.lease(tokens=10):
+            pass
+
+    # 3. Assert
+    assert after_429 == 4
+    assert scheduler.stats()["rate_limited"] == 1
+    assert scheduler.concurrency_limit == 8
+
+
+def test_token_bucket_reports_delay_until_enough_budget():
+    # 1. Arrange
+    bucket = TokenBucket(per_minute=600)  # 10 per second
+    now = bucket.updated
+
+    # 2. Act
+    bucket.take(600)
+    delay = bucket.delay_for(50, now)
+
+    # 3. Assert
+    assert delay == pytest.approx(5.0)
+    assert bucket.delay_for(50, now + 5) == 0
@@ -0,0 +1,69 @@
+# tests/unit/test_result_cache.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def _write_kb(tmp_path, rules):
+    (tmp_path / "spelling_and_terminology.json").write_text(json.dumps(rules))
+
+
+def test_cache_hit_is_invalidated_when_knowledge_base_changes(tmp_path):
+    # 1. Arrange
+    _write_kb(tmp_path, [{"guideline": "Use 'Cashback'."}])
+    cache = ResultCache(knowledge_base_dir=str(tmp_path))
+    result = {"original_text": "Cash back", "is_correct": False, "corrections": []}
+    cache.set_many([("Cash back", result)], "TYPO_BRAND")
+
+    # 2. Act / 3. Assert
+    assert cache.get_many(["  Cash   back "], "TYPO_BRAND")[0]["original_text"] == "  Cash   back "
+    assert cache.get_many(["Cash back"], "UX_WRITING") == {}
+
+    _write_kb(tmp_path, [{"guideline": "Use 'Cashback' and 'Goldback'."}])
+    assert cache.get_many(["Cash back"], "TYPO_BRAND") == {}
+
+
+def test_batch_check_only_sends_misses_and_keeps_input_order(tmp_path, make_spell_checker):
+    # 1. Arrange
+    _write_kb(tmp_path, [])
+    mock_client = MagicMock()
+    mock_client.correct_batch_of_sentences.return_value = json.dumps({"results": [
+        {"original_text": "Top up", "is_correct": True, "corrections": []},
+    ]})
+    spell_checker = make_spell_checker(mock_client, cache=ResultCache(knowledge_base_dir=str(tmp_path)))
+    spell_checker._find_relevant_rules = MagicMock(return_value="- rule")
+    spell_checker.cache.set_many([("Cash back", {
+        "original_text": "Cash back", "is_correct": False,
+        "corrections": [{"type": "TYPO_BRAND", "original": "Cash back", "suggestion": "Cashback"}],
+    })], "TYPO_BRAND")
+
+    # 2. Act
+    results = spell_checker.batch_check_sentences(["Top up", "Cash back", "Top up"], "TYPO_BRAND")
+
+    # 3. Assert
+    sent = mock_client.correct_batch_of_sentences.call_args[0][0]
+    assert sent == ["Top up"]
+    assert [r["original_text"] for r in results] == ["Top up", "Cash back", "Top up"]
+    assert results[1]["is_correct"] is False
+
+
+def test_async_batch_check_awaits_client_and_merges_cached(tmp_path, make_spell_checker):
+    # 1. Arrange
+    _write_kb(tmp_path, [])
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(return_value=[[0.1, 0.2]])
+    mock_client.correct_batch_of_sentences = AsyncMock(return_value=json.dumps({"results": [
+        {"original_text": "Top up", "is_correct": True, "corrections": []},
+    ]}))
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)))
+    spell_checker._query_rules = MagicMock(return_value="- rule")
+
+    # 2. Act
+    first = asyncio.run(spell_checker.batch_check_sentences(["Top up"], "TYPO_BRAND"))
+    second = asyncio.run(spell_checker.batch_check_sentences(["Top up"], "TYPO_BRAND"))
+
+    # 3. Assert
+    assert first == second == [{"original_text": "Top up", "is_correct": True, "corrections": []}]
+    assert mock_client.correct_batch_of_sentences.await_count == 1
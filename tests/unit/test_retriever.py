@@ -0,0 +1,44 @@
+# tests/unit/test_retriever.py
+from unittest.mock import MagicMock
+from src.core.retriever import NumpyRetriever
+
+
+def test_numpy_retriever_ranks_by_cosine_within_source():
+    # 1. Arrange
+    mock_collection = MagicMock()
+    mock_collection.get.return_value = {
+        "embeddings": [[1.0, 0.0], [0.7, 0.7], [0.0, 1.0], [1.0, 0.1]],
+        "documents": ["cashback rule", "top-up rule", "account rule", "tense rule"],
+        "metadatas": [
+            {"source": "spelling_and_terminology"},
+            {"source": "spelling_and_terminology"},
+            {"source": "spelling_and_terminology"},
+            {"source": "grammar_and_style"},
+        ],
+    }
+    retriever = NumpyRetriever(mock_collection)
+
+    # 2. Act
+    results = retriever.query([[0.0, 2.0], [1.0, 0.0]], "spelling_and_terminology", n_results=2)
+
+    # 3. Assert
+    assert results == [["account rule", "top-up rule"], ["cashback rule", "top-up rule"]]
+    assert retriever.query([[1.0, 0.0]], "grammar_and_style") == [["tense rule"]]
+    assert retriever.query([[1.0, 0.0]], "unknown_source") == [[]]
+
+
+def test_per_sentence_retrieval_embeds_once_and_unions_rules(make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.embed.side_effect = lambda texts, task_type: [[float(len(t)), 1.0] for t in texts]
+    mock_retriever = MagicMock()
+    mock_retriever.query.return_value = [["rule A", "rule B"], ["rule B", "rule C"]]
+    spell_checker = make_spell_checker(mock_client, cache=MagicMock(), retriever=mock_retriever)
+
+    # 2. Act
+    rules = spell_checker._find_relevant_rules(["Top up", "Cash back"], "spelling_and_terminology")
+    spell_checker._find_relevant_rules(["Cash back", "Top up"], "spelling_and_terminology")
+
+    # 3. Assert
+    assert rules == "- rule A\n- rule B\n- rule C"
+    mock_client.embed.assert_called_once_with(["Top up", "Cash back"], task_type="RETRIEVAL_QUERY")
@@ -0,0 +1,35 @@
+# tests/unit/test_single_flight.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def test_concurrent_identical_checks_share_one_gemini_call(tmp_path, make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+
+    async def slow_correct(sentences, language, rules, check_type):
+        await asyncio.sleep(0.05)
+        return json.dumps({"results": [{"original_text": s, "is_correct": True, "corrections": []} for s in sentences]})
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=slow_correct)
+
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)), retriever=MagicMock(blocking=False))
+
+    async def editors():
+        return await asyncio.gather(*(
+            spell_checker.batch_check_sentences(["Would you like to top it up now?", "Auto Top-up"], "TYPO_BRAND")
+            for _ in range(5)
+        ))
+
+    # 2. Act
+    results = asyncio.run(editors())
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.await_count == 1
+    assert all(len(r) == 2 for r in results)
+    assert spell_checker.single_flight.stats() == {
+        "in_flight": 0, "led_sentences": 2, "deduplicated_sentences": 8, "deduplicated_calls": 4,
+    }
@@ -0,0 +1,34 @@
+# tests/unit/test_streaming.py
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.core.result_cache import ResultCache
+from src.core.spell_checker import AsyncSpellChecker
+
+
+def test_stream_yields_cached_first_then_each_chunk_with_input_indices(tmp_path, monkeypatch, make_spell_checker):
+    # 1. Arrange
+    monkeypatch.setenv("CHUNK_MAX_SENTENCES_TYPO_BRAND", "1")
+    mock_client = MagicMock()
+    mock_client.embed = AsyncMock(side_effect=lambda texts, task_type: [[1.0, 0.0] for _ in texts])
+
+    async def correct(sentences, language, rules, check_type):
+        return json.dumps({"results": [{"original_text": s, "is_correct": True, "corrections": []} for s in sentences]})
+    mock_client.correct_batch_of_sentences = AsyncMock(side_effect=correct)
+
+    spell_checker = make_spell_checker(mock_client, AsyncSpellChecker, cache=ResultCache(knowledge_base_dir=str(tmp_path)), retriever=MagicMock(blocking=False))
+    spell_checker.cache.set_many([("Cached one", {"original_text": "Cached one", "is_correct": True, "corrections": []})], "TYPO_BRAND")
+
+    async def collect():
+        timings = []
+        records = [r async for r in spell_checker.stream_check_sentences(["New A", "Cached one", "New B", "New A"], "TYPO_BRAND", timings)]
+        return records, timings
+
+    # 2. Act
+    records, timings = asyncio.run(collect())
+
+    # 3. Assert
+    assert records[0] == (1, {"original_text": "Cached one", "is_correct": True, "corrections": []})
+    assert sorted(i for i, _ in records) == [0, 1, 2, 3]
+    assert all(result["original_text"] == ["New A", "Cached one", "New B", "New A"][i] for i, result in records)
+    assert len(timings) == 2
@@ -0,0 +1,88 @@
+# tests/unit/test_ux_triage.py
+import json
+from unittest.mock import MagicMock
+from src.core.result_cache import ResultCache
+from src.core.ux_triage import GRAMMAR_KB_PATH, UxTriage
+
+with open(GRAMMAR_KB_PATH, "r", encoding="utf-8") as f:
+    RULES = json.load(f)
+
+
+def test_every_rule_example_scores_above_threshold_and_plain_copy_does_not():
+    # 1. Arrange
+    triage = UxTriage(RULES, threshold=1.0, sample_rate=0.0)
+
+    # 2. Act
+    example_decisions = [triage.decide(rule["incorrect_example"]) for rule in RULES]
+    plain = triage.decide("Top up your wallet in seconds.")
+
+    # 3. Assert
+    assert all(d.send for d in example_decisions)
+    assert not plain.send and plain.score == 0.0
+
+
+def test_signals_follow_the_knowledge_base():
+    # 1. Arrange
+    oxford_rule = {"guideline": "Use the Oxford comma in lists of three or more items."}
+
+    # 2. Act
+    without_rule = UxTriage(RULES, instructions="")
+    with_rule = UxTriage(RULES + [oxford_rule], instructions="")
+
+    # 3. Assert
+    assert "missing_oxford_comma" not in [name for name, _, _ in without_rule.signals]
+    assert with_rule.score("Pay bills, save money and invest.")[1] == ["missing_oxford_comma"]
+
+
+def test_signals_the_static_instructions_enforce_are_always_on():
+    # 1. Arrange
+    triage = UxTriage(RULES, threshold=1.0, sample_rate=0.0)
+
+    # 2. Act
+    decision = triage.decide("Add money, save and invest with Hugosave.")
+
+    # 3. Assert
+    assert decision.send and decision.signals == ["missing_oxford_comma"]
+
+
+def test_skipped_sentences_need_no_model_call_and_samples_measure_misses(make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.embed.side_effect = lambda texts, task_type: [[0.1, 0.2] for _ in texts]
+    mock_client.correct_batch_of_sentences.side_effect = lambda sentences, *args: json.dumps({"results": [
+        {"original_text": s, "is_correct": False, "corrections": [{"type": "UX_WRITING", "original": s, "suggestion": s + "!"}]}
+        for s in sentences
+    ]})
+    spell_checker = make_spell_checker(mock_client, cache=MagicMock(get_many=MagicMock(return_value={})), triage=UxTriage(RULES, threshold=1.0, sample_rate=0.0))
+    flagged, plain = "Your payment will be sent tomorrow morning.", "Top up your wallet in seconds."
+
+    # 2. Act
+    results = spell_checker.batch_check_sentences([flagged, plain], "UX_WRITING")
+    sent_first = mock_client.correct_batch_of_sentences.call_args[0][0]
+    spell_checker.triage.sample_rate = 1.0
+    spell_checker.batch_check_sentences(["Send money to friends for free."], "UX_WRITING")
+
+    # 3. Assert
+    assert sent_first == [flagged]
+    assert [r["is_correct"] for r in results] == [False, True]
+    stats = spell_checker.triage.stats()
+    assert (stats["scored"], stats["skipped"], stats["sampled"], stats["false_negatives"]) == (3, 1, 1, 1)
+    assert stats["false_negative_rate"] == 1.0
+
+
+def test_triage_verdicts_are_not_cached_so_a_new_threshold_applies(tmp_path, make_spell_checker):
+    # 1. Arrange
+    mock_client = MagicMock()
+    mock_client.embed.side_effect = lambda texts, task_type: [[0.1, 0.2] for _ in texts]
+    mock_client.correct_batch_of_sentences.side_effect = lambda sentences, *args: json.dumps({"results": [
+        {"original_text": s, "is_correct": True, "corrections": []} for s in sentences
+    ]})
+    spell_checker = make_spell_checker(mock_client, cache=ResultCache(knowledge_base_dir=str(tmp_path)), triage=UxTriage(RULES, threshold=1.0, sample_rate=0.0))
+    spell_checker.batch_check_sentences(["Top up your wallet in seconds."], "UX_WRITING")
+
+    # 2. Act
+    spell_checker.triage.threshold = 0.0
+    spell_checker.batch_check_sentences(["Top up your wallet in seconds."], "UX_WRITING")
+
+    # 3. Assert
+    assert mock_client.correct_batch_of_sentences.call_count == 1